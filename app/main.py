@@ -6,14 +6,22 @@ from flask_wtf.csrf import CSRFProtect
 # =====================================================
 
 from core.cms_bootstrap import bootstrap_system
+from core.cms_jobs import start_workers
 
 # =====================================================
 # SERVICES
 # =====================================================
 
-from app.services.auth_service import init_auth, bootstrap_root_user
-from app.services.api_token_service import init_api_token
-from app.repositories.user_repository import init_user_table
+from app.services.auth_service import bootstrap_root_user
+from app.services.api_token_service import start_token_flusher
+from app.repositories.db import init_db
+from app.repositories.migrate import run_migrations
+from app.services.media_index_service import start_background_scan
+from app.services.watcher_service import start_watcher
+from app.services.quota_service import start_quota_reconciler
+from app.services.search_service import start_search_indexer
+from app.services.compression_service import init_compression
+from app.services import upload_jobs  # noqa: F401 (registrasi job handler)
 
 # =====================================================
 # ROUTES
@@ -26,6 +34,8 @@ from app.routes.file_routes import file_bp
 from app.routes.dashboard_routes import dashboard_bp
 from app.routes.api_routes import api_bp
 from app.routes.password_routes import password_bp
+from app.routes.music_routes import music_bp
+from app.routes.playlist_routes import playlist_bp
 
 
 # =====================================================
@@ -42,6 +52,11 @@ def create_app():
     app.config["SECRET_KEY"] = "dev-secret-key"
     csrf = CSRFProtect(app)
 
+    # -------------------------------------------------
+    # DATABASE: koneksi request dikembalikan ke pool
+    # -------------------------------------------------
+    init_db(app)
+
     # -------------------------------------------------
     # BOOTSTRAP CORE SYSTEM
     # (folder, git, venv, dll)
@@ -49,13 +64,21 @@ def create_app():
     bootstrap_system()
 
     # -------------------------------------------------
-    # INIT AUTH SYSTEM (DB, TABLE)
+    # SKEMA DATABASE (app/migrations, PRAGMA user_version)
     # -------------------------------------------------
-    init_auth()
-    init_user_table()
-    init_api_token()
+    run_migrations()
     bootstrap_root_user()
 
+    # -------------------------------------------------
+    # BACKGROUND JOB (INDEX MEDIA LIBRARY)
+    # -------------------------------------------------
+    start_background_scan()
+    start_watcher()
+    start_quota_reconciler()
+    start_search_indexer()
+    start_token_flusher()
+    start_workers()
+
     # -------------------------------------------------
     # REGISTER BLUEPRINTS
     # -------------------------------------------------
@@ -66,6 +89,13 @@ def create_app():
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(api_bp)
     app.register_blueprint(password_bp)
+    app.register_blueprint(music_bp)
+    app.register_blueprint(playlist_bp)
+
+    # -------------------------------------------------
+    # KOMPRESI (static precompress + respons dinamis)
+    # -------------------------------------------------
+    init_compression(app)
 
     return app
 
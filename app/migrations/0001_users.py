@@ -0,0 +1,24 @@
+"""
+0001_users.py
+Tabel users (+ kolom yang dulu ditambah migrate_users_table)
+"""
+
+from app.repositories.migrate import add_column
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL,
+        must_change_password INTEGER DEFAULT 0,
+        created_at TEXT NOT NULL
+    )
+    """)
+
+    # database lama: kolom ditambah belakangan
+    add_column(cur, "users", "is_active", "INTEGER DEFAULT 1")
+    add_column(cur, "users", "must_change_password", "INTEGER DEFAULT 0")
+    add_column(cur, "users", "last_login_at", "TEXT")
@@ -0,0 +1,40 @@
+"""
+0002_api_tokens.py
+API token: index hash, last_used_at & generation untuk invalidasi cache
+"""
+
+from app.repositories.migrate import add_column
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS api_tokens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user TEXT NOT NULL,
+        token_hash TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        revoked INTEGER DEFAULT 0
+    )
+    """)
+
+    add_column(cur, "api_tokens", "last_used_at", "TEXT")
+
+    # lookup verifikasi per request: WHERE token_hash = ?
+    cur.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_api_tokens_hash "
+        "ON api_tokens(token_hash)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_api_tokens_user ON api_tokens(user)"
+    )
+
+    # generation naik setiap revoke: worker lain tahu cache-nya basi
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS api_token_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        generation INTEGER NOT NULL
+    )
+    """)
+    cur.execute(
+        "INSERT OR IGNORE INTO api_token_state (id, generation) VALUES (1, 0)"
+    )
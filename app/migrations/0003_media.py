@@ -0,0 +1,40 @@
+"""
+0003_media.py
+Index media library & cache playlist HLS
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS media_files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        root TEXT NOT NULL,
+        path TEXT UNIQUE NOT NULL,
+        inode INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        media_type TEXT NOT NULL,
+        width INTEGER,
+        height INTEGER,
+        duration REAL,
+        indexed_at TEXT NOT NULL
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_media_root ON media_files(root)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_media_type ON media_files(media_type)"
+    )
+
+    # cache playlist HLS (valid selama size & mtime file sama)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS hls_playlists (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        playlist TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """)
@@ -0,0 +1,46 @@
+"""
+0004_music.py
+Library musik: artists, albums, tracks
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS artists (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL COLLATE NOCASE
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS albums (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        artist_id INTEGER NOT NULL REFERENCES artists(id),
+        title TEXT NOT NULL COLLATE NOCASE,
+        year INTEGER,
+        UNIQUE(artist_id, title)
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS tracks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT UNIQUE NOT NULL,
+        title TEXT NOT NULL,
+        artist_id INTEGER NOT NULL REFERENCES artists(id),
+        album_id INTEGER NOT NULL REFERENCES albums(id),
+        track_no INTEGER,
+        disc_no INTEGER,
+        year INTEGER,
+        genre TEXT,
+        duration REAL
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tracks_artist ON tracks(artist_id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tracks_album "
+        "ON tracks(album_id, disc_no, track_no)"
+    )
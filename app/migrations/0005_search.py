@@ -0,0 +1,57 @@
+"""
+0005_search.py
+search_docs = tabel konten (lookup per path via UNIQUE index),
+search_fts  = index FTS5 external content, disinkron lewat trigger.
+prefix='2 3' membuat query prefix ("hol*") tidak perlu scan term.
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS search_docs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT UNIQUE NOT NULL,
+        owner TEXT,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        dir TEXT NOT NULL,
+        meta TEXT NOT NULL DEFAULT ''
+    )
+    """)
+
+    cur.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        name, dir, meta,
+        content='search_docs',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """)
+
+    # satu statement per execute: executescript akan commit transaksi
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS search_docs_ai AFTER INSERT ON search_docs
+    BEGIN
+        INSERT INTO search_fts (rowid, name, dir, meta)
+        VALUES (new.id, new.name, new.dir, new.meta);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS search_docs_ad AFTER DELETE ON search_docs
+    BEGIN
+        INSERT INTO search_fts (search_fts, rowid, name, dir, meta)
+        VALUES ('delete', old.id, old.name, old.dir, old.meta);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS search_docs_au AFTER UPDATE ON search_docs
+    BEGIN
+        INSERT INTO search_fts (search_fts, rowid, name, dir, meta)
+        VALUES ('delete', old.id, old.name, old.dir, old.meta);
+        INSERT INTO search_fts (rowid, name, dir, meta)
+        VALUES (new.id, new.name, new.dir, new.meta);
+    END
+    """)
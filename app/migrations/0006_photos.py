@@ -0,0 +1,27 @@
+"""
+0006_photos.py
+Metadata foto untuk timeline galeri
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS photos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT UNIQUE NOT NULL,
+        owner TEXT,
+        taken_at TEXT NOT NULL,
+        date_source TEXT NOT NULL,
+        orientation INTEGER,
+        width INTEGER,
+        height INTEGER,
+        has_gps INTEGER NOT NULL DEFAULT 0,
+        camera TEXT
+    )
+    """)
+
+    # owner NULL = media library; index melayani keyset per owner
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_photos_timeline "
+        "ON photos(owner, taken_at, id)"
+    )
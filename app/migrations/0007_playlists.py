@@ -0,0 +1,35 @@
+"""
+0007_playlists.py
+position = kunci urutan fraksional (TEXT, dibandingkan biner).
+Pindah urutan cukup update satu baris (lihat playlist_service).
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS playlists (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        owner TEXT NOT NULL,
+        name TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS playlist_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        playlist_id INTEGER NOT NULL REFERENCES playlists(id),
+        media_id INTEGER NOT NULL,
+        position TEXT NOT NULL,
+        added_at TEXT NOT NULL
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_playlists_owner ON playlists(owner)"
+    )
+    cur.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_playlist_entries_order "
+        "ON playlist_entries(playlist_id, position)"
+    )
@@ -0,0 +1,17 @@
+"""
+0008_cas.py
+Referensi path -> digest content-addressed storage
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS cas_refs (
+        path TEXT PRIMARY KEY,
+        digest TEXT NOT NULL
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cas_refs_digest ON cas_refs(digest)"
+    )
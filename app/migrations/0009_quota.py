@@ -0,0 +1,20 @@
+"""
+0009_quota.py
+Pemakaian & kuota storage per user
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS storage_quota (
+        username TEXT PRIMARY KEY,
+        used_bytes INTEGER NOT NULL DEFAULT 0,
+        quota_bytes INTEGER,
+        updated_at TEXT NOT NULL
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_storage_quota_used "
+        "ON storage_quota(used_bytes)"
+    )
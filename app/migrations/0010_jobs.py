@@ -0,0 +1,32 @@
+"""
+0010_jobs.py
+Antrian job persisten (core.cms_jobs)
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        run_at REAL NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        heartbeat_at REAL,
+        worker TEXT,
+        last_error TEXT
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, run_at)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_finished "
+        "ON jobs(status, finished_at)"
+    )
@@ -0,0 +1,23 @@
+"""
+0011_file_index.py
+Index isi folder upload user (dijaga watcher)
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS upload_entries (
+        username TEXT NOT NULL,
+        dir TEXT NOT NULL,
+        name TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        is_dir INTEGER NOT NULL,
+        PRIMARY KEY (dir, name)
+    )
+    """)
+
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_upload_entries_user "
+        "ON upload_entries(username)"
+    )
@@ -0,0 +1,125 @@
+"""
+0012_user_counters.py
+Counter statistik user dijaga trigger (dashboard tanpa COUNT(*) users)
+"""
+
+# Nama counter:
+#   total, active, locked, logins   -> angka global
+#   role:<role>                     -> jumlah user per role
+#   day:<YYYY-MM-DD>:signup|login   -> bucket harian
+COUNTER_DELTA = """
+    INSERT INTO user_counters (name, value) VALUES ({name}, {delta})
+    ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;
+"""
+
+TRIGGERS = {
+    "users_counters_insert": """
+    AFTER INSERT ON users
+    BEGIN
+        {total}{active}{locked}{role}{signup}
+    END
+    """.format(
+        total=COUNTER_DELTA.format(name="'total'", delta="1"),
+        active=COUNTER_DELTA.format(
+            name="'active'", delta="NEW.is_active IS 1"
+        ),
+        locked=COUNTER_DELTA.format(
+            name="'locked'", delta="NEW.is_active IS 0"
+        ),
+        role=COUNTER_DELTA.format(name="'role:' || NEW.role", delta="1"),
+        signup=COUNTER_DELTA.format(
+            name="'day:' || substr(NEW.created_at, 1, 10) || ':signup'",
+            delta="1",
+        ),
+    ),
+    "users_counters_delete": """
+    AFTER DELETE ON users
+    BEGIN
+        {total}{active}{locked}{role}
+    END
+    """.format(
+        total=COUNTER_DELTA.format(name="'total'", delta="-1"),
+        active=COUNTER_DELTA.format(
+            name="'active'", delta="-(OLD.is_active IS 1)"
+        ),
+        locked=COUNTER_DELTA.format(
+            name="'locked'", delta="-(OLD.is_active IS 0)"
+        ),
+        role=COUNTER_DELTA.format(name="'role:' || OLD.role", delta="-1"),
+    ),
+    "users_counters_role": """
+    AFTER UPDATE OF role ON users
+    WHEN OLD.role IS NOT NEW.role
+    BEGIN
+        {old}{new}
+    END
+    """.format(
+        old=COUNTER_DELTA.format(name="'role:' || OLD.role", delta="-1"),
+        new=COUNTER_DELTA.format(name="'role:' || NEW.role", delta="1"),
+    ),
+    "users_counters_active": """
+    AFTER UPDATE OF is_active ON users
+    WHEN OLD.is_active IS NOT NEW.is_active
+    BEGIN
+        {active}{locked}
+    END
+    """.format(
+        active=COUNTER_DELTA.format(
+            name="'active'",
+            delta="(NEW.is_active IS 1) - (OLD.is_active IS 1)",
+        ),
+        locked=COUNTER_DELTA.format(
+            name="'locked'",
+            delta="(NEW.is_active IS 0) - (OLD.is_active IS 0)",
+        ),
+    ),
+    "users_counters_login": """
+    AFTER UPDATE OF last_login_at ON users
+    WHEN NEW.last_login_at IS NOT NULL
+    BEGIN
+        {logins}{day}
+    END
+    """.format(
+        logins=COUNTER_DELTA.format(name="'logins'", delta="1"),
+        day=COUNTER_DELTA.format(
+            name="'day:' || substr(NEW.last_login_at, 1, 10) || ':login'",
+            delta="1",
+        ),
+    ),
+}
+
+
+def upgrade(cur):
+    cur.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = 'user_counters'"
+    )
+    created = cur.fetchone() is None
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """)
+
+    for name, body in TRIGGERS.items():
+        cur.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+    if not created:
+        return
+
+    # isi awal dari data users yang sudah ada
+    cur.execute("""
+    INSERT INTO user_counters (name, value)
+    SELECT 'total', COUNT(*) FROM users
+    UNION ALL
+    SELECT 'active', COUNT(*) FROM users WHERE is_active = 1
+    UNION ALL
+    SELECT 'locked', COUNT(*) FROM users WHERE is_active = 0
+    UNION ALL
+    SELECT 'role:' || role, COUNT(*) FROM users GROUP BY role
+    UNION ALL
+    SELECT 'day:' || substr(created_at, 1, 10) || ':signup', COUNT(*)
+    FROM users GROUP BY substr(created_at, 1, 10)
+    """)
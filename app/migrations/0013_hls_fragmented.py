@@ -0,0 +1,9 @@
+"""
+0013_hls_fragmented.py
+Playlist HLS lama (byte-range mdat non-fragmented) tidak bisa diputar,
+buang cache agar dibuat ulang dengan aturan fMP4
+"""
+
+
+def upgrade(cur):
+    cur.execute("DELETE FROM hls_playlists")
@@ -0,0 +1,39 @@
+"""
+0014_user_cache_generation.py
+Generation cache user: naik lewat trigger setiap baris user yang
+di-cache berubah / dihapus, dari worker mana pun (termasuk CLI)
+"""
+
+BUMP = "UPDATE user_cache_state SET generation = generation + 1 WHERE id = 1;"
+
+TRIGGERS = {
+    # last_login_at tidak di-cache, login tidak membuang cache
+    "users_cache_update": f"""
+    AFTER UPDATE OF username, password_hash, role, is_active,
+        must_change_password ON users
+    BEGIN
+        {BUMP}
+    END
+    """,
+    "users_cache_delete": f"""
+    AFTER DELETE ON users
+    BEGIN
+        {BUMP}
+    END
+    """,
+}
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_cache_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        generation INTEGER NOT NULL
+    )
+    """)
+    cur.execute(
+        "INSERT OR IGNORE INTO user_cache_state (id, generation) VALUES (1, 0)"
+    )
+
+    for name, body in TRIGGERS.items():
+        cur.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
@@ -0,0 +1,18 @@
+"""
+0015_quota_reconcile.py
+Waktu rekonsiliasi kuota terakhir: satu walk storage per interval
+untuk semua worker, bukan satu per worker
+"""
+
+
+def upgrade(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS quota_reconcile_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        last_run_at REAL NOT NULL
+    )
+    """)
+    cur.execute(
+        "INSERT OR IGNORE INTO quota_reconcile_state (id, last_run_at) "
+        "VALUES (1, 0)"
+    )
@@ -3,36 +3,13 @@ api_token_repository.py
 Akses database API token
 """
 
-import sqlite3
 from typing import Optional
 
-from core.cms_bash_folder import DB_PATH
-
-
-def _get_db():
-    return sqlite3.connect(DB_PATH)
-
-
-def init_token_table():
-    conn = _get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS api_tokens (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user TEXT NOT NULL,
-        token_hash TEXT NOT NULL,
-        created_at TEXT NOT NULL,
-        revoked INTEGER DEFAULT 0
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+from app.repositories.db import get_db
 
 
 def save_token(user, token_hash, created_at):
-    conn = _get_db()
+    conn = get_db()
     cur = conn.cursor()
 
     cur.execute(
@@ -48,12 +25,12 @@ def save_token(user, token_hash, created_at):
 
 
 def get_active_tokens(user):
-    conn = _get_db()
+    conn = get_db()
     cur = conn.cursor()
 
     cur.execute(
         """
-        SELECT id, created_at FROM api_tokens
+        SELECT id, created_at, last_used_at FROM api_tokens
         WHERE user = ? AND revoked = 0
         """,
         (user,)
@@ -64,21 +41,53 @@ def get_active_tokens(user):
     return rows
 
 
-def revoke_token(token_id):
-    conn = _get_db()
+def revoke_token(token_id, user=None):
+    """
+    Revoke satu token (opsional: hanya milik user), naikkan generation.
+    Return jumlah token yang di-revoke.
+    """
+    conn = get_db()
     cur = conn.cursor()
 
-    cur.execute(
-        "UPDATE api_tokens SET revoked = 1 WHERE id = ?",
-        (token_id,)
-    )
+    if user is None:
+        cur.execute(
+            "UPDATE api_tokens SET revoked = 1 WHERE id = ? AND revoked = 0",
+            (token_id,)
+        )
+    else:
+        cur.execute(
+            """
+            UPDATE api_tokens SET revoked = 1
+            WHERE id = ? AND user = ? AND revoked = 0
+            """,
+            (token_id, user)
+        )
+
+    revoked = cur.rowcount
+    if revoked:
+        cur.execute(
+            "UPDATE api_token_state SET generation = generation + 1 "
+            "WHERE id = 1"
+        )
 
     conn.commit()
     conn.close()
+    return revoked
+
+
+def get_token_generation():
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute("SELECT generation FROM api_token_state WHERE id = 1")
+    row = cur.fetchone()
+
+    conn.close()
+    return row[0] if row else 0
 
 
 def find_token_hash(token_hash) -> Optional[str]:
-    conn = _get_db()
+    conn = get_db()
     cur = conn.cursor()
 
     cur.execute(
@@ -92,4 +101,23 @@ def find_token_hash(token_hash) -> Optional[str]:
     row = cur.fetchone()
     conn.close()
 
-    return row[0] if row else None
\ No newline at end of file
+    return row[0] if row else None
+
+
+def touch_tokens(rows):
+    """
+    rows: list of (last_used_at, token_hash)
+    """
+    if not rows:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        "UPDATE api_tokens SET last_used_at = ? WHERE token_hash = ?",
+        rows
+    )
+
+    conn.commit()
+    conn.close()
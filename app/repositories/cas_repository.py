@@ -0,0 +1,92 @@
+"""
+cas_repository.py
+Referensi file user -> blob content-addressed (SQLite)
+"""
+
+from typing import Optional
+from contextlib import contextmanager
+
+from app.repositories.db import get_db
+
+
+# =====================================================
+# TRANSAKSI REFCOUNT
+# =====================================================
+
+@contextmanager
+def ref_transaction():
+    """
+    BEGIN IMMEDIATE: lock writer SQLite berlaku lintas proses (worker
+    gunicorn), jadi cek blob + update refcount tidak bisa diselingi
+    store / release dari proses lain. Yield cursor untuk helper di
+    bawah; commit di akhir blok, rollback jika error.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+
+    try:
+        yield cur
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def add_ref(cur, path, digest):
+    cur.execute(
+        "INSERT OR REPLACE INTO cas_refs (path, digest) VALUES (?, ?)",
+        (path, digest)
+    )
+
+
+def get_digest(path) -> Optional[str]:
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute("SELECT digest FROM cas_refs WHERE path = ?", (path,))
+    row = cur.fetchone()
+
+    conn.close()
+    return row[0] if row else None
+
+
+def move_ref(cur, old_path, new_path):
+    """
+    Referensi di new_path harus sudah dilepas (remove_ref) agar
+    blobnya ikut dihitung ulang
+    """
+    cur.execute(
+        "UPDATE cas_refs SET path = ? WHERE path = ?",
+        (new_path, old_path)
+    )
+
+
+def remove_ref(cur, path):
+    """
+    Hapus referensi, return (digest, sisa_referensi) atau None
+    """
+    cur.execute("SELECT digest FROM cas_refs WHERE path = ?", (path,))
+    row = cur.fetchone()
+
+    if not row:
+        return None
+
+    digest = row[0]
+    cur.execute("DELETE FROM cas_refs WHERE path = ?", (path,))
+    cur.execute(
+        "SELECT COUNT(*) FROM cas_refs WHERE digest = ?",
+        (digest,)
+    )
+    return digest, cur.fetchone()[0]
+
+
+def cas_stats():
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute("SELECT COUNT(*), COUNT(DISTINCT digest) FROM cas_refs")
+    refs, blobs = cur.fetchone()
+
+    conn.close()
+    return {"refs": refs, "blobs": blobs}
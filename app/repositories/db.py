@@ -1,5 +1,110 @@
-import sqlite3
-from core.cms_bash_folder import DB_PATH
+"""
+db.py
+Koneksi SQLite bersama untuk semua repository:
+- di dalam request Flask: koneksi dari pool, dilepas saat teardown
+- di luar request (thread background, CLI): satu koneksi per thread
+Koneksi dipakai ulang, jadi conn.close() di repository tidak
+melakukan apa pun. Sisa transaksi yang tertinggal di-rollback
+saat koneksi dilepas (release_db), bukan saat diambil / close().
+"""
+
+import queue
+import threading
+
+from flask import current_app, g, has_app_context
+
+from core.cms_db import connect, is_usable
+
+
+POOL_SIZE = 8                    # koneksi idle yang disimpan pool
+
+
+# =====================================================
+# POOL (REQUEST) & THREAD-LOCAL (BACKGROUND)
+# =====================================================
+
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+_local = threading.local()
+
+
+def _acquire():
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            return connect()
+        if is_usable(conn):
+            return conn
+
+
+def _rollback(conn):
+    if conn.in_transaction:
+        conn.rollback()
+
+
+def _release(conn):
+    _rollback(conn)
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.dispose()
+
 
 def get_db():
-    return sqlite3.connect(DB_PATH)
\ No newline at end of file
+    """
+    Koneksi untuk satu operasi repository. Tidak me-rollback apa pun:
+    tulisan pemanggil yang belum di-commit tetap utuh walau repository
+    lain dipanggil di tengahnya. Transaksi yang tertinggal (error
+    sebelum commit) dibersihkan oleh release_db().
+    """
+    if has_app_context():
+        g._db_queries = g.get("_db_queries", 0) + 1
+        conn = g.get("_db_conn")
+        if conn is None:
+            conn = g._db_conn = _acquire()
+    else:
+        conn = getattr(_local, "conn", None)
+        if not is_usable(conn):
+            conn = _local.conn = connect()
+
+    return conn
+
+
+def query_count():
+    """
+    Jumlah operasi repository (get_db) di request / app context aktif
+    """
+    if not has_app_context():
+        return 0
+    return g.get("_db_queries", 0)
+
+
+def _query_header(response):
+    # regresi jumlah query terlihat di test / mode debug
+    if current_app.debug or current_app.testing:
+        response.headers["X-DB-Queries"] = str(query_count())
+    return response
+
+
+def release_db(exception=None):
+    """
+    Akhir satu unit kerja: rollback transaksi yang tertinggal agar
+    lock writer tidak tertahan.
+    - teardown app context: koneksi request kembali ke pool
+    - thread background (tanpa app context): dipanggil setelah tiap
+      iterasi / job, koneksi thread tetap dipakai
+    """
+    if has_app_context():
+        conn = g.pop("_db_conn", None)
+        if conn is not None:
+            _release(conn)
+        return
+
+    conn = getattr(_local, "conn", None)
+    if is_usable(conn):
+        _rollback(conn)
+
+
+def init_db(app):
+    app.teardown_appcontext(release_db)
+    app.after_request(_query_header)
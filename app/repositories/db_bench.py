@@ -0,0 +1,161 @@
+"""
+db_bench.py
+Benchmark throughput koneksi SQLite: connect/close per query
+(cara lama) vs koneksi dipakai ulang + WAL (db.get_db).
+
+    python -m app.repositories.db_bench --threads 8 --ops 2000
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+from core.cms_db import connect
+
+
+# =====================================================
+# STRATEGI KONEKSI
+# =====================================================
+
+def _legacy_factory(path):
+    """
+    Perilaku lama: sqlite3.connect baru setiap query, journal default
+    """
+    def get():
+        return sqlite3.connect(path)
+
+    def put(conn):
+        conn.close()
+
+    return get, put
+
+
+def _pooled_factory(path):
+    """
+    Perilaku baru: satu koneksi per thread (PRAGMA core.cms_db), close = no-op
+    """
+    local = threading.local()
+
+    def get():
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = connect(path)
+        return conn
+
+    def put(conn):
+        conn.close()
+
+    return get, put
+
+
+# =====================================================
+# WORKLOAD
+# =====================================================
+
+def _prepare(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        role TEXT NOT NULL,
+        last_seen TEXT
+    )
+    """)
+    conn.executemany(
+        "INSERT INTO users (username, role) VALUES (?, 'user')",
+        [(f"user{i}",) for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _worker(get, put, ops, rows, write_ratio, errors):
+    rnd = random.Random()
+
+    for _ in range(ops):
+        username = f"user{rnd.randrange(rows)}"
+        conn = get()
+        try:
+            cur = conn.cursor()
+            if rnd.random() < write_ratio:
+                cur.execute(
+                    "UPDATE users SET last_seen = ? WHERE username = ?",
+                    (str(time.time()), username)
+                )
+                conn.commit()
+            else:
+                cur.execute(
+                    "SELECT id, role FROM users WHERE username = ?",
+                    (username,)
+                )
+                cur.fetchone()
+        except sqlite3.OperationalError:
+            errors.append(1)
+        finally:
+            put(conn)
+
+
+def run(factory, threads, ops, rows, write_ratio):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        _prepare(path, rows)
+        get, put = factory(path)
+        errors = []
+
+        workers = [
+            threading.Thread(
+                target=_worker,
+                args=(get, put, ops, rows, write_ratio, errors)
+            )
+            for _ in range(threads)
+        ]
+
+        started = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+    return threads * ops / elapsed, len(errors)
+
+
+# =====================================================
+# CLI
+# =====================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bandingkan throughput koneksi SQLite lama vs baru"
+    )
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=2000,
+                        help="query per thread")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, factory in (
+        ("connect/close", _legacy_factory),
+        ("pooled + WAL", _pooled_factory),
+    ):
+        rate, errors = run(
+            factory, args.threads, args.ops, args.rows, args.write_ratio
+        )
+        results[name] = rate
+        print(f"{name:14} {rate:10.0f} ops/s  (locked: {errors})")
+
+    speedup = results["pooled + WAL"] / results["connect/close"]
+    print(f"{'speedup':14} {speedup:10.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+file_index_repository.py
+Snapshot isi folder upload user (diisi oleh watcher)
+"""
+
+from app.repositories.db import get_db
+
+
+# =====================================================
+# WRITE
+# =====================================================
+
+def apply_entry_changes(replaced=(), upserts=(), deletes=()):
+    """
+    replaced: list of (username, dir, entries) -> isi folder ditulis ulang
+              (entries dict name -> (size, mtime_ns, is_dir), None = hilang)
+    upserts : list of (username, dir, name, size, mtime_ns, is_dir)
+    deletes : list of (dir, name)
+
+    Semua perubahan ditulis dalam satu transaksi.
+    """
+    if not (replaced or upserts or deletes):
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    for username, folder, entries in replaced:
+        cur.execute("DELETE FROM upload_entries WHERE dir = ?", (folder,))
+
+        if entries is None:
+            continue
+
+        cur.executemany(
+            """
+            INSERT INTO upload_entries
+            (username, dir, name, size, mtime_ns, is_dir)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (username, folder, name, size, mtime_ns, int(is_dir))
+                for name, (size, mtime_ns, is_dir) in entries.items()
+            ]
+        )
+
+    cur.executemany(
+        "DELETE FROM upload_entries WHERE dir = ? AND name = ?",
+        deletes
+    )
+
+    cur.executemany(
+        """
+        INSERT OR REPLACE INTO upload_entries
+        (username, dir, name, size, mtime_ns, is_dir)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        upserts
+    )
+
+    conn.commit()
+    conn.close()
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def usage_by_user():
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT username, COUNT(*), COALESCE(SUM(size), 0)
+        FROM upload_entries
+        WHERE is_dir = 0
+        GROUP BY username
+        """
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+
+    return {
+        username: {"files": files, "size": size}
+        for username, files, size in rows
+    }
@@ -0,0 +1,237 @@
+"""
+media_repository.py
+Akses database index media library (SQLite)
+"""
+
+from datetime import datetime
+
+from app.repositories.db import get_db
+
+
+# =====================================================
+# SCAN STATE
+# =====================================================
+
+def load_index_state(root):
+    """
+    Return {path: (inode, size, mtime_ns)} untuk satu root.
+    Dibaca sekali per scan agar pengecekan per file O(1).
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        "SELECT path, inode, size, mtime_ns FROM media_files WHERE root = ?",
+        (root,)
+    )
+    state = {row[0]: (row[1], row[2], row[3]) for row in cur.fetchall()}
+
+    conn.close()
+    return state
+
+
+def load_folder_state(folder):
+    """
+    Sama seperti load_index_state, tapi hanya subtree folder.
+    Range query (bukan LIKE) agar memakai index UNIQUE(path).
+    """
+    prefix = folder.rstrip("/") + "/"
+    upper = prefix[:-1] + chr(ord("/") + 1)
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT path, inode, size, mtime_ns FROM media_files
+        WHERE path >= ? AND path < ?
+        """,
+        (prefix, upper)
+    )
+    state = {row[0]: (row[1], row[2], row[3]) for row in cur.fetchall()}
+
+    conn.close()
+    return state
+
+
+def upsert_media_batch(rows):
+    """
+    rows: list of (root, path, inode, size, mtime_ns, media_type,
+                   width, height, duration, indexed_at)
+    """
+    if not rows:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        """
+        INSERT INTO media_files
+        (root, path, inode, size, mtime_ns, media_type,
+         width, height, duration, indexed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            inode = excluded.inode,
+            size = excluded.size,
+            mtime_ns = excluded.mtime_ns,
+            media_type = excluded.media_type,
+            width = excluded.width,
+            height = excluded.height,
+            duration = excluded.duration,
+            indexed_at = excluded.indexed_at
+        """,
+        rows
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def delete_media_paths(paths):
+    if not paths:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        "DELETE FROM media_files WHERE path = ?",
+        [(p,) for p in paths]
+    )
+    cur.executemany(
+        "DELETE FROM hls_playlists WHERE path = ?",
+        [(p,) for p in paths]
+    )
+
+    conn.commit()
+    conn.close()
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def list_media(media_type=None, limit=100, offset=0):
+    conn = get_db()
+    cur = conn.cursor()
+
+    if media_type:
+        cur.execute(
+            """
+            SELECT id, root, path, size, mtime_ns, media_type,
+                   width, height, duration
+            FROM media_files
+            WHERE media_type = ?
+            ORDER BY path
+            LIMIT ? OFFSET ?
+            """,
+            (media_type, limit, offset)
+        )
+    else:
+        cur.execute(
+            """
+            SELECT id, root, path, size, mtime_ns, media_type,
+                   width, height, duration
+            FROM media_files
+            ORDER BY path
+            LIMIT ? OFFSET ?
+            """,
+            (limit, offset)
+        )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def get_media_by_id(media_id):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT id, root, path, size, mtime_ns, media_type,
+               width, height, duration
+        FROM media_files
+        WHERE id = ?
+        """,
+        (media_id,)
+    )
+
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+def media_stats():
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT media_type, COUNT(*), COALESCE(SUM(size), 0)
+        FROM media_files
+        GROUP BY media_type
+        """
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+
+    return {
+        media_type: {"count": count, "size": size}
+        for media_type, count, size in rows
+    }
+
+
+# =====================================================
+# HLS PLAYLIST CACHE
+# =====================================================
+
+def get_hls_playlist(path, size, mtime_ns):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT playlist FROM hls_playlists
+        WHERE path = ? AND size = ? AND mtime_ns = ?
+        """,
+        (path, size, mtime_ns)
+    )
+
+    row = cur.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def save_hls_playlist(path, size, mtime_ns, playlist):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        INSERT INTO hls_playlists (path, size, mtime_ns, playlist, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            size = excluded.size,
+            mtime_ns = excluded.mtime_ns,
+            playlist = excluded.playlist,
+            created_at = excluded.created_at
+        """,
+        (path, size, mtime_ns, playlist, datetime.utcnow().isoformat())
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def delete_hls_playlist(path):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute("DELETE FROM hls_playlists WHERE path = ?", (path,))
+
+    conn.commit()
+    conn.close()
@@ -0,0 +1,162 @@
+"""
+migrate.py
+Migrasi skema berversi (PRAGMA user_version).
+
+File migrasi: app/migrations/NNNN_nama.py dengan fungsi upgrade(cur),
+dijalankan berurutan sesuai nomor. Saat skema sudah terbaru, startup
+cukup satu kali baca user_version.
+
+    python -m app.repositories.migrate          # jalankan migrasi
+    python -m app.repositories.migrate --status # versi sekarang / terbaru
+"""
+
+import os
+import re
+import sys
+import argparse
+import importlib
+import threading
+
+from core.cms_bash_folder import DB_PATH
+from core.cms_logger import get_logger
+from core.cms_db import connect
+
+
+log = get_logger("CMS_MIGRATE")
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "migrations"
+)
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+LOCK_TIMEOUT_MS = 120_000   # worker lain menunggu migrasi yang sedang jalan
+
+_lock = threading.Lock()
+
+
+# =====================================================
+# HELPER UNTUK FILE MIGRASI
+# =====================================================
+
+def add_column(cur, table, column, ddl):
+    """
+    ALTER TABLE ADD COLUMN jika kolom belum ada
+    (database lama yang dibuat sebelum versioning)
+    """
+    cur.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cur.fetchall()]:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# =====================================================
+# DISCOVERY
+# =====================================================
+
+def discover():
+    """
+    Return list (versi, nama modul) terurut. Nomor harus unik.
+    """
+    found = {}
+
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+
+        version = int(match.group(1))
+        if version in found:
+            raise ValueError(f"Nomor migrasi ganda: {match.group(1)}")
+        found[version] = filename[:-3]
+
+    return sorted(found.items())
+
+
+def latest_version():
+    migrations = discover()
+    return migrations[-1][0] if migrations else 0
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# =====================================================
+# RUNNER
+# =====================================================
+
+def run_migrations(path=DB_PATH):
+    """
+    Bawa skema ke versi terbaru. Semua migrasi tertunda berjalan dalam
+    satu transaksi BEGIN IMMEDIATE: worker lain yang boot bersamaan
+    menunggu lock, lalu melihat versi sudah naik dan tidak mengulang.
+    Return versi skema.
+    """
+    migrations = discover()
+    target = migrations[-1][0] if migrations else 0
+
+    with _lock:
+        conn = connect(path)
+        conn.isolation_level = None  # transaksi diatur manual
+
+        try:
+            version = current_version(conn)
+            if version >= target:
+                return version
+
+            conn.execute(f"PRAGMA busy_timeout = {LOCK_TIMEOUT_MS}")
+            conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                # dibaca ulang di dalam lock: mungkin sudah dimigrasi
+                version = current_version(conn)
+                cur = conn.cursor()
+
+                for number, name in migrations:
+                    if number <= version:
+                        continue
+
+                    log.info(f"[MIGRATE] {name}")
+                    module = importlib.import_module(f"app.migrations.{name}")
+                    module.upgrade(cur)
+
+                if target > version:
+                    cur.execute(f"PRAGMA user_version = {target}")
+
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                log.exception("[MIGRATE] Gagal, skema tidak berubah")
+                raise
+
+            if target > version:
+                log.info(f"[MIGRATE] Skema v{version} -> v{target}")
+            return max(version, target)
+        finally:
+            conn.dispose()
+
+
+# =====================================================
+# CLI
+# =====================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrasi skema database")
+    parser.add_argument("--status", action="store_true",
+                        help="tampilkan versi tanpa migrasi")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        conn = connect()
+        try:
+            print(f"versi: {current_version(conn)} / {latest_version()}")
+        finally:
+            conn.dispose()
+        return 0
+
+    print(f"versi: {run_migrations()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
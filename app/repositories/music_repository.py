@@ -0,0 +1,241 @@
+"""
+music_repository.py
+Akses database library musik: artist, album & track (SQLite)
+"""
+
+from app.repositories.db import get_db
+
+
+UNKNOWN_ARTIST = "Unknown Artist"
+UNKNOWN_ALBUM = "Unknown Album"
+
+
+# =====================================================
+# WRITE
+# =====================================================
+
+def _artist_id(cur, cache, name):
+    name = name or UNKNOWN_ARTIST
+    key = name.lower()
+
+    if key not in cache:
+        cur.execute(
+            "INSERT OR IGNORE INTO artists (name) VALUES (?)", (name,)
+        )
+        cur.execute("SELECT id FROM artists WHERE name = ?", (name,))
+        cache[key] = cur.fetchone()[0]
+
+    return cache[key]
+
+
+def _album_id(cur, cache, artist_id, title, year):
+    title = title or UNKNOWN_ALBUM
+    key = (artist_id, title.lower())
+
+    if key not in cache:
+        cur.execute(
+            """
+            INSERT OR IGNORE INTO albums (artist_id, title, year)
+            VALUES (?, ?, ?)
+            """,
+            (artist_id, title, year)
+        )
+        cur.execute(
+            "SELECT id FROM albums WHERE artist_id = ? AND title = ?",
+            (artist_id, title)
+        )
+        cache[key] = cur.fetchone()[0]
+
+    return cache[key]
+
+
+def upsert_tracks(items):
+    """
+    items: list of (path, tags) dari audio_tag_service.iter_tag_batches.
+    Album dikelompokkan per album_artist (fallback artist).
+    """
+    if not items:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+    artists = {}
+    albums = {}
+    rows = []
+
+    for path, tags in items:
+        artist_id = _artist_id(cur, artists, tags["artist"])
+        album_artist_id = _artist_id(
+            cur, artists, tags["album_artist"] or tags["artist"]
+        )
+        album_id = _album_id(
+            cur, albums, album_artist_id, tags["album"], tags["year"]
+        )
+        title = tags["title"] or path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+
+        rows.append((
+            path, title, artist_id, album_id,
+            tags["track"], tags["disc"], tags["year"],
+            tags["genre"], tags["duration"],
+        ))
+
+    cur.executemany(
+        """
+        INSERT INTO tracks
+        (path, title, artist_id, album_id, track_no, disc_no,
+         year, genre, duration)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            title = excluded.title,
+            artist_id = excluded.artist_id,
+            album_id = excluded.album_id,
+            track_no = excluded.track_no,
+            disc_no = excluded.disc_no,
+            year = excluded.year,
+            genre = excluded.genre,
+            duration = excluded.duration
+        """,
+        rows
+    )
+
+    _prune(cur)
+    conn.commit()
+    conn.close()
+
+
+def delete_tracks(paths):
+    if not paths:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        "DELETE FROM tracks WHERE path = ?",
+        [(p,) for p in paths]
+    )
+
+    _prune(cur)
+    conn.commit()
+    conn.close()
+
+
+def _prune(cur):
+    """
+    Hapus album / artist yang tidak lagi punya track
+    """
+    cur.execute("""
+    DELETE FROM albums
+    WHERE NOT EXISTS (SELECT 1 FROM tracks WHERE album_id = albums.id)
+    """)
+    cur.execute("""
+    DELETE FROM artists
+    WHERE NOT EXISTS (SELECT 1 FROM tracks WHERE artist_id = artists.id)
+      AND NOT EXISTS (SELECT 1 FROM albums WHERE artist_id = artists.id)
+    """)
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def untagged_audio_paths():
+    """
+    File audio di media index yang belum punya baris track
+    (index lama sebelum tahap tag ada, atau ekstraksi tertunda)
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT m.path FROM media_files m
+        LEFT JOIN tracks t ON t.path = m.path
+        WHERE m.media_type = 'audio' AND t.id IS NULL
+        """
+    )
+
+    paths = [row[0] for row in cur.fetchall()]
+    conn.close()
+    return paths
+
+
+def list_artists():
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT a.id, a.name, COUNT(t.id)
+        FROM artists a
+        LEFT JOIN tracks t ON t.artist_id = a.id
+        GROUP BY a.id
+        ORDER BY a.name
+        """
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def list_albums(artist_id=None):
+    conn = get_db()
+    cur = conn.cursor()
+
+    query = """
+        SELECT al.id, al.title, al.year, ar.id, ar.name, COUNT(t.id)
+        FROM albums al
+        JOIN artists ar ON ar.id = al.artist_id
+        LEFT JOIN tracks t ON t.album_id = al.id
+    """
+
+    if artist_id is not None:
+        cur.execute(
+            query + " WHERE al.artist_id = ? "
+            "GROUP BY al.id ORDER BY al.year, al.title",
+            (artist_id,)
+        )
+    else:
+        cur.execute(query + " GROUP BY al.id ORDER BY al.title")
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def list_tracks(artist_id=None, album_id=None, limit=500, offset=0):
+    """
+    Track + id media_files (untuk URL streaming /files/media/<id>)
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    where = []
+    params = []
+
+    if artist_id is not None:
+        where.append("t.artist_id = ?")
+        params.append(artist_id)
+    if album_id is not None:
+        where.append("t.album_id = ?")
+        params.append(album_id)
+
+    cur.execute(
+        f"""
+        SELECT t.id, m.id, t.title, ar.name, al.title,
+               t.track_no, t.disc_no, t.year, t.genre, t.duration
+        FROM tracks t
+        JOIN artists ar ON ar.id = t.artist_id
+        JOIN albums al ON al.id = t.album_id
+        LEFT JOIN media_files m ON m.path = t.path
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY ar.name, al.title, t.disc_no, t.track_no, t.title
+        LIMIT ? OFFSET ?
+        """,
+        params + [limit, offset]
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
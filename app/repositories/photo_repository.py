@@ -0,0 +1,173 @@
+"""
+photo_repository.py
+Akses database timeline foto (EXIF) dengan keyset pagination
+"""
+
+from app.repositories.db import get_db
+
+
+PHOTO_COLUMNS = """
+    id, path, owner, taken_at, date_source, orientation,
+    width, height, has_gps, camera
+"""
+
+
+# =====================================================
+# WRITE
+# =====================================================
+
+def upsert_photos(rows):
+    """
+    rows: list of (path, owner, info) dengan info dari
+    exif_service.read_exif
+    """
+    if not rows:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        """
+        INSERT INTO photos
+        (path, owner, taken_at, date_source, orientation,
+         width, height, has_gps, camera)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            owner = excluded.owner,
+            taken_at = excluded.taken_at,
+            date_source = excluded.date_source,
+            orientation = excluded.orientation,
+            width = excluded.width,
+            height = excluded.height,
+            has_gps = excluded.has_gps,
+            camera = excluded.camera
+        """,
+        [
+            (
+                path, owner, info["taken_at"], info["date_source"],
+                info["orientation"], info["width"], info["height"],
+                int(bool(info["has_gps"])), info["camera"],
+            )
+            for path, owner, info in rows
+            if info["taken_at"]
+        ]
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def delete_photos(paths):
+    if not paths:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        "DELETE FROM photos WHERE path = ?",
+        [(p,) for p in paths]
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def move_photo(old_path, new_path):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        "UPDATE OR REPLACE photos SET path = ? WHERE path = ?",
+        (new_path, old_path)
+    )
+
+    conn.commit()
+    conn.close()
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def unindexed_image_paths():
+    """
+    Gambar di media index yang belum punya baris foto
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT m.path FROM media_files m
+        LEFT JOIN photos p ON p.path = m.path
+        WHERE m.media_type = 'image' AND p.id IS NULL
+        """
+    )
+
+    paths = [row[0] for row in cur.fetchall()]
+    conn.close()
+    return paths
+
+
+def get_photo(photo_id):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        f"SELECT {PHOTO_COLUMNS} FROM photos WHERE id = ?",
+        (photo_id,)
+    )
+
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+def _owner_clause(owner):
+    if owner is None:
+        return "owner IS NULL", []
+    return "owner = ?", [owner]
+
+
+def timeline_page(owners, before=None, limit=60):
+    """
+    Keyset pagination: foto terbaru dulu, mulai sebelum
+    before = (taken_at, id). owners: list owner (None = library).
+    Tiap owner memakai index (owner, taken_at, id) sendiri,
+    lalu digabung (UNION ALL) & dipotong limit.
+    """
+    parts = []
+    params = []
+
+    for owner in owners:
+        clause, args = _owner_clause(owner)
+        if before:
+            clause += " AND (taken_at, id) < (?, ?)"
+            args = args + list(before)
+
+        parts.append(
+            f"""
+            SELECT * FROM (
+                SELECT {PHOTO_COLUMNS} FROM photos
+                WHERE {clause}
+                ORDER BY taken_at DESC, id DESC
+                LIMIT ?
+            )
+            """
+        )
+        params += args + [limit]
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        " UNION ALL ".join(parts)
+        + " ORDER BY taken_at DESC, id DESC LIMIT ?",
+        params + [limit]
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
@@ -0,0 +1,288 @@
+"""
+playlist_repository.py
+Akses database playlist & entry playlist (SQLite)
+"""
+
+from datetime import datetime
+
+from app.repositories.db import get_db
+
+
+def _touch(cur, playlist_id):
+    cur.execute(
+        "UPDATE playlists SET updated_at = ? WHERE id = ?",
+        (datetime.utcnow().isoformat(), playlist_id)
+    )
+
+
+# =====================================================
+# PLAYLIST
+# =====================================================
+
+def create_playlist(owner, name):
+    now = datetime.utcnow().isoformat()
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        INSERT INTO playlists (owner, name, created_at, updated_at)
+        VALUES (?, ?, ?, ?)
+        """,
+        (owner, name, now, now)
+    )
+    playlist_id = cur.lastrowid
+
+    conn.commit()
+    conn.close()
+    return playlist_id
+
+
+def get_playlist(playlist_id):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT id, owner, name, created_at, updated_at
+        FROM playlists WHERE id = ?
+        """,
+        (playlist_id,)
+    )
+
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+def list_playlists(owner):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT p.id, p.name, p.updated_at, COUNT(e.id)
+        FROM playlists p
+        LEFT JOIN playlist_entries e ON e.playlist_id = p.id
+        WHERE p.owner = ?
+        GROUP BY p.id
+        ORDER BY p.name COLLATE NOCASE
+        """,
+        (owner,)
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def rename_playlist(playlist_id, name):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        "UPDATE playlists SET name = ? WHERE id = ?",
+        (name, playlist_id)
+    )
+    _touch(cur, playlist_id)
+
+    conn.commit()
+    conn.close()
+
+
+def delete_playlist(playlist_id):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        "DELETE FROM playlist_entries WHERE playlist_id = ?",
+        (playlist_id,)
+    )
+    cur.execute("DELETE FROM playlists WHERE id = ?", (playlist_id,))
+
+    conn.commit()
+    conn.close()
+
+
+# =====================================================
+# ENTRY
+# =====================================================
+
+def existing_media_ids(media_ids, media_types=("audio", "video")):
+    """
+    Subset media_ids yang ada di index library dengan tipe yang cocok
+    """
+    if not media_ids:
+        return set()
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    marks = ",".join("?" * len(media_types))
+    found = set()
+    ids = list(media_ids)
+
+    # batas jumlah parameter SQLite
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cur.execute(
+            f"""
+            SELECT id FROM media_files
+            WHERE id IN ({",".join("?" * len(chunk))})
+              AND media_type IN ({marks})
+            """,
+            chunk + list(media_types)
+        )
+        found.update(row[0] for row in cur.fetchall())
+
+    conn.close()
+    return found
+
+
+def edge_position(playlist_id, last=True):
+    """
+    Kunci urutan entry terakhir (last=True) / pertama, None jika kosong
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        f"""
+        SELECT {"MAX" if last else "MIN"}(position)
+        FROM playlist_entries WHERE playlist_id = ?
+        """,
+        (playlist_id,)
+    )
+
+    position = cur.fetchone()[0]
+    conn.close()
+    return position
+
+
+def entry_position(playlist_id, entry_id):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT position FROM playlist_entries
+        WHERE playlist_id = ? AND id = ?
+        """,
+        (playlist_id, entry_id)
+    )
+
+    row = cur.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def neighbor_position(playlist_id, position, after=True, exclude_id=None):
+    """
+    Kunci entry tepat sesudah (after=True) / sebelum position,
+    memakai index (playlist_id, position): satu lookup, bukan scan
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    if after:
+        sql = """
+            SELECT position FROM playlist_entries
+            WHERE playlist_id = ? AND position > ? AND id != ?
+            ORDER BY position LIMIT 1
+        """
+    else:
+        sql = """
+            SELECT position FROM playlist_entries
+            WHERE playlist_id = ? AND position < ? AND id != ?
+            ORDER BY position DESC LIMIT 1
+        """
+
+    cur.execute(sql, (playlist_id, position, exclude_id or 0))
+
+    row = cur.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def add_entries(playlist_id, rows):
+    """
+    rows: list of (media_id, position)
+    """
+    now = datetime.utcnow().isoformat()
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        """
+        INSERT INTO playlist_entries (playlist_id, media_id, position, added_at)
+        VALUES (?, ?, ?, ?)
+        """,
+        [(playlist_id, media_id, position, now) for media_id, position in rows]
+    )
+    _touch(cur, playlist_id)
+
+    conn.commit()
+    conn.close()
+
+
+def move_entry(playlist_id, entry_id, position):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        UPDATE playlist_entries SET position = ?
+        WHERE playlist_id = ? AND id = ?
+        """,
+        (position, playlist_id, entry_id)
+    )
+    _touch(cur, playlist_id)
+
+    conn.commit()
+    conn.close()
+
+
+def delete_entry(playlist_id, entry_id):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        "DELETE FROM playlist_entries WHERE playlist_id = ? AND id = ?",
+        (playlist_id, entry_id)
+    )
+    deleted = cur.rowcount
+    _touch(cur, playlist_id)
+
+    conn.commit()
+    conn.close()
+    return deleted
+
+
+def list_entries(playlist_id):
+    """
+    Return list (entry_id, media_id, position, media_type, path,
+    duration, title, artist). Media yang sudah hilang dari library
+    tetap muncul dengan path None.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT e.id, e.media_id, e.position, m.media_type, m.path,
+               COALESCE(t.duration, m.duration), t.title, ar.name
+        FROM playlist_entries e
+        LEFT JOIN media_files m ON m.id = e.media_id
+        LEFT JOIN tracks t ON t.path = m.path
+        LEFT JOIN artists ar ON ar.id = t.artist_id
+        WHERE e.playlist_id = ?
+        ORDER BY e.position
+        """,
+        (playlist_id,)
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
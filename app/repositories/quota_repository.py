@@ -0,0 +1,156 @@
+"""
+quota_repository.py
+Counter pemakaian storage & kuota per user (SQLite)
+"""
+
+import time
+from datetime import datetime
+
+from app.repositories.db import get_db
+
+
+# =====================================================
+# READ
+# =====================================================
+
+def get_quota_row(username):
+    """
+    Return (used_bytes, quota_bytes) atau None
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        "SELECT used_bytes, quota_bytes FROM storage_quota WHERE username = ?",
+        (username,)
+    )
+
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+def top_consumers(limit=20):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT username, used_bytes, quota_bytes, updated_at
+        FROM storage_quota
+        ORDER BY used_bytes DESC
+        LIMIT ?
+        """,
+        (limit,)
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+# =====================================================
+# WRITE
+# =====================================================
+
+def add_usage(username, delta):
+    """
+    Update counter secara incremental (satu statement, atomic)
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        INSERT INTO storage_quota (username, used_bytes, updated_at)
+        VALUES (?, MAX(?, 0), ?)
+        ON CONFLICT(username) DO UPDATE SET
+            used_bytes = MAX(used_bytes + ?, 0),
+            updated_at = excluded.updated_at
+        """,
+        (username, delta, datetime.utcnow().isoformat(), delta)
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def reserve_usage(username, size, default_quota=None):
+    """
+    Tambah pemakaian hanya jika masih muat kuota, dalam satu UPDATE
+    bersyarat (cek + tambah atomic, upload paralel tidak bisa sama-sama
+    lolos). quota_bytes NULL -> default_quota (None = tanpa batas).
+    Return True jika berhasil dipesan.
+    """
+    now = datetime.utcnow().isoformat()
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO storage_quota (username, used_bytes, updated_at)
+        VALUES (?, 0, ?)
+        """,
+        (username, now)
+    )
+
+    cur.execute(
+        """
+        UPDATE storage_quota
+        SET used_bytes = used_bytes + ?, updated_at = ?
+        WHERE username = ?
+          AND (
+              COALESCE(quota_bytes, ?) IS NULL
+              OR used_bytes + ? <= COALESCE(quota_bytes, ?)
+          )
+        """,
+        (size, now, username, default_quota, size, default_quota)
+    )
+    reserved = cur.rowcount == 1
+
+    conn.commit()
+    conn.close()
+    return reserved
+
+
+def claim_reconcile(interval):
+    """
+    Klaim giliran rekonsiliasi (UPDATE bersyarat, satu pemenang
+    lintas worker). Return True jika proses ini yang menjalankan.
+    """
+    now = time.time()
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        UPDATE quota_reconcile_state SET last_run_at = ?
+        WHERE id = 1 AND last_run_at <= ?
+        """,
+        (now, now - interval)
+    )
+    claimed = cur.rowcount == 1
+
+    conn.commit()
+    conn.close()
+    return claimed
+
+
+def set_quota(username, quota_bytes):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        INSERT INTO storage_quota (username, quota_bytes, updated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(username) DO UPDATE SET
+            quota_bytes = excluded.quota_bytes
+        """,
+        (username, quota_bytes, datetime.utcnow().isoformat())
+    )
+
+    conn.commit()
+    conn.close()
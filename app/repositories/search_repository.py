@@ -0,0 +1,188 @@
+"""
+search_repository.py
+Index pencarian full-text (SQLite FTS5) untuk file upload & media library
+"""
+
+from app.repositories.db import get_db
+
+
+# bobot bm25 per kolom FTS: name, dir, meta
+RANK_WEIGHTS = (10.0, 2.0, 4.0)
+
+
+# =====================================================
+# WRITE
+# =====================================================
+
+def upsert_docs(rows):
+    """
+    rows: list of (path, owner, kind, name, dir, meta).
+    meta kosong tidak menimpa meta yang sudah ada (tag audio / EXIF
+    dari job metadata tetap ada saat index ulang nama file).
+    """
+    if not rows:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        """
+        INSERT INTO search_docs (path, owner, kind, name, dir, meta)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            owner = excluded.owner,
+            kind = excluded.kind,
+            name = excluded.name,
+            dir = excluded.dir,
+            meta = CASE WHEN excluded.meta != '' THEN excluded.meta
+                        ELSE search_docs.meta END
+        """,
+        rows
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def update_doc_meta(rows):
+    """
+    rows: list of (meta, path). Hanya dokumen yang sudah ada.
+    """
+    if not rows:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        "UPDATE search_docs SET meta = ? WHERE path = ? AND meta != ?",
+        [(meta, path, meta) for meta, path in rows]
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def delete_docs(paths):
+    if not paths:
+        return
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.executemany(
+        "DELETE FROM search_docs WHERE path = ?",
+        [(p,) for p in paths]
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def move_doc(old_path, new_path, name, folder):
+    """
+    Return False jika dokumen old_path belum ada
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    # dokumen basi di path tujuan (file dihapus di luar CMS) dibuang
+    # lewat DELETE biasa agar trigger FTS ikut jalan
+    cur.execute(
+        "DELETE FROM search_docs WHERE path = ? AND path != ?",
+        (new_path, old_path)
+    )
+    cur.execute(
+        "UPDATE search_docs SET path = ?, name = ?, dir = ? WHERE path = ?",
+        (new_path, name, folder, old_path)
+    )
+    moved = cur.rowcount > 0
+
+    conn.commit()
+    conn.close()
+    return moved
+
+
+def list_doc_paths(kind):
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute("SELECT path FROM search_docs WHERE kind = ?", (kind,))
+
+    paths = {row[0] for row in cur.fetchall()}
+    conn.close()
+    return paths
+
+
+def missing_media_docs():
+    """
+    File media library yang belum ada di index pencarian
+    (library yang di-index sebelum fitur search ada).
+    Return list (path, meta dari tabel track jika ada).
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT m.path,
+               TRIM(COALESCE(t.title, '') || ' ' ||
+                    COALESCE(ar.name, '') || ' ' ||
+                    COALESCE(al.title, '') || ' ' ||
+                    COALESCE(t.genre, '') || ' ' ||
+                    COALESCE(t.year, ''))
+        FROM media_files m
+        LEFT JOIN search_docs d ON d.path = m.path
+        LEFT JOIN tracks t ON t.path = m.path
+        LEFT JOIN artists ar ON ar.id = t.artist_id
+        LEFT JOIN albums al ON al.id = t.album_id
+        WHERE d.id IS NULL
+        """
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def search_docs(match, owner=None, kind=None, limit=50):
+    """
+    match: ekspresi FTS5 yang sudah di-escape (lihat search_service).
+    Dokumen tanpa owner (media library) terlihat semua user.
+    Return list (path, owner, kind, name, dir, meta, media_id, rank).
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    where = ["search_fts MATCH ?"]
+    params = [match]
+
+    if owner is not None:
+        where.append("(d.owner = ? OR d.owner IS NULL)")
+        params.append(owner)
+    if kind:
+        where.append("d.kind = ?")
+        params.append(kind)
+
+    cur.execute(
+        f"""
+        SELECT d.path, d.owner, d.kind, d.name, d.dir, d.meta, m.id,
+               bm25(search_fts, ?, ?, ?) AS rank
+        FROM search_fts
+        JOIN search_docs d ON d.id = search_fts.rowid
+        LEFT JOIN media_files m ON m.path = d.path
+        WHERE {" AND ".join(where)}
+        ORDER BY rank
+        LIMIT ?
+        """,
+        list(RANK_WEIGHTS) + params + [limit]
+    )
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
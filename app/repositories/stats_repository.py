@@ -1,22 +1,106 @@
+"""
+stats_repository.py
+Statistik user dari tabel user_counters (dijaga trigger SQLite),
+dashboard tidak lagi COUNT(*) ke tabel users
+"""
+
+from datetime import datetime, timedelta
+
 from app.repositories.db import get_db
 
-def user_stats():
+
+RECENT_DAYS = 7   # jendela "baru-baru ini" (signup & login)
+
+# Nama counter (tabel & trigger: migrations/0012_user_counters.py):
+#   total, active, locked, logins   -> angka global
+#   role:<role>                     -> jumlah user per role
+#   day:<YYYY-MM-DD>:signup|login   -> bucket harian
+
+
+# =====================================================
+# REBUILD
+# =====================================================
+
+def rebuild_user_counters():
+    """
+    Hitung ulang counter dari tabel users (full scan, hanya untuk
+    perbaikan; isi awal dilakukan migrasi 0012). Bucket login harian tidak bisa
+    direkonstruksi dan dibiarkan apa adanya.
+    """
     conn = get_db()
     cur = conn.cursor()
 
-    cur.execute("SELECT COUNT(*) FROM users")
-    total = cur.fetchone()[0]
+    cur.execute("BEGIN IMMEDIATE")
+    cur.execute(
+        "DELETE FROM user_counters "
+        "WHERE name NOT LIKE 'day:%:login' AND name != 'logins'"
+    )
 
-    cur.execute("SELECT COUNT(*) FROM users WHERE is_active = 1")
-    active = cur.fetchone()[0]
+    cur.execute("""
+    INSERT INTO user_counters (name, value)
+    SELECT 'total', COUNT(*) FROM users
+    UNION ALL
+    SELECT 'active', COUNT(*) FROM users WHERE is_active = 1
+    UNION ALL
+    SELECT 'locked', COUNT(*) FROM users WHERE is_active = 0
+    UNION ALL
+    SELECT 'role:' || role, COUNT(*) FROM users GROUP BY role
+    UNION ALL
+    SELECT 'day:' || substr(created_at, 1, 10) || ':signup', COUNT(*)
+    FROM users GROUP BY substr(created_at, 1, 10)
+    """)
+
+    conn.commit()
+    conn.close()
 
-    cur.execute("SELECT COUNT(*) FROM users WHERE is_active = 0")
-    locked = cur.fetchone()[0]
+
+# =====================================================
+# READ
+# =====================================================
+
+def user_stats(days=RECENT_DAYS):
+    """
+    Satu query ke user_counters (tabel kecil, tidak menyentuh users)
+    """
+    since = (datetime.utcnow() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT name, value FROM user_counters
+        WHERE name NOT LIKE 'day:%' OR name >= ?
+        """,
+        ("day:" + since,)
+    )
+    rows = cur.fetchall()
 
     conn.close()
 
-    return {
-        "total": total,
-        "active": active,
-        "locked": locked,
-    }
\ No newline at end of file
+    stats = {
+        "total": 0,
+        "active": 0,
+        "locked": 0,
+        "logins": 0,
+        "roles": {},
+        "recent_days": days,
+        "recent_signups": 0,
+        "recent_logins": 0,
+        "logins_today": 0,
+    }
+
+    for name, value in rows:
+        if name.startswith("role:"):
+            if value:
+                stats["roles"][name[5:]] = value
+        elif name.startswith("day:"):
+            _, day, kind = name.split(":")
+            stats[f"recent_{kind}s"] += value
+            if kind == "login" and day == today:
+                stats["logins_today"] = value
+        else:
+            stats[name] = value
+
+    return stats
@@ -3,42 +3,135 @@ user_repository.py
 Akses database user (SQLite)
 """
 
-import sqlite3
+import time
+import threading
 from typing import Optional
 
-from core.cms_bash_folder import DB_PATH
+from flask import g, has_app_context
+
+from core import cms_config
 from app.models.user_model import User
 from app.repositories.db import get_db
 
 
-# =====================================================
-# DB HELPER
-# =====================================================
+USER_CACHE_SIZE = 512   # user maksimal di cache proses
+GENERATION_CHECK = 2.0  # detik, jeda cek perubahan user dari worker lain
 
+_MISSING = object()
 
 
 # =====================================================
-# INIT TABLE
+# CACHE USER
+# - per request (flask.g): lookup berulang dalam 1 request
+# - per proses (TTL pendek): lintas request, CMS_USER_CACHE_TTL.
+#   Dikosongkan saat generation di user_cache_state berubah
+#   (trigger: user diubah / dihapus, termasuk oleh worker lain)
 # =====================================================
 
-def init_user_table():
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+_generation = None
+_generation_checked_at = 0.0
+
+
+def _cache_ttl():
+    return int(cms_config.get("CMS_USER_CACHE_TTL", "5"))
+
+
+def _request_cache():
+    if not has_app_context():
+        return None
+    if "_user_cache" not in g:
+        g._user_cache = {}
+    return g._user_cache
+
+
+def get_user_generation():
     conn = get_db()
     cur = conn.cursor()
 
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        role TEXT NOT NULL,
-        must_change_password INTEGER DEFAULT 0,
-        created_at TEXT NOT NULL
-    )
-    """)
+    cur.execute("SELECT generation FROM user_cache_state WHERE id = 1")
+    row = cur.fetchone()
 
-    conn.commit()
     conn.close()
-    migrate_users_table()
+    return row[0] if row else 0
+
+
+def _sync_generation():
+    """
+    User dikunci / diturunkan role-nya di worker lain: cache proses
+    ini paling lama basi GENERATION_CHECK detik
+    """
+    global _generation, _generation_checked_at
+
+    now = time.monotonic()
+    if now - _generation_checked_at < GENERATION_CHECK:
+        return
+
+    generation = get_user_generation()
+    with _user_cache_lock:
+        _generation_checked_at = now
+        if generation != _generation:
+            _user_cache.clear()
+            _generation = generation
+
+
+def _cached_user(username):
+    local = _request_cache()
+    if local is not None and username in local:
+        return local[username]
+
+    if not _cache_ttl():
+        return _MISSING
+
+    _sync_generation()
+
+    with _user_cache_lock:
+        item = _user_cache.get(username)
+    if item is None:
+        return _MISSING
+
+    user, expires_at = item
+    if expires_at < time.monotonic():
+        return _MISSING
+
+    if local is not None:
+        local[username] = user
+    return user
+
+
+def _store_user(username, user):
+    local = _request_cache()
+    if local is not None:
+        local[username] = user
+
+    # user tidak ada tidak di-cache lintas request (bisa dibuat worker lain)
+    ttl = _cache_ttl()
+    if not ttl or user is None:
+        return
+
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_SIZE:
+            _user_cache.clear()
+        _user_cache[username] = (user, time.monotonic() + ttl)
+
+
+def invalidate_user(username):
+    """
+    Buang user dari cache request & proses (dipanggil setiap write).
+    Worker lain menyusul lewat generation (trigger di tabel users).
+    """
+    global _generation_checked_at
+
+    local = _request_cache()
+    if local is not None:
+        local.pop(username, None)
+
+    with _user_cache_lock:
+        _user_cache.pop(username, None)
+        # paksa cek generation di lookup berikutnya
+        _generation_checked_at = 0.0
+
 
 # =====================================================
 # CREATE USER
@@ -71,6 +164,7 @@ def create_user(
 
     conn.commit()
     conn.close()
+    invalidate_user(username)
 
 
 # =====================================================
@@ -78,6 +172,14 @@ def create_user(
 # =====================================================
 
 def get_user_by_username(username):
+    user = _cached_user(username)
+    if user is _MISSING:
+        user = _fetch_user(username)
+        _store_user(username, user)
+    return user
+
+
+def _fetch_user(username) -> Optional[User]:
     conn = get_db()
     cur = conn.cursor()
 
@@ -134,6 +236,7 @@ def delete_user(username):
 
     conn.commit()
     conn.close()
+    invalidate_user(username)
 
 
 def update_user_role(username, role):
@@ -147,6 +250,7 @@ def update_user_role(username, role):
 
     conn.commit()
     conn.close()
+    invalidate_user(username)
 
 
 def update_password(username, password_hash, force_change=0):
@@ -164,6 +268,7 @@ def update_password(username, password_hash, force_change=0):
 
     conn.commit()
     conn.close()
+    invalidate_user(username)
 
 def set_user_active(username, active: bool):
     conn = get_db()
@@ -180,6 +285,23 @@ def set_user_active(username, active: bool):
 
     conn.commit()
     conn.close()
+    invalidate_user(username)
+
+def update_last_login(username, login_at):
+    """
+    Catat waktu login (trigger menaikkan counter login).
+    Kolom tidak ada di model User, cache tidak perlu dibuang.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+
+    cur.execute(
+        "UPDATE users SET last_login_at = ? WHERE username = ?",
+        (login_at, username)
+    )
+
+    conn.commit()
+    conn.close()
 
 def reset_user_password(username, password_hash):
     """
@@ -199,23 +321,4 @@ def reset_user_password(username, password_hash):
 
     conn.commit()
     conn.close()
-
-def migrate_users_table():
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("PRAGMA table_info(users)")
-    columns = [row[1] for row in cur.fetchall()]
-
-    if "is_active" not in columns:
-        cur.execute(
-            "ALTER TABLE users ADD COLUMN is_active INTEGER DEFAULT 1"
-        )
-
-    if "must_change_password" not in columns:
-        cur.execute(
-            "ALTER TABLE users ADD COLUMN must_change_password INTEGER DEFAULT 0"
-        )
-
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    invalidate_user(username)
@@ -16,7 +16,10 @@ from app.repositories.user_repository import (
     set_user_active,
 )
 from app.repositories.stats_repository import user_stats
+from app.services.file_service import storage_usage
+from app.repositories.quota_repository import top_consumers, set_quota
 from app.services.roles import ROLES
+from core.cms_jobs import job_stats, retry_failed
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -138,5 +141,57 @@ def reset_password(username):
 def admin_dashboard():
     return render_template(
         "admin_dashboard.html",
-        stats=user_stats()
+        stats=user_stats(),
+        storage=storage_usage()
     )
+
+
+@admin_bp.route("/storage")
+@root_required
+def storage():
+    return render_template(
+        "admin_storage.html",
+        consumers=top_consumers(50)
+    )
+
+
+@admin_bp.route("/quota", methods=["POST"])
+@root_required
+def change_quota():
+    username = request.form["username"]
+    quota_mb = request.form.get("quota_mb", "").strip()
+
+    try:
+        quota_bytes = int(quota_mb) * 1024 * 1024 if quota_mb else None
+    except ValueError:
+        quota_bytes = -1
+
+    if quota_bytes is not None and quota_bytes < 0:
+        flash("Kuota tidak valid", "error")
+        return render_template(
+            "admin_storage.html",
+            consumers=top_consumers(50)
+        ), 400
+
+    set_quota(username, quota_bytes)
+    log_admin_action(current_user(), "set_quota", f"{username}:{quota_mb}")
+
+    flash("Kuota berhasil diubah", "success")
+    return redirect("/admin/storage")
+
+
+@admin_bp.route("/jobs")
+@root_required
+def jobs():
+    return render_template("admin_jobs.html", stats=job_stats())
+
+
+@admin_bp.route("/jobs/retry", methods=["POST"])
+@root_required
+def retry_jobs():
+    job_id = request.form.get("job_id", type=int)
+    count = retry_failed(job_id)
+    log_admin_action(current_user(), "retry_jobs", str(job_id or "all"))
+
+    flash(f"{count} job diantrikan ulang", "success")
+    return redirect("/admin/jobs")
@@ -1,9 +1,14 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, url_for
 
-from app.services.api_token_service import generate_token
+from app.services.api_token_service import (
+    generate_token,
+    list_tokens,
+    revoke_user_token,
+)
 from app.services.api_auth_decorator import api_token_required
 from app.services.session_service import current_user
 from app.services.auth_decorators import login_required
+from app.services.gallery_service import gallery_page, DEFAULT_PAGE_SIZE
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
@@ -21,6 +26,26 @@ def create_token():
     })
 
 
+# -------------------------------
+# LIST / REVOKE TOKEN (LOGIN REQUIRED)
+# -------------------------------
+@api_bp.route("/tokens")
+@login_required
+def tokens():
+    return jsonify({"status": "ok", "tokens": list_tokens(current_user())})
+
+
+@api_bp.route("/tokens/<int:token_id>", methods=["DELETE"])
+@login_required
+def revoke(token_id):
+    try:
+        revoke_user_token(current_user(), token_id)
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+
+    return jsonify({"status": "ok"})
+
+
 # -------------------------------
 # PROTECTED API EXAMPLE
 # -------------------------------
@@ -30,4 +55,47 @@ def api_me():
     return jsonify({
         "user": request.api_user,
         "status": "ok"
-    })
\ No newline at end of file
+    })
+
+
+# -------------------------------
+# GALLERY (KEYSET PAGINATION BY TANGGAL AMBIL)
+# ?cursor=<next_cursor>&limit=60&scope=all|mine|library
+# -------------------------------
+@api_bp.route("/gallery")
+@login_required
+def api_gallery():
+    try:
+        rows, next_cursor = gallery_page(
+            current_user(),
+            scope=request.args.get("scope", "all"),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", DEFAULT_PAGE_SIZE, type=int),
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    return jsonify({
+        "status": "ok",
+        "photos": [
+            {
+                "id": photo_id,
+                "name": path.rsplit("/", 1)[-1],
+                "library": owner is None,
+                "taken_at": taken_at,
+                "date_source": date_source,
+                "orientation": orientation,
+                "width": width,
+                "height": height,
+                "has_gps": bool(has_gps),
+                "camera": camera,
+                "url": url_for("files.photo_file", photo_id=photo_id),
+                "thumb": url_for("files.photo_thumb", photo_id=photo_id),
+            }
+            for (
+                photo_id, path, owner, taken_at, date_source,
+                orientation, width, height, has_gps, camera
+            ) in rows
+        ],
+        "next_cursor": next_cursor,
+    })
@@ -7,6 +7,7 @@ from flask import Blueprint, render_template
 
 from app.services.auth_decorators import login_required
 from app.services.session_service import current_user, is_root
+from app.services.quota_service import get_usage
 
 dashboard_bp = Blueprint(
     "dashboard",
@@ -21,5 +22,6 @@ def dashboard_home():
     return render_template(
         "dashboard.html",
         user=current_user(),
-        is_root=is_root()
+        is_root=is_root(),
+        usage=get_usage(current_user())
     )
\ No newline at end of file
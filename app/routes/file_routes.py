@@ -1,15 +1,41 @@
+import os
+from urllib.parse import quote
+
 from flask import (
     Blueprint, render_template, request,
-    redirect, flash, send_from_directory
+    redirect, flash, abort, Response, url_for
 )
+from werkzeug.utils import safe_join
 
 from app.services.auth_decorators import login_required, root_required
 from app.services.session_service import current_user, is_root
 from app.services.file_service import (
     save_user_file,
     list_user_files,
-    list_all_files,
-    get_user_upload_dir
+    get_user_upload_dir,
+    delete_user_file,
+    rename_user_file,
+)
+from app.services.batch_file_service import run_batch
+from app.services.stream_service import resolve_file, send_file_ranged
+from app.services.thumbnail_service import get_thumbnail, DEFAULT_SIZE
+from app.services.mp4_service import MP4ParseError, get_playlist
+from app.services.search_service import search
+from app.services.media_index_service import MEDIA_ROOTS, library_media_path
+from app.repositories.photo_repository import get_photo
+from app.services.zip_service import iter_folder_files, stream_zip
+from app.services.inventory_service import (
+    query_inventory,
+    inventory_users,
+    SORT_KEYS,
+)
+from app.services.upload_service import (
+    UploadOffsetError,
+    init_upload,
+    write_chunk,
+    get_upload_status,
+    finalize_upload,
+    abort_upload,
 )
 
 file_bp = Blueprint("files", __name__, url_prefix="/files")
@@ -31,42 +57,321 @@ def user_files():
 
         return redirect(f"/files?dir={subdir}")
 
-    files = list_user_files(username, subdir)
+    sort = request.args.get("sort", "name")
+    order = request.args.get("order", "asc")
+
+    try:
+        listing = list_user_files(
+            username, subdir,
+            sort=sort,
+            order=order,
+            cursor=request.args.get("cursor"),
+        )
+    except ValueError as e:
+        flash(str(e), "error")
+        return redirect(url_for("files.user_files", dir=subdir))
+
     return render_template(
         "files.html",
-        files=files,
-        subdir=subdir
+        files=listing["entries"],
+        total=listing["total"],
+        next_cursor=listing["next_cursor"],
+        subdir=subdir,
+        sort=sort,
+        order=order
     )
 
 
+@file_bp.route("/api/list")
+@login_required
+def api_list():
+    try:
+        listing = list_user_files(
+            current_user(),
+            request.args.get("dir", ""),
+            sort=request.args.get("sort", "name"),
+            order=request.args.get("order", "asc"),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", 200, type=int),
+        )
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}, 400
+
+    return {"status": "ok", **listing}
+
+
 @file_bp.route("/download/<filename>")
 @login_required
 def download_file(filename):
     username = current_user()
     directory = get_user_upload_dir(username)
-    return send_from_directory(directory, filename, as_attachment=True)
+    path = resolve_file(directory, filename)
+    return send_file_ranged(
+        path,
+        as_attachment=True,
+        cache_policy="download",
+        offload=True
+    )
+
+
+@file_bp.route("/download-folder")
+@login_required
+def download_folder():
+    username = current_user()
+    subdir = request.args.get("dir", "")
+
+    base = get_user_upload_dir(username)
+    folder = safe_join(base, subdir) if subdir else base
+
+    if folder is None or not os.path.isdir(folder):
+        abort(404)
+
+    name = os.path.basename(folder.rstrip(os.sep)) or username
+    if folder == base:
+        name = username
+
+    return Response(
+        stream_zip(iter_folder_files(folder)),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename*=UTF-8''{quote(name)}.zip"
+            ),
+            "Cache-Control": "no-store",
+        },
+        direct_passthrough=True,
+    )
 
 
 @file_bp.route("/admin")
 @root_required
 def admin_files():
+    sort = request.args.get("sort", "name")
+    order = request.args.get("order", "asc")
+    user = request.args.get("user", "")
+    ext = request.args.get("ext", "")
+
+    result = query_inventory(
+        user=user or None,
+        ext=ext or None,
+        sort=sort if sort in SORT_KEYS else "name",
+        order=order,
+        page=request.args.get("page", 1, type=int),
+    )
+
     return render_template(
         "admin_files.html",
-        files=list_all_files()
+        result=result,
+        users=inventory_users(),
+        user=user,
+        ext=ext,
+        sort=sort,
+        order=order
+    )
+
+# =====================================================
+# SEARCH (FTS5)
+# =====================================================
+
+def _search_results(query, kind=None, limit=50):
+    results = search(query, current_user(), kind=kind, limit=limit)
+
+    for item in results:
+        if item["kind"] == "media":
+            item["url"] = (
+                url_for("files.media_stream", media_id=item["media_id"])
+                if item["media_id"] else None
+            )
+        elif item["dir"]:
+            item["url"] = url_for("files.user_files", dir=item["dir"])
+        else:
+            item["url"] = url_for("files.preview_file", filename=item["name"])
+
+    return results
+
+
+@file_bp.route("/search")
+@login_required
+def search_files():
+    query = request.args.get("q", "").strip()
+    results = _search_results(query) if query else []
+
+    return render_template(
+        "search.html",
+        query=query,
+        results=results
     )
 
+
+@file_bp.route("/api/search")
+@login_required
+def api_search():
+    query = request.args.get("q", "").strip()
+    kind = request.args.get("kind")
+
+    if kind not in (None, "", "upload", "media"):
+        return {"status": "error", "message": "kind tidak valid"}, 400
+
+    return {
+        "status": "ok",
+        "query": query,
+        "results": _search_results(
+            query,
+            kind=kind or None,
+            limit=request.args.get("limit", 50, type=int)
+        ),
+    }
+
 @file_bp.route("/preview/<filename>")
 @login_required
 def preview_file(filename):
     username = current_user()
     directory = get_user_upload_dir(username)
+    path = resolve_file(directory, filename)
+
+    return send_file_ranged(
+        path,
+        as_attachment=False,
+        cache_policy="preview",
+        offload=True
+    )
+
+# =====================================================
+# VIDEO (HLS BYTE-RANGE)
+# =====================================================
+
+def _hls_response(path, uri):
+    try:
+        playlist = get_playlist(path, uri)
+    except MP4ParseError as e:
+        return {"status": "error", "message": str(e)}, 415
+
+    return Response(
+        playlist,
+        mimetype="application/vnd.apple.mpegurl",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def _library_media_path(media_id):
+    path = library_media_path(media_id)
+    if path is None:
+        abort(404)
+    return path
+
+
+@file_bp.route("/video/<filename>/playlist.m3u8")
+@login_required
+def video_playlist(filename):
+    username = current_user()
+    directory = get_user_upload_dir(username)
+    path = resolve_file(directory, filename)
+
+    # segmen = byte-range ke file asli lewat route preview (Range aware)
+    return _hls_response(
+        path,
+        url_for("files.preview_file", filename=filename)
+    )
+
+
+@file_bp.route("/media/<int:media_id>")
+@login_required
+def media_stream(media_id):
+    return send_file_ranged(
+        _library_media_path(media_id),
+        cache_policy="preview",
+        offload=True
+    )
+
+
+@file_bp.route("/media/<int:media_id>/playlist.m3u8")
+@login_required
+def media_playlist(media_id):
+    return _hls_response(
+        _library_media_path(media_id),
+        url_for("files.media_stream", media_id=media_id)
+    )
+
+# =====================================================
+# FOTO (GALLERY)
+# =====================================================
+
+def _photo_path(photo_id):
+    """
+    Foto library terlihat semua user, foto upload hanya pemiliknya
+    (dan root)
+    """
+    row = get_photo(photo_id)
+    if row is None:
+        abort(404)
+
+    path, owner = row[1], row[2]
+
+    if owner is None:
+        root = MEDIA_ROOTS["pictures"]
+        if not path.startswith(root.rstrip("/") + "/"):
+            abort(404)
+    elif owner != current_user() and not is_root():
+        abort(404)
+
+    if not os.path.isfile(path):
+        abort(404)
+
+    return path
 
-    return send_from_directory(
-        directory,
-        filename,
-        as_attachment=False
+
+def _thumb_policy():
+    """
+    Cache lama (CMS_CACHE_THUMB) hanya untuk URL berversi (?v=mtime):
+    file yang diganti dengan nama sama dapat URL baru. Tanpa versi
+    -> no-cache, browser revalidasi lewat ETag (304).
+    """
+    return "thumb" if request.args.get("v") else "download"
+
+
+@file_bp.route("/photo/<int:photo_id>")
+@login_required
+def photo_file(photo_id):
+    return send_file_ranged(
+        _photo_path(photo_id),
+        cache_policy="preview",
+        offload=True
     )
 
+
+@file_bp.route("/photo/<int:photo_id>/thumb")
+@login_required
+def photo_thumb(photo_id):
+    path = _photo_path(photo_id)
+    thumb = get_thumbnail(path, request.args.get("size", DEFAULT_SIZE))
+
+    if thumb is None:
+        return send_file_ranged(path, cache_policy="preview")
+
+    return send_file_ranged(thumb, cache_policy=_thumb_policy())
+
+
+@file_bp.route("/gallery")
+@login_required
+def gallery():
+    return render_template("gallery.html")
+
+@file_bp.route("/thumb/<filename>")
+@login_required
+def thumb_file(filename):
+    username = current_user()
+    directory = get_user_upload_dir(username)
+    path = resolve_file(directory, filename)
+
+    size = request.args.get("size", DEFAULT_SIZE)
+    thumb = get_thumbnail(path, size)
+
+    # Pillow tidak tersedia / bukan gambar -> kirim file asli
+    if thumb is None:
+        return send_file_ranged(path, cache_policy="preview")
+
+    return send_file_ranged(thumb, cache_policy=_thumb_policy())
+
 @file_bp.route("/delete/<filename>")
 @login_required
 def delete_file(filename):
@@ -99,6 +404,43 @@ def rename_file(filename):
         filename=filename
     )
 
+# =====================================================
+# BATCH (DELETE / MOVE / RENAME)
+# =====================================================
+
+@file_bp.route("/api/batch", methods=["POST"])
+@login_required
+def api_batch():
+    """
+    Body: {"operations": [
+        {"op": "delete", "path": "sub/a.txt"},
+        {"op": "move", "path": "a.txt", "to": "arsip/2024"},
+        {"op": "rename", "path": "b.txt", "name": "c.txt"}
+    ]}
+    """
+    data = request.get_json(silent=True) or {}
+
+    try:
+        ok, results = run_batch(current_user(), data.get("operations"))
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}, 400
+
+    if not ok:
+        return {
+            "status": "error",
+            "message": "Ada operasi yang tidak valid, tidak ada yang dijalankan",
+            "results": results,
+        }, 400
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+
+    return {
+        "status": "ok" if not failed else "partial",
+        "done": len(results) - failed,
+        "failed": failed,
+        "results": results,
+    }
+
 @file_bp.route("/api/upload", methods=["POST"])
 @login_required
 def api_upload():
@@ -123,4 +465,100 @@ def api_upload():
         return {
             "status": "error",
             "message": str(e)
-        }, 400
\ No newline at end of file
+        }, 400
+
+# =====================================================
+# CHUNKED / RESUMABLE UPLOAD API
+# =====================================================
+
+@file_bp.route("/api/upload/init", methods=["POST"])
+@login_required
+def api_upload_init():
+    data = request.get_json(silent=True) or request.form
+
+    try:
+        session = init_upload(
+            current_user(),
+            data.get("filename"),
+            data.get("size"),
+            data.get("dir", "")
+        )
+        return {"status": "ok", **session}
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }, 400
+
+
+@file_bp.route("/api/upload/<upload_id>", methods=["PUT"])
+@login_required
+def api_upload_chunk(upload_id):
+    offset = request.headers.get(
+        "Upload-Offset",
+        request.args.get("offset")
+    )
+
+    try:
+        new_offset = write_chunk(
+            current_user(),
+            upload_id,
+            offset,
+            request.stream
+        )
+        return {"status": "ok", "offset": new_offset}
+    except UploadOffsetError as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "offset": e.offset
+        }, 409
+    except FileNotFoundError as e:
+        return {"status": "error", "message": str(e)}, 404
+    except Exception as e:
+        return {"status": "error", "message": str(e)}, 400
+
+
+@file_bp.route("/api/upload/<upload_id>", methods=["GET"])
+@login_required
+def api_upload_status(upload_id):
+    try:
+        return {
+            "status": "ok",
+            **get_upload_status(current_user(), upload_id)
+        }
+    except FileNotFoundError as e:
+        return {"status": "error", "message": str(e)}, 404
+
+
+@file_bp.route("/api/upload/<upload_id>", methods=["DELETE"])
+@login_required
+def api_upload_abort(upload_id):
+    try:
+        abort_upload(current_user(), upload_id)
+        return {"status": "ok"}
+    except FileNotFoundError as e:
+        return {"status": "error", "message": str(e)}, 404
+
+
+@file_bp.route("/api/upload/<upload_id>/finalize", methods=["POST"])
+@login_required
+def api_upload_finalize(upload_id):
+    try:
+        meta = get_upload_status(current_user(), upload_id)
+        filename = finalize_upload(current_user(), upload_id)
+        return {
+            "status": "ok",
+            "filename": filename,
+            "folder": meta["folder"]
+        }
+    except UploadOffsetError as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "offset": e.offset
+        }, 409
+    except FileNotFoundError as e:
+        return {"status": "error", "message": str(e)}, 404
+    except Exception as e:
+        return {"status": "error", "message": str(e)}, 400
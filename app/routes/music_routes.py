@@ -0,0 +1,89 @@
+from flask import Blueprint, jsonify, request, url_for
+
+from app.services.auth_decorators import login_required
+from app.repositories.music_repository import (
+    list_artists,
+    list_albums,
+    list_tracks,
+)
+
+music_bp = Blueprint("music", __name__, url_prefix="/music")
+
+
+# -------------------------------
+# ARTIST
+# -------------------------------
+@music_bp.route("/api/artists")
+@login_required
+def api_artists():
+    return jsonify({
+        "status": "ok",
+        "artists": [
+            {"id": artist_id, "name": name, "tracks": tracks}
+            for artist_id, name, tracks in list_artists()
+        ]
+    })
+
+
+# -------------------------------
+# ALBUM (?artist=<id>)
+# -------------------------------
+@music_bp.route("/api/albums")
+@login_required
+def api_albums():
+    artist_id = request.args.get("artist", type=int)
+
+    return jsonify({
+        "status": "ok",
+        "albums": [
+            {
+                "id": album_id,
+                "title": title,
+                "year": year,
+                "artist_id": album_artist_id,
+                "artist": artist,
+                "tracks": tracks,
+            }
+            for album_id, title, year, album_artist_id, artist, tracks
+            in list_albums(artist_id)
+        ]
+    })
+
+
+# -------------------------------
+# TRACK (?artist=<id>&album=<id>)
+# -------------------------------
+@music_bp.route("/api/tracks")
+@login_required
+def api_tracks():
+    rows = list_tracks(
+        artist_id=request.args.get("artist", type=int),
+        album_id=request.args.get("album", type=int),
+        limit=min(request.args.get("limit", 500, type=int), 1000),
+        offset=max(request.args.get("offset", 0, type=int), 0),
+    )
+
+    return jsonify({
+        "status": "ok",
+        "tracks": [
+            {
+                "id": track_id,
+                "title": title,
+                "artist": artist,
+                "album": album,
+                "track": track_no,
+                "disc": disc_no,
+                "year": year,
+                "genre": genre,
+                "duration": duration,
+                "url": (
+                    url_for("files.media_stream", media_id=media_id)
+                    if media_id else None
+                ),
+            }
+            for (
+                track_id, media_id, title, artist, album,
+                track_no, disc_no, year, genre, duration
+            ) in rows
+        ]
+    })
@@ -0,0 +1,161 @@
+from urllib.parse import quote
+
+from flask import Blueprint, jsonify, request, Response, abort
+
+from app.services.auth_decorators import login_required
+from app.services.session_service import current_user
+from app.services.stream_service import send_file_ranged
+from app.services.media_index_service import library_media_path
+from app.services.playlist_service import (
+    user_playlists,
+    new_playlist,
+    rename_user_playlist,
+    delete_user_playlist,
+    playlist_detail,
+    add_media,
+    move_media,
+    remove_media,
+    export_m3u8,
+    verify_media_token,
+)
+
+playlist_bp = Blueprint("playlists", __name__, url_prefix="/playlists")
+
+
+def _error(e):
+    status = 404 if isinstance(e, FileNotFoundError) else 400
+    return jsonify({"status": "error", "message": str(e)}), status
+
+
+# -------------------------------
+# PLAYLIST (LIST / CREATE)
+# -------------------------------
+@playlist_bp.route("/api", methods=["GET", "POST"])
+@login_required
+def api_playlists():
+    username = current_user()
+
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        try:
+            playlist_id = new_playlist(username, data.get("name"))
+        except ValueError as e:
+            return _error(e)
+        return jsonify({"status": "ok", "id": playlist_id}), 201
+
+    return jsonify({"status": "ok", "playlists": user_playlists(username)})
+
+
+# -------------------------------
+# PLAYLIST (DETAIL / RENAME / DELETE)
+# -------------------------------
+@playlist_bp.route("/api/<int:playlist_id>",
+                   methods=["GET", "PATCH", "DELETE"])
+@login_required
+def api_playlist(playlist_id):
+    username = current_user()
+
+    try:
+        if request.method == "PATCH":
+            data = request.get_json(silent=True) or {}
+            rename_user_playlist(username, playlist_id, data.get("name"))
+        elif request.method == "DELETE":
+            delete_user_playlist(username, playlist_id)
+            return jsonify({"status": "ok"})
+
+        return jsonify({
+            "status": "ok",
+            "playlist": playlist_detail(username, playlist_id)
+        })
+    except (ValueError, FileNotFoundError) as e:
+        return _error(e)
+
+
+# -------------------------------
+# ENTRY: TAMBAH ({"media_ids": [..]})
+# -------------------------------
+@playlist_bp.route("/api/<int:playlist_id>/entries", methods=["POST"])
+@login_required
+def api_add_entries(playlist_id):
+    data = request.get_json(silent=True) or {}
+
+    try:
+        added = add_media(
+            current_user(), playlist_id, data.get("media_ids") or []
+        )
+    except (ValueError, FileNotFoundError) as e:
+        return _error(e)
+
+    return jsonify({"status": "ok", "added": added})
+
+
+# -------------------------------
+# ENTRY: PINDAH ({"after": id} / {"before": id}) & HAPUS
+# -------------------------------
+@playlist_bp.route("/api/<int:playlist_id>/entries/<int:entry_id>",
+                   methods=["PATCH", "DELETE"])
+@login_required
+def api_entry(playlist_id, entry_id):
+    username = current_user()
+
+    try:
+        if request.method == "DELETE":
+            remove_media(username, playlist_id, entry_id)
+            return jsonify({"status": "ok"})
+
+        data = request.get_json(silent=True) or {}
+        position = move_media(
+            username, playlist_id, entry_id,
+            after_id=data.get("after"),
+            before_id=data.get("before"),
+        )
+    except (ValueError, FileNotFoundError) as e:
+        return _error(e)
+
+    return jsonify({"status": "ok", "position": position})
+
+
+# -------------------------------
+# EXPORT M3U8 / M3U
+# -------------------------------
+@playlist_bp.route("/<int:playlist_id>.m3u8")
+@playlist_bp.route("/<int:playlist_id>.m3u")
+@login_required
+def export_playlist(playlist_id):
+    try:
+        name, body = export_m3u8(current_user(), playlist_id)
+    except FileNotFoundError:
+        abort(404)
+
+    ext = request.path.rsplit(".", 1)[-1]
+
+    return Response(
+        body,
+        mimetype=(
+            "application/vnd.apple.mpegurl" if ext == "m3u8"
+            else "audio/x-mpegurl"
+        ),
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename*=UTF-8''{quote(name)}.{ext}"
+            ),
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+# -------------------------------
+# STREAM VIA SIGNED URL (TANPA SESSION)
+# -------------------------------
+@playlist_bp.route("/stream/<token>")
+def signed_stream(token):
+    try:
+        media_id, _ = verify_media_token(token)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}, 403
+
+    path = library_media_path(media_id)
+    if path is None:
+        abort(404)
+
+    return send_file_ranged(path, cache_policy="preview", offload=True)
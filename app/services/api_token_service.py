@@ -1,22 +1,170 @@
 """
 api_token_service.py
 Business logic API token
+(verifikasi dengan cache LRU/TTL + invalidasi lintas worker)
 """
 
+import time
 import secrets
 import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
+from core.cms_logger import get_logger
+from app.repositories.db import release_db
 from app.repositories.api_token_repository import (
-    init_token_table,
     save_token,
     find_token_hash,
+    get_active_tokens,
+    revoke_token,
+    get_token_generation,
+    touch_tokens,
 )
 
 
-def init_api_token():
-    init_token_table()
+log = get_logger("CMS_API_TOKEN")
 
+CACHE_SIZE = 1024        # jumlah hash token terverifikasi di memori
+CACHE_TTL = 300          # detik, batas umur entry cache
+GENERATION_CHECK = 2.0   # detik, jeda cek revoke dari worker lain
+TOUCH_INTERVAL = 30      # detik, flush last_used_at ke database
+
+
+# =====================================================
+# CACHE VERIFIKASI
+# =====================================================
+
+class TokenCache:
+    """
+    LRU {token_hash: (user, expires_at)}. Dikosongkan saat generation
+    di database berubah (ada revoke, termasuk dari worker lain).
+    epoch naik tiap kali cache dikosongkan: hasil lookup database yang
+    dimulai sebelum revoke tidak boleh masuk cache sesudahnya.
+    """
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = 0.0
+        self._epoch = 0
+
+    def _sync_generation(self):
+        now = time.monotonic()
+        if now - self._checked_at < GENERATION_CHECK:
+            return
+
+        generation = get_token_generation()
+        with self._lock:
+            self._checked_at = now
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+                self._epoch += 1
+
+    def get(self, token_hash):
+        self._sync_generation()
+
+        with self._lock:
+            item = self._entries.get(token_hash)
+            if item is None:
+                return None
+            if item[1] < time.monotonic():
+                del self._entries[token_hash]
+                return None
+            self._entries.move_to_end(token_hash)
+            return item[0]
+
+    def epoch(self):
+        """
+        Dicatat sebelum lookup database, diteruskan ke set()
+        """
+        with self._lock:
+            return self._epoch
+
+    def set(self, token_hash, user, epoch):
+        with self._lock:
+            if epoch != self._epoch:
+                # clear() / generation berubah selama lookup
+                return
+            self._entries[token_hash] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+            # paksa cek generation di verifikasi berikutnya
+            self._checked_at = 0.0
+
+
+_cache = TokenCache()
+
+
+# =====================================================
+# LAST USED (BATCH)
+# =====================================================
+
+_pending_touch = {}
+_touch_lock = threading.Lock()
+_touch_thread = None
+
+
+def _mark_used(token_hash):
+    with _touch_lock:
+        _pending_touch[token_hash] = datetime.utcnow().isoformat()
+
+
+def flush_last_used():
+    """
+    Tulis last_used_at yang terkumpul dalam satu transaksi
+    """
+    with _touch_lock:
+        rows = [(ts, h) for h, ts in _pending_touch.items()]
+        _pending_touch.clear()
+
+    touch_tokens(rows)
+    return len(rows)
+
+
+def _touch_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush_last_used()
+        except Exception:
+            log.exception("[TOKEN] Gagal menyimpan last_used_at")
+        finally:
+            release_db()
+
+
+def start_token_flusher(interval=TOUCH_INTERVAL):
+    """
+    Thread daemon flush last_used_at berkala (idempotent)
+    """
+    global _touch_thread
+
+    if _touch_thread and _touch_thread.is_alive():
+        return _touch_thread
+
+    _touch_thread = threading.Thread(
+        target=_touch_loop,
+        args=(interval,),
+        name="api-token-touch",
+        daemon=True,
+    )
+    _touch_thread.start()
+    return _touch_thread
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
 
 def _hash_token(token: str) -> str:
     return hashlib.sha256(token.encode()).hexdigest()
@@ -37,4 +185,31 @@ def generate_token(username: str) -> str:
 
 def verify_token(token: str):
     token_hash = _hash_token(token)
-    return find_token_hash(token_hash)
\ No newline at end of file
+
+    user = _cache.get(token_hash)
+    if user is None:
+        epoch = _cache.epoch()
+        user = find_token_hash(token_hash)
+        if user is None:
+            return None
+        _cache.set(token_hash, user, epoch)
+
+    _mark_used(token_hash)
+    return user
+
+
+def list_tokens(username):
+    return [
+        {"id": token_id, "created_at": created_at, "last_used_at": last_used}
+        for token_id, created_at, last_used in get_active_tokens(username)
+    ]
+
+
+def revoke_user_token(username, token_id):
+    """
+    Revoke token milik user. Cache lokal langsung dikosongkan,
+    worker lain menyusul lewat generation (<= GENERATION_CHECK detik).
+    """
+    if not revoke_token(token_id, user=username):
+        raise FileNotFoundError("Token tidak ditemukan")
+    _cache.clear()
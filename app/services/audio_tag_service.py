@@ -0,0 +1,447 @@
+"""
+audio_tag_service.py
+Ekstraksi tag audio (ID3v2/v1, FLAC, MP4 ilst) hanya dari header file,
+dijalankan paralel per batch di process pool
+"""
+
+import io
+import os
+import struct
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services.media_probe_service import (
+    iter_boxes,
+    find_box,
+    mp4_duration,
+)
+
+
+TAG_BATCH_SIZE = 200
+TAG_WORKERS = max((os.cpu_count() or 2) - 1, 1)
+MP3_SYNC_SEARCH = 64 * 1024  # cari frame MPEG pertama di 64 KB awal
+
+TAG_FIELDS = (
+    "title", "artist", "album", "album_artist",
+    "track", "disc", "year", "genre", "duration",
+)
+
+
+# =====================================================
+# UTIL
+# =====================================================
+
+def _empty_tags():
+    return dict.fromkeys(TAG_FIELDS)
+
+
+def _first_number(value):
+    """
+    "3/12" -> 3, "2004-05-01" -> 2004
+    """
+    if value is None:
+        return None
+
+    digits = ""
+    for c in str(value).strip():
+        if not c.isdigit():
+            break
+        digits += c
+
+    return int(digits) if digits else None
+
+
+def _set(tags, key, value):
+    """
+    Isi field hanya jika belum ada (sumber pertama menang)
+    """
+    if value is None or tags.get(key) is not None:
+        return
+
+    if isinstance(value, str):
+        value = value.strip().strip("\x00").strip()
+        if not value:
+            return
+
+    if key in ("track", "disc", "year"):
+        value = _first_number(value)
+        if value is None:
+            return
+
+    tags[key] = value
+
+
+# =====================================================
+# ID3v2 / ID3v1 / MPEG
+# =====================================================
+
+ID3_FRAMES = {
+    "TIT2": "title", "TT2": "title",
+    "TPE1": "artist", "TP1": "artist",
+    "TALB": "album", "TAL": "album",
+    "TPE2": "album_artist", "TP2": "album_artist",
+    "TRCK": "track", "TRK": "track",
+    "TPOS": "disc", "TPA": "disc",
+    "TDRC": "year", "TYER": "year", "TYE": "year",
+    "TCON": "genre", "TCO": "genre",
+    "TLEN": "length", "TLE": "length",
+}
+
+ID3_ENCODINGS = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+
+def _syncsafe(data):
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _id3_text(data):
+    if not data:
+        return None
+
+    encoding = ID3_ENCODINGS.get(data[0], "latin-1")
+    text = data[1:].decode(encoding, errors="replace")
+
+    # ID3v2.4: banyak nilai dipisah NUL -> ambil yang pertama
+    return text.split("\x00")[0]
+
+
+def _read_id3v2(f, tags):
+    """
+    Return ukuran tag (byte) agar frame MPEG pertama bisa dicari
+    setelahnya. Frame non-teks (APIC dll) di-skip tanpa dibaca.
+    """
+    f.seek(0)
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+
+    major, flags = header[3], header[5]
+    tag_size = _syncsafe(header[6:10])
+    end = 10 + tag_size
+
+    if flags & 0x80 and major < 4:
+        # unsynchronisation seluruh tag (jarang): proses di memori
+        data = f.read(tag_size).replace(b"\xff\x00", b"\xff")
+        source, start, limit = io.BytesIO(data), 0, len(data)
+    else:
+        source, start, limit = f, 10, end
+
+    pos = start
+
+    if flags & 0x40:
+        source.seek(pos)
+        ext = source.read(4)
+        if len(ext) < 4:
+            return end
+        if major == 4:
+            pos += _syncsafe(ext)
+        else:
+            pos += struct.unpack(">I", ext)[0] + 4
+
+    id_len, head_len = (3, 6) if major == 2 else (4, 10)
+
+    while pos + head_len <= limit:
+        source.seek(pos)
+        head = source.read(head_len)
+        frame_id = head[:id_len]
+
+        if not frame_id.isalnum():
+            break  # padding / data rusak
+
+        if major == 2:
+            size = int.from_bytes(head[3:6], "big")
+        elif major == 4:
+            size = _syncsafe(head[4:8])
+        else:
+            size = struct.unpack(">I", head[4:8])[0]
+
+        pos += head_len
+        field = ID3_FRAMES.get(frame_id.decode("latin-1"))
+
+        if field and size <= 4096:
+            value = _id3_text(source.read(size))
+            if field == "length":
+                ms = _first_number(value)
+                if ms:
+                    _set(tags, "duration", ms / 1000)
+            else:
+                _set(tags, field, value)
+
+        pos += size
+
+    return end
+
+
+def _read_id3v1(f, tags):
+    try:
+        f.seek(-128, 2)
+    except OSError:
+        return False
+
+    data = f.read(128)
+    if len(data) < 128 or data[:3] != b"TAG":
+        return False
+
+    def text(raw):
+        return raw.split(b"\x00")[0].decode("latin-1")
+
+    _set(tags, "title", text(data[3:33]))
+    _set(tags, "artist", text(data[33:63]))
+    _set(tags, "album", text(data[63:93]))
+    _set(tags, "year", text(data[93:97]))
+
+    # ID3v1.1: byte 125 = 0, byte 126 = nomor track
+    if data[125] == 0 and data[126]:
+        _set(tags, "track", data[126])
+
+    return True
+
+
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {
+    1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    25: [11025, 12000, 8000],
+}
+
+
+def _mp3_duration(f, audio_start, file_size, has_id3v1):
+    """
+    Durasi dari frame pertama: header Xing/Info/VBRI (VBR)
+    atau estimasi bitrate konstan
+    """
+    f.seek(audio_start)
+    data = f.read(MP3_SYNC_SEARCH)
+
+    i = 0
+    while i + 4 <= len(data):
+        if data[i] == 0xFF and data[i + 1] & 0xE0 == 0xE0:
+            b1, b2, b3 = data[i + 1], data[i + 2], data[i + 3]
+            version_bits = (b1 >> 3) & 3
+            layer_bits = (b1 >> 1) & 3
+            bitrate_idx = b2 >> 4
+            rate_idx = (b2 >> 2) & 3
+
+            if (
+                version_bits != 1 and layer_bits == 1
+                and 0 < bitrate_idx < 15 and rate_idx < 3
+            ):
+                break
+        i += 1
+    else:
+        return None
+
+    version = {3: 1, 2: 2, 0: 25}[version_bits]
+    mono = (b3 >> 6) == 3
+    sample_rate = MP3_SAMPLE_RATES[version][rate_idx]
+    bitrate = MP3_BITRATES[1 if version == 1 else 2][bitrate_idx] * 1000
+    samples = 1152 if version == 1 else 576
+
+    if version == 1:
+        side = 17 if mono else 32
+    else:
+        side = 9 if mono else 17
+
+    xing = i + 4 + side
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        if flags & 1:
+            frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+            return frames * samples / sample_rate
+
+    vbri = i + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        frames = struct.unpack(">I", data[vbri + 14:vbri + 18])[0]
+        return frames * samples / sample_rate
+
+    audio_bytes = file_size - audio_start - i - (128 if has_id3v1 else 0)
+    return audio_bytes * 8 / bitrate if audio_bytes > 0 else None
+
+
+def _read_mp3(f, tags):
+    f.seek(0, 2)
+    file_size = f.tell()
+
+    audio_start = _read_id3v2(f, tags)
+    has_id3v1 = _read_id3v1(f, tags)
+
+    if tags["duration"] is None:
+        duration = _mp3_duration(f, audio_start, file_size, has_id3v1)
+        _set(tags, "duration", duration)
+
+
+# =====================================================
+# FLAC
+# =====================================================
+
+VORBIS_FIELDS = {
+    "TITLE": "title",
+    "ARTIST": "artist",
+    "ALBUM": "album",
+    "ALBUMARTIST": "album_artist",
+    "ALBUM ARTIST": "album_artist",
+    "TRACKNUMBER": "track",
+    "DISCNUMBER": "disc",
+    "DATE": "year",
+    "YEAR": "year",
+    "GENRE": "genre",
+}
+
+
+def _read_vorbis_comment(data, tags):
+    vendor_len = struct.unpack("<I", data[:4])[0]
+    pos = 4 + vendor_len
+    count = struct.unpack("<I", data[pos:pos + 4])[0]
+    pos += 4
+
+    for _ in range(count):
+        length = struct.unpack("<I", data[pos:pos + 4])[0]
+        pos += 4
+        comment = data[pos:pos + length].decode("utf-8", errors="replace")
+        pos += length
+
+        key, _, value = comment.partition("=")
+        field = VORBIS_FIELDS.get(key.upper())
+        if field:
+            _set(tags, field, value)
+
+
+def _read_flac(f, tags):
+    f.seek(0)
+    if f.read(4) != b"fLaC":
+        # FLAC dengan ID3v2 di depan (jarang)
+        f.seek(_read_id3v2(f, tags))
+        if f.read(4) != b"fLaC":
+            return
+
+    while True:
+        head = f.read(4)
+        if len(head) < 4:
+            return
+
+        last = head[0] & 0x80
+        block_type = head[0] & 0x7F
+        length = int.from_bytes(head[1:4], "big")
+
+        if block_type == 0:
+            info = f.read(length)
+            packed = struct.unpack(">Q", info[10:18])[0]
+            sample_rate = packed >> 44
+            total_samples = packed & 0xFFFFFFFFF
+            if sample_rate and total_samples:
+                _set(tags, "duration", total_samples / sample_rate)
+        elif block_type == 4:
+            _read_vorbis_comment(f.read(length), tags)
+        else:
+            # PICTURE, SEEKTABLE, PADDING: skip tanpa dibaca
+            f.seek(length, 1)
+
+        if last:
+            return
+
+
+# =====================================================
+# MP4 / M4A (moov/udta/meta/ilst)
+# =====================================================
+
+MP4_FIELDS = {
+    "\xa9nam": "title",
+    "\xa9ART": "artist",
+    "\xa9alb": "album",
+    "aART": "album_artist",
+    "\xa9day": "year",
+    "\xa9gen": "genre",
+}
+
+
+def _read_mp4(f, path, tags):
+    f.seek(0, 2)
+    end = f.tell()
+
+    meta = find_box(f, 0, end, ["moov", "udta", "meta"])
+    if meta:
+        # meta adalah full box: 4 byte version/flags sebelum child box
+        ilst = find_box(f, meta[0] + 4, meta[0] + meta[1], ["ilst"])
+    else:
+        ilst = None
+
+    if ilst:
+        items = iter_boxes(f, ilst[0], ilst[0] + ilst[1])
+        for item_type, offset, size in list(items):
+            data = find_box(f, offset, offset + size, ["data"])
+            if not data or data[1] < 8:
+                continue
+
+            f.seek(data[0] + 8)  # type indicator + locale
+            value = f.read(min(data[1] - 8, 4096))
+
+            if item_type in MP4_FIELDS:
+                text = value.decode("utf-8", "replace")
+                _set(tags, MP4_FIELDS[item_type], text)
+            elif item_type in ("trkn", "disk") and len(value) >= 4:
+                number = struct.unpack(">H", value[2:4])[0] or None
+                field = "track" if item_type == "trkn" else "disc"
+                _set(tags, field, number)
+
+    _set(tags, "duration", mp4_duration(path))
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def read_tags(path):
+    """
+    Return dict TAG_FIELDS (nilai None jika tidak ada).
+    Tidak pernah raise untuk file rusak.
+    """
+    tags = _empty_tags()
+    ext = path.rsplit(".", 1)[-1].lower()
+
+    try:
+        with open(path, "rb") as f:
+            if ext == "mp3":
+                _read_mp3(f, tags)
+            elif ext == "flac":
+                _read_flac(f, tags)
+            elif ext in ("m4a", "mp4", "aac"):
+                _read_mp4(f, path, tags)
+    except (OSError, struct.error, IndexError, KeyError, ValueError):
+        pass
+
+    return tags
+
+
+def _extract_batch(paths):
+    """
+    Dijalankan di worker process (harus top-level agar bisa di-pickle)
+    """
+    return [(path, read_tags(path)) for path in paths]
+
+
+def iter_tag_batches(paths):
+    """
+    Yield list (path, tags) per batch. Batch tunggal diproses langsung,
+    selebihnya dibagi ke process pool (parsing = CPU bound, GIL).
+    """
+    paths = list(paths)
+    batches = [
+        paths[i:i + TAG_BATCH_SIZE]
+        for i in range(0, len(paths), TAG_BATCH_SIZE)
+    ]
+
+    if len(batches) <= 1 or TAG_WORKERS == 1:
+        for batch in batches:
+            yield _extract_batch(batch)
+        return
+
+    # spawn: aman dipanggil dari thread background (tanpa fork + lock)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=TAG_WORKERS,
+        mp_context=context,
+    ) as pool:
+        yield from pool.map(_extract_batch, batches)
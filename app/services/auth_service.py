@@ -13,22 +13,16 @@ from werkzeug.security import (
 )
 
 from app.repositories.user_repository import (
-    init_user_table,
     create_user,
     get_user_by_username,
     reset_user_password,
+    update_last_login,
 )
 
 from app.services.session_service import login_session
 from app.services.audit_service import log_login, log_logout
 from core.cms_bash_folder import DB_FOLDER
 
-def init_auth():
-    """
-    Dipanggil sekali saat app start
-    """
-    init_user_table()
-
 
 def register_user(username, password, role="user"):
     password_hash = generate_password_hash(password)
@@ -56,6 +50,7 @@ def login_user(username, ip_address=None):
     session["username"] = user.username
     session["role"] = user.role
 
+    update_last_login(user.username, datetime.utcnow().isoformat())
     log_login(user.username, ip_address)
     return True
 
@@ -0,0 +1,191 @@
+"""
+batch_file_service.py
+Operasi file massal (delete / move / rename) dalam satu request:
+validasi semua operasi dulu, lalu eksekusi di bawah lock per user
+"""
+
+import os
+import sqlite3
+from werkzeug.utils import secure_filename, safe_join
+
+from app.services.watcher_service import record_changes
+from app.services.file_service import (
+    allowed_file,
+    get_user_upload_dir,
+    user_lock,
+    remove_file_path,
+    move_file_path,
+)
+
+
+MAX_OPERATIONS = 1000
+BATCH_OPS = ("delete", "move", "rename")
+
+
+# =====================================================
+# VALIDASI
+# =====================================================
+
+def _resolve(user_dir, rel, what="File"):
+    path = safe_join(user_dir, rel.strip("/")) if rel else None
+    if path is None or path == user_dir:
+        raise ValueError(f"{what} tidak valid")
+    return path
+
+
+def _plan(user_dir, item, claimed):
+    """
+    Validasi satu operasi, return (op, src, dst).
+    claimed = path yang sudah dipakai operasi sebelumnya di batch ini.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Operasi harus object")
+
+    op = item.get("op")
+    if op not in BATCH_OPS:
+        raise ValueError("op harus delete, move atau rename")
+
+    rel = item.get("path")
+    if not isinstance(rel, str):
+        raise ValueError("path wajib diisi")
+
+    src = _resolve(user_dir, rel)
+    if not os.path.isfile(src):
+        raise FileNotFoundError("File tidak ditemukan")
+    if src in claimed:
+        raise ValueError("File sudah dipakai operasi lain di batch ini")
+
+    if op == "delete":
+        return op, src, None
+
+    if op == "rename":
+        folder = os.path.dirname(src)
+        name = item.get("name")
+    else:
+        to = item.get("to", "")
+        if not isinstance(to, str):
+            raise ValueError("to harus string")
+        folder = _resolve(user_dir, to, "Folder tujuan") if to else user_dir
+        if os.path.exists(folder) and not os.path.isdir(folder):
+            raise ValueError("Folder tujuan tidak valid")
+        name = item.get("name") or os.path.basename(src)
+
+    if not isinstance(name, str) or not allowed_file(name):
+        raise ValueError("Tipe file tidak diizinkan")
+
+    dst = os.path.join(folder, secure_filename(name))
+    if dst == src:
+        raise ValueError("Tujuan sama dengan asal")
+    if os.path.exists(dst) or dst in claimed:
+        raise ValueError("Nama file sudah ada")
+
+    return op, src, dst
+
+
+def _make_dirs(user_dir, folder):
+    """
+    os.makedirs, return folder yang baru dibuat (induk dulu)
+    """
+    created = []
+    current = folder
+    while current != user_dir and not os.path.isdir(current):
+        created.append(current)
+        current = os.path.dirname(current)
+
+    os.makedirs(folder, exist_ok=True)
+    return created[::-1]
+
+
+def _error_message(error):
+    if isinstance(error, sqlite3.Error):
+        return f"Database error: {error}"
+    return error.strerror or str(error)
+
+
+def _relative(user_dir, path):
+    return os.path.relpath(path, user_dir).replace(os.sep, "/")
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def run_batch(username, operations):
+    """
+    Return (ok, results). Jika ada operasi tidak valid,
+    tidak ada yang dijalankan (ok False, error per item).
+    Error saat eksekusi hanya menggagalkan item itu sendiri.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("operations harus list yang tidak kosong")
+    if len(operations) > MAX_OPERATIONS:
+        raise ValueError(f"Maksimal {MAX_OPERATIONS} operasi per batch")
+
+    user_dir = get_user_upload_dir(username)
+    results = []
+    changed = []
+    removed = []
+
+    with user_lock(username):
+        # -------------------------------------------------
+        # TAHAP 1: validasi semua operasi
+        # -------------------------------------------------
+        plans = []
+        claimed = set()
+        invalid = False
+
+        for index, item in enumerate(operations):
+            result = {
+                "index": index,
+                "op": item.get("op") if isinstance(item, dict) else None,
+            }
+            try:
+                plan = _plan(user_dir, item, claimed)
+            except (ValueError, FileNotFoundError) as e:
+                result.update(status="error", message=str(e))
+                invalid = True
+                plan = None
+            else:
+                claimed.add(plan[1])
+                if plan[2]:
+                    claimed.add(plan[2])
+                result["status"] = "valid"
+
+            plans.append(plan)
+            results.append(result)
+
+        if invalid:
+            for result in results:
+                if result["status"] == "valid":
+                    result["status"] = "skipped"
+            return False, results
+
+        # -------------------------------------------------
+        # TAHAP 2: eksekusi
+        # -------------------------------------------------
+        for (op, src, dst), result in zip(plans, results):
+            result["path"] = _relative(user_dir, src)
+            try:
+                if op == "delete":
+                    remove_file_path(username, src)
+                else:
+                    changed.extend(_make_dirs(user_dir, os.path.dirname(dst)))
+                    move_file_path(src, dst)
+                    result["new_path"] = _relative(user_dir, dst)
+                    changed.append(dst)
+            except (OSError, sqlite3.Error) as e:
+                result.update(status="error", message=_error_message(e))
+                if not os.path.exists(src):
+                    # file sudah berpindah / terhapus, index saja yang gagal
+                    removed.append(src)
+                    if dst and os.path.exists(dst):
+                        changed.append(dst)
+                continue
+
+            removed.append(src)
+            result["status"] = "ok"
+
+    # view & index watcher diubah per entry, bukan scan ulang folder
+    record_changes(changed=changed, removed=removed)
+
+    return True, results
@@ -0,0 +1,167 @@
+"""
+cas_service.py
+Penyimpanan content-addressed (dedup) untuk upload user.
+Satu isi file = satu blob, file user adalah hardlink ke blob.
+"""
+
+import os
+import shutil
+import hashlib
+
+from core import cms_config
+from core.cms_bash_folder import UPLOAD_FOLDER
+
+from app.repositories.cas_repository import (
+    add_ref,
+    get_digest,
+    move_ref,
+    ref_transaction,
+    remove_ref,
+)
+
+
+BLOB_FOLDER = os.path.join(UPLOAD_FOLDER, ".blobs")
+
+
+# =====================================================
+# UTIL
+# =====================================================
+
+def is_enabled():
+    return cms_config.get("CMS_STORAGE_MODE") == "cas"
+
+
+def new_hasher():
+    return hashlib.sha256()
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    hasher = new_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def blob_path(digest):
+    # shard 2 level: .blobs/ab/cd/abcd...
+    return os.path.join(BLOB_FOLDER, digest[:2], digest[2:4], digest)
+
+
+def _release_ref(cur, path):
+    """
+    Lepas referensi path, hapus blob jika tidak ada referensi lagi.
+    Dipanggil di dalam ref_transaction().
+    """
+    result = remove_ref(cur, path)
+    if not result:
+        return
+
+    digest, remaining = result
+    blob = blob_path(digest)
+
+    if remaining == 0 and os.path.exists(blob):
+        os.remove(blob)
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def store_file(tmp_path, digest, target_path):
+    """
+    Pindahkan file staging ke blob store (jika isi belum ada),
+    lalu hardlink blob ke path user. Cek blob & refcount dalam satu
+    transaksi agar release_file di proses lain tidak menghapus blob
+    di antaranya.
+    """
+    blob = blob_path(digest)
+
+    with ref_transaction() as cur:
+        if os.path.exists(blob):
+            # isi sudah ada: file staging tidak perlu disimpan
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(tmp_path, blob)
+
+        try:
+            os.link(blob, target_path)
+        except OSError:
+            # filesystem tanpa hardlink (mis. FAT/sdcard): salin biasa
+            shutil.copyfile(blob, target_path)
+
+        add_ref(cur, target_path, digest)
+
+
+def adopt_file(path):
+    """
+    Masukkan file user yang sudah ada ke blob store (dedup di background,
+    untuk file yang di-commit tanpa hash). Return digest atau None.
+    """
+    if not os.path.exists(path) or get_digest(path):
+        return None
+
+    digest = hash_file(path)
+    blob = blob_path(digest)
+
+    with ref_transaction() as cur:
+        if not os.path.exists(path):
+            return None
+
+        if os.path.exists(blob):
+            # isi sudah ada: ganti file user dengan hardlink ke blob
+            tmp = os.path.join(
+                os.path.dirname(path),
+                f".{os.path.basename(path)}.cas"
+            )
+            try:
+                os.link(blob, tmp)
+            except OSError:
+                return None
+            os.replace(tmp, path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                os.link(path, blob)
+            except OSError:
+                shutil.copyfile(path, blob)
+
+        add_ref(cur, path, digest)
+
+    return digest
+
+
+def release_file(path):
+    """
+    Dipanggil setelah file user dihapus.
+    Blob ikut dihapus jika tidak ada referensi lagi.
+    """
+    if not os.path.isdir(BLOB_FOLDER):
+        return
+
+    with ref_transaction() as cur:
+        _release_ref(cur, path)
+
+
+def stored_digest(path):
+    """
+    Hash isi file yang sudah tersimpan (tanpa membaca file), atau None
+    """
+    if not os.path.isdir(BLOB_FOLDER):
+        return None
+    return get_digest(path)
+
+
+def move_file(old_path, new_path):
+    """
+    Dipanggil setelah rename/move file user. File lama di new_path
+    (jika tertimpa) dilepas dulu seperti release_file, agar blobnya
+    tidak yatim.
+    """
+    if not os.path.isdir(BLOB_FOLDER) or old_path == new_path:
+        return
+
+    with ref_transaction() as cur:
+        _release_ref(cur, new_path)
+        move_ref(cur, old_path, new_path)
@@ -0,0 +1,422 @@
+"""
+compression_service.py
+Kompresi respons (gzip / brotli):
+- static asset dikompres sekali (build / startup) ke BASE/cache/static,
+  bukan ke folder source
+- HTML / JSON dinamis dikompres on-the-fly di atas ambang ukuran
+- preview file teks memakai cache varian terkompresi di disk (LRU, dibatasi
+  CMS_COMPRESS_CACHE_MB)
+
+    python -m app.services.compression_service   # precompress saat build
+"""
+
+import os
+import sys
+import gzip
+import hashlib
+import mimetypes
+import threading
+from functools import lru_cache
+
+from flask import request, send_file, abort
+from werkzeug.utils import safe_join
+
+from core import cms_config
+from core.cms_logger import get_logger
+from core.cms_bash_folder import BASE, UPLOAD_FOLDER
+
+try:
+    import brotli
+except ImportError:  # brotli opsional, fallback ke gzip
+    brotli = None
+
+
+log = get_logger("CMS_COMPRESS")
+
+COMPRESS_FOLDER = os.path.join(UPLOAD_FOLDER, ".compressed")
+STATIC_CACHE_FOLDER = os.path.join(BASE, "cache", "static")
+STATIC_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static"
+)
+
+# media yang sudah terkompresi (jpg, zip, mp4, ...) tidak masuk daftar ini
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.apple.mpegurl",
+    "image/svg+xml",
+}
+
+MAX_FILE_SIZE = 8 * 1024 * 1024  # preview file teks di atas ini tidak dikompres
+
+# level: static sekali jalan di luar request -> maksimal,
+# file user dikompres di thread request -> sedang, dinamis -> cepat
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+FILE_LEVELS = {"br": 5, "gzip": 6}
+DYNAMIC_LEVELS = {"br": 4, "gzip": 6}
+
+EVICT_TARGET = 0.8  # eviction berhenti di 80% batas cache
+
+FILE_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+# =====================================================
+# UTIL
+# =====================================================
+
+def is_enabled():
+    return cms_config.get("CMS_COMPRESS", "1") == "1"
+
+
+def min_size():
+    return int(cms_config.get("CMS_COMPRESS_MIN_SIZE", "1024"))
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+def is_compressible(mimetype):
+    if not mimetype:
+        return False
+    mimetype = mimetype.split(";", 1)[0].strip().lower()
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+
+
+def compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def add_vary(headers):
+    vary = headers.get("Vary", "")
+    if "accept-encoding" not in vary.lower():
+        headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+
+# =====================================================
+# NEGOTIATION
+# =====================================================
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding):
+    """
+    Pilih encoding terbaik dari header Accept-Encoding.
+    Nilai header dari browser hanya sedikit variasinya,
+    jadi hasil parse di-cache (LRU) per string header.
+    Return "br" / "gzip" / None (identity).
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+
+    # urutan available_encodings = preferensi server saat q sama
+    for encoding in available_encodings():
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+
+    return best
+
+
+def request_encoding():
+    return negotiate(request.headers.get("Accept-Encoding", ""))
+
+
+# =====================================================
+# STATIC (PRECOMPRESS SAAT STARTUP)
+# =====================================================
+
+def _write_atomic(target, data):
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, target)
+
+
+def _static_target(folder, path, encoding):
+    rel = os.path.relpath(path, folder)
+    return os.path.join(STATIC_CACHE_FOLDER, rel + FILE_SUFFIXES[encoding])
+
+
+def precompress_static(folder=STATIC_FOLDER):
+    """
+    Buat varian .gz / .br asset static di STATIC_CACHE_FOLDER.
+    Varian yang lebih baru dari sumbernya dilewati.
+    """
+    count = 0
+
+    for current, _, files in os.walk(folder):
+        for name in files:
+            if name.endswith((".gz", ".br", ".tmp")):
+                continue
+            if not is_compressible(mimetypes.guess_type(name)[0]):
+                continue
+
+            path = os.path.join(current, name)
+            st = os.stat(path)
+
+            data = None
+            for encoding in available_encodings():
+                target = _static_target(folder, path, encoding)
+                if (
+                    os.path.exists(target)
+                    and os.stat(target).st_mtime_ns >= st.st_mtime_ns
+                ):
+                    continue
+
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+
+                # biaya kompresi dibayar sekali, jadi file kecil pun
+                # dikompres selama hasilnya memang lebih kecil
+                packed = compress(data, encoding, STATIC_LEVELS[encoding])
+                if len(packed) < len(data):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    _write_atomic(target, packed)
+                    count += 1
+
+    return count
+
+
+def _static_variant(folder, path, encoding):
+    if encoding is None:
+        return None
+
+    variant = _static_target(folder, path, encoding)
+    try:
+        if os.stat(variant).st_mtime_ns >= os.stat(path).st_mtime_ns:
+            return variant
+    except OSError:
+        pass
+    return None
+
+
+def make_static_view(app):
+    """
+    Pengganti view static bawaan Flask: kirim varian .br / .gz
+    jika klien menerimanya (ETag berbeda per varian)
+    """
+    def static(filename):
+        path = safe_join(app.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        mimetype = mimetypes.guess_type(path)[0]
+        max_age = app.get_send_file_max_age(filename)
+
+        if not is_compressible(mimetype):
+            return send_file(path, max_age=max_age)
+
+        encoding = request_encoding()
+        variant = _static_variant(app.static_folder, path, encoding)
+
+        if variant is None:
+            response = send_file(path, max_age=max_age)
+        else:
+            response = send_file(variant, mimetype=mimetype, max_age=max_age)
+            response.headers["Content-Encoding"] = encoding
+
+        add_vary(response.headers)
+        return response
+
+    return static
+
+
+# =====================================================
+# FILE USER (CACHE VARIAN DI DISK)
+# =====================================================
+
+_cache_lock = threading.Lock()
+_cache_bytes = None  # perkiraan ukuran cache (di-scan ulang saat evict)
+
+
+def cache_limit():
+    return int(cms_config.get("CMS_COMPRESS_CACHE_MB", "256")) * 1024 * 1024
+
+
+def _scan_cache():
+    """
+    Return list (atime_ns, size, path) semua varian di COMPRESS_FOLDER
+    """
+    entries = []
+    for current, _, files in os.walk(COMPRESS_FOLDER):
+        for name in files:
+            path = os.path.join(current, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            # atime disentuh saat hit (os.utime), tidak bergantung relatime
+            entries.append((st.st_atime_ns, st.st_size, path))
+    return entries
+
+
+def evict_cache(limit=None):
+    """
+    Hapus varian yang paling lama tidak dipakai sampai total
+    <= EVICT_TARGET * limit. Return jumlah file dihapus.
+    """
+    global _cache_bytes
+
+    limit = cache_limit() if limit is None else limit
+    entries = _scan_cache()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+
+    if total > limit:
+        target = int(limit * EVICT_TARGET)
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+    _cache_bytes = total
+    return removed
+
+
+def _account(added):
+    """
+    Tambah ukuran varian baru, evict jika melewati batas
+    """
+    global _cache_bytes
+
+    with _cache_lock:
+        if _cache_bytes is None:
+            evict_cache()
+        _cache_bytes += added
+        if _cache_bytes > cache_limit():
+            removed = evict_cache()
+            log.info(f"[COMPRESS] Cache penuh, {removed} varian dihapus")
+
+
+def file_encoding(mimetype, size):
+    """
+    Encoding varian file user untuk request saat ini, tanpa menyentuh
+    file (cukup dari stat): ETag varian & 304 bisa ditentukan sebelum
+    compressed_file(). Return "br" / "gzip" / None.
+    """
+    if not is_enabled() or not is_compressible(mimetype):
+        return None
+    if size < min_size() or size > MAX_FILE_SIZE:
+        return None
+
+    return request_encoding()
+
+
+def compressed_file(path, etag, encoding):
+    """
+    Varian terkompresi file teks user (encoding dari file_encoding).
+    Return path varian atau None (kirim apa adanya).
+    Key cache = ETag file + encoding, file yang berubah dapat key baru.
+    Dikompres di thread request -> FILE_LEVELS (bukan level maksimal).
+    """
+    key = hashlib.sha1(f"{path}|{etag}".encode()).hexdigest()
+    target = os.path.join(
+        COMPRESS_FOLDER, key[:2], key + FILE_SUFFIXES[encoding]
+    )
+
+    try:
+        # hit: tandai dipakai untuk urutan LRU
+        os.utime(target)
+        return target
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return None
+
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(path, "rb") as f:
+            data = compress(f.read(), encoding, FILE_LEVELS[encoding])
+        _write_atomic(target, data)
+    except OSError:
+        return None
+
+    _account(len(data))
+    return target
+
+
+# =====================================================
+# RESPONSE DINAMIS (after_request)
+# =====================================================
+
+def compress_response(response):
+    """
+    Kompres HTML / JSON hasil render. Respons streaming,
+    file (direct_passthrough), range & yang sudah ber-encoding dilewati.
+    """
+    if (
+        not is_enabled()
+        or request.method != "GET"
+        or response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or "Content-Range" in response.headers
+        or not is_compressible(response.mimetype)
+    ):
+        return response
+
+    add_vary(response.headers)
+
+    encoding = request_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size():
+        return response
+
+    response.set_data(compress(data, encoding, DYNAMIC_LEVELS[encoding]))
+    response.headers["Content-Encoding"] = encoding
+
+    # representasi berbeda -> ETag berbeda
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+
+    return response
+
+
+def init_compression(app):
+    """
+    Dipanggil create_app: lengkapi varian static yang belum dibuat
+    saat build, ganti view static, pasang after_request
+    """
+    if not is_enabled():
+        return
+
+    count = precompress_static(app.static_folder)
+    if count:
+        log.info(f"[COMPRESS] {count} varian static dibuat")
+
+    app.view_functions["static"] = make_static_view(app)
+    app.after_request(compress_response)
+
+
+if __name__ == "__main__":
+    print(f"{precompress_static()} varian static dibuat di {STATIC_CACHE_FOLDER}")
+    sys.exit(0)
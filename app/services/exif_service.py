@@ -0,0 +1,228 @@
+"""
+exif_service.py
+Membaca EXIF foto (waktu ambil, orientasi, dimensi, GPS, kamera)
+secara streaming: hanya segmen header JPEG, tanpa decode gambar
+"""
+
+import os
+import struct
+from datetime import datetime
+
+from app.services.media_probe_service import image_size
+
+
+MAX_APP1_SIZE = 64 * 1024  # segmen APP1 maksimal 64 KB (spesifikasi JPEG)
+
+EXIF_FIELDS = (
+    "taken_at", "date_source", "orientation",
+    "width", "height", "has_gps", "camera",
+)
+
+# tag TIFF / EXIF yang dipakai
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_ORIENTATION = 0x0112
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_GPS_IFD = 0x8825
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+TAG_PIXEL_X = 0xA002
+TAG_PIXEL_Y = 0xA003
+TAG_GPS_LATITUDE = 0x0002
+
+TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+# =====================================================
+# TIFF / IFD
+# =====================================================
+
+def _read_ifd(data, offset, endian):
+    """
+    Return {tag: value} untuk satu IFD. Value: int, str, atau
+    tuple offset (untuk tipe yang tidak dipakai).
+    """
+    entries = {}
+
+    if offset + 2 > len(data):
+        return entries
+
+    count = struct.unpack(endian + "H", data[offset:offset + 2])[0]
+    pos = offset + 2
+
+    for _ in range(count):
+        if pos + 12 > len(data):
+            break
+
+        tag, typ, n = struct.unpack(endian + "HHI", data[pos:pos + 8])
+        raw = data[pos + 8:pos + 12]
+        pos += 12
+
+        size = TYPE_SIZES.get(typ, 1) * n
+        if size > 4:
+            value_offset = struct.unpack(endian + "I", raw)[0]
+            raw = data[value_offset:value_offset + size]
+
+        if typ == 2:  # ASCII
+            entries[tag] = raw[:n].split(b"\x00")[0].decode(
+                "latin-1"
+            ).strip()
+        elif typ == 3 and n >= 1:  # SHORT
+            entries[tag] = struct.unpack(endian + "H", raw[:2])[0]
+        elif typ in (4, 9) and n >= 1:  # LONG
+            entries[tag] = struct.unpack(endian + "I", raw[:4])[0]
+        else:
+            entries[tag] = None
+
+    return entries
+
+
+def _parse_tiff(data, info):
+    if data[:2] == b"II":
+        endian = "<"
+    elif data[:2] == b"MM":
+        endian = ">"
+    else:
+        return
+
+    ifd0 = _read_ifd(data, struct.unpack(endian + "I", data[4:8])[0], endian)
+
+    exif = {}
+    if ifd0.get(TAG_EXIF_IFD):
+        exif = _read_ifd(data, ifd0[TAG_EXIF_IFD], endian)
+
+    if ifd0.get(TAG_GPS_IFD):
+        gps = _read_ifd(data, ifd0[TAG_GPS_IFD], endian)
+        info["has_gps"] = TAG_GPS_LATITUDE in gps
+
+    info["orientation"] = ifd0.get(TAG_ORIENTATION)
+
+    camera = " ".join(
+        v for v in (ifd0.get(TAG_MAKE), ifd0.get(TAG_MODEL)) if v
+    )
+    info["camera"] = camera or None
+
+    for value in (
+        exif.get(TAG_DATETIME_ORIGINAL),
+        exif.get(TAG_DATETIME_DIGITIZED),
+        ifd0.get(TAG_DATETIME),
+    ):
+        taken = _parse_exif_date(value)
+        if taken:
+            info["taken_at"] = taken
+            info["date_source"] = "exif"
+            break
+
+    if exif.get(TAG_PIXEL_X) and exif.get(TAG_PIXEL_Y):
+        info["width"] = exif[TAG_PIXEL_X]
+        info["height"] = exif[TAG_PIXEL_Y]
+
+
+def _parse_exif_date(value):
+    """
+    "2023:05:01 10:20:30" -> "2023-05-01 10:20:30"
+    """
+    if not value:
+        return None
+    try:
+        taken = datetime.strptime(value[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+    return taken.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# =====================================================
+# JPEG
+# =====================================================
+
+def _read_jpeg(f, info):
+    """
+    Jalan marker demi marker sampai SOS (data gambar tidak dibaca).
+    APP1 Exif dibaca utuh (<= 64 KB), segmen lain di-seek.
+    """
+    if f.read(2) != b"\xff\xd8":
+        return
+
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return
+
+        code = marker[1]
+        if code == 0xFF:
+            f.seek(-1, 1)  # padding 0xFF
+            continue
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+        if code in (0xD9, 0xDA):  # EOI / SOS
+            return
+
+        length = f.read(2)
+        if len(length) < 2:
+            return
+        length = struct.unpack(">H", length)[0] - 2
+
+        if code == 0xE1 and length <= MAX_APP1_SIZE:
+            segment = f.read(length)
+            if segment[:6] == b"Exif\x00\x00":
+                _parse_tiff(segment[6:], info)
+            continue
+
+        # SOF: dimensi asli (lebih dipercaya dari tag EXIF)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            sof = f.read(5)
+            if len(sof) == 5:
+                info["height"], info["width"] = struct.unpack(
+                    ">HH", sof[1:5]
+                )
+            return
+
+        f.seek(length, 1)
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def read_exif(path, st=None):
+    """
+    Return dict EXIF_FIELDS. Tanpa tanggal EXIF, taken_at = mtime
+    file (date_source = "mtime").
+    """
+    info = dict.fromkeys(EXIF_FIELDS)
+    info["has_gps"] = False
+
+    ext = path.rsplit(".", 1)[-1].lower()
+
+    try:
+        if ext in ("jpg", "jpeg"):
+            with open(path, "rb") as f:
+                _read_jpeg(f, info)
+        else:
+            size = image_size(path)
+            if size:
+                info["width"], info["height"] = size
+
+        if info["taken_at"] is None:
+            st = st or os.stat(path)
+            info["taken_at"] = datetime.fromtimestamp(
+                st.st_mtime
+            ).strftime("%Y-%m-%d %H:%M:%S")
+            info["date_source"] = "mtime"
+    except (OSError, struct.error, IndexError, ValueError):
+        pass
+
+    return info
+
+
+def exif_meta(info):
+    """
+    Teks untuk index pencarian: tanggal ambil & kamera
+    """
+    parts = []
+    if info.get("date_source") == "exif" and info.get("taken_at"):
+        parts.append(info["taken_at"][:10])
+    if info.get("camera"):
+        parts.append(info["camera"])
+    return " ".join(parts)
@@ -4,17 +4,64 @@ Business logic upload & akses file user
 """
 
 import os
-from werkzeug.utils import secure_filename
+import json
+import time
+import base64
+import bisect
+import secrets
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from werkzeug.utils import secure_filename, safe_join
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 from core.cms_bash_folder import UPLOAD_FOLDER
+from core.cms_jobs import enqueue
+from app.services.thumbnail_service import (
+    is_thumbnailable,
+    remove_thumbnails,
+)
+from app.services.watcher_service import (
+    FileView,
+    get_listing,
+    get_listing_state,
+    record_changes,
+)
+from app.repositories.file_index_repository import usage_by_user
+from app.repositories.media_repository import delete_hls_playlist
+from app.services import cas_service
+from app.services.upload_jobs import needs_metadata
+from app.services.gallery_service import remove_photos, move_photo_path
+from app.services.search_service import remove_upload, move_upload
+from app.services.quota_service import (
+    remaining_bytes,
+    reserve_upload,
+    refund_upload,
+    record_delete,
+)
 
 
 ALLOWED_EXTENSIONS = {
     "png", "jpg", "jpeg", "gif",
-    "pdf", "txt", "zip"
+    "pdf", "txt", "zip",
+    "mp4", "mkv", "webm", "mov",
+    "mp3", "flac", "m4a", "ogg", "wav",
 }
 
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB (upload single-shot)
+
+COPY_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# file setengah jadi, satu filesystem dengan folder user (rename atomic)
+STAGING_FOLDER = os.path.join(UPLOAD_FOLDER, ".staging")
+
+# file lock per user (antar worker / process)
+LOCK_FOLDER = os.path.join(UPLOAD_FOLDER, ".locks")
 
 
 def allowed_file(filename):
@@ -30,61 +77,418 @@ def get_user_upload_dir(username):
     return path
 
 
-def save_user_file(file_storage, username):
+def get_user_subdir(username, subdir=""):
+    base = get_user_upload_dir(username)
+    path = safe_join(base, subdir) if subdir else base
+
+    if path is None:
+        raise ValueError("Folder tidak valid")
+
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def after_file_saved(path):
+    """
+    Pekerjaan lanjutan setelah file baru masuk ke folder user,
+    semuanya diantrikan ke job worker (index, thumbnail, metadata).
+    """
+    enqueue("index_upload", {"path": path})
+
+    if is_thumbnailable(path):
+        enqueue("thumbnail", {"path": path})
+
+    if needs_metadata(path):
+        enqueue("metadata", {"path": path})
+
+
+# =====================================================
+# UPLOAD (SINGLE-SHOT)
+# =====================================================
+
+def _copy_limited(src, dst_path, limit, hasher=None,
+                  message="Ukuran file terlalu besar (maks 10MB)"):
+    """
+    Salin stream ke file per chunk, batalkan jika melewati limit.
+    Memori konstan, tidak perlu seek untuk mengukur ukuran.
+    Jika hasher diberikan, isi di-hash sambil disalin.
+    """
+    written = 0
+
+    with open(dst_path, "wb") as dst:
+        while True:
+            chunk = src.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            written += len(chunk)
+            if written > limit:
+                raise ValueError(message)
+
+            if hasher:
+                hasher.update(chunk)
+            dst.write(chunk)
+
+    return written
+
+
+def commit_staged_file(tmp_path, path, digest=None):
+    """
+    Pindahkan file staging ke path final.
+    Mode CAS: simpan sebagai blob (dedup) lalu hardlink ke path user.
+    Tanpa digest, file dipindah biasa & di-hash oleh job "cas_hash".
+    """
+    if cas_service.is_enabled() and digest:
+        cas_service.store_file(tmp_path, digest, path)
+        return
+
+    os.replace(tmp_path, path)
+
+    if cas_service.is_enabled():
+        enqueue("cas_hash", {"path": path})
+
+
+def save_user_file(file_storage, username, subdir=""):
     if not allowed_file(file_storage.filename):
         raise ValueError("Tipe file tidak diizinkan")
 
-    file_storage.stream.seek(0, os.SEEK_END)
-    size = file_storage.stream.tell()
-    file_storage.stream.seek(0)
+    filename = secure_filename(file_storage.filename)
+    folder = get_user_subdir(username, subdir)
+    path = os.path.join(folder, filename)
 
-    if size > MAX_FILE_SIZE:
-        raise ValueError("Ukuran file terlalu besar (maks 10MB)")
+    if os.path.exists(path):
+        raise ValueError("File sudah ada")
 
-    filename = secure_filename(file_storage.filename)
-    user_dir = get_user_upload_dir(username)
+    os.makedirs(STAGING_FOLDER, exist_ok=True)
+    tmp = os.path.join(STAGING_FOLDER, secrets.token_hex(16) + ".part")
+    hasher = cas_service.new_hasher() if cas_service.is_enabled() else None
+
+    # batas = min(maks per file, sisa kuota user)
+    limit = MAX_FILE_SIZE
+    message = "Ukuran file terlalu besar (maks 10MB)"
+    remaining = remaining_bytes(username)
+    if remaining is not None and remaining < limit:
+        limit = remaining
+        message = "Kuota penyimpanan tidak cukup"
+
+    try:
+        size = _copy_limited(
+            file_storage.stream, tmp, limit, hasher, message
+        )
+
+        # limit di atas hanya perkiraan: upload paralel bisa memakai
+        # sisa kuota yang sama, pemesanan ini yang menentukan
+        reserve_upload(username, size)
+        try:
+            commit_staged_file(
+                tmp, path, hasher.hexdigest() if hasher else None
+            )
+        except Exception:
+            refund_upload(username, size)
+            raise
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    after_file_saved(path)
+    return filename
 
-    filepath = os.path.join(user_dir, filename)
 
-    if os.path.exists(filepath):
-        raise ValueError("File dengan nama yang sama sudah ada")
+# =====================================================
+# LISTING
+# =====================================================
 
-    file_storage.save(filepath)
-    return filename
+LIST_PAGE_SIZE = 200
+MAX_LIST_PAGE_SIZE = 1000
+LIST_CACHE_DIRS = 64     # jumlah folder yang listing terurutnya di-cache
+MTIME_SETTLE_NS = 2 * 10**9  # mtime folder sebaru ini belum dipercaya
 
+# primary key per sort; folder selalu di atas, nama = tie-breaker unik
+LIST_SORT_KEYS = {
+    "name": lambda e: e["name"].lower(),
+    "size": lambda e: 0 if e["is_dir"] else e["size"],
+    "date": lambda e: e["mtime_ns"],
+    "type": lambda e: "" if e["is_dir"] else e["type"],
+}
+
+_listing_cache = OrderedDict()  # folder -> (mtime_ns, entries, {sort: ...})
+_listing_lock = threading.Lock()
+
+
+class _Desc:
+    """
+    Pembalik urutan untuk tuple key, agar listing descending
+    tetap bisa di-bisect seperti ascending
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
 
-def list_user_files(username):
-    user_dir = get_user_upload_dir(username)
-    return sorted(os.listdir(user_dir))
 
+def _entry_key(values, order):
+    group, primary, lower, name = values
+    tail = (primary, lower, name)
+    return (group, _Desc(tail) if order == "desc" else tail)
 
-def list_all_files():
-    base = os.path.join(UPLOAD_FOLDER, "users")
-    result = {}
 
-    if not os.path.exists(base):
+def _entry_values(entry, sort):
+    return (
+        0 if entry["is_dir"] else 1,
+        LIST_SORT_KEYS[sort](entry),
+        entry["name"].lower(),
+        entry["name"],
+    )
+
+
+def _view_version(folder, mtime_ns):
+    """
+    Versi view watcher untuk folder, hanya jika view di-scan pada
+    mtime folder saat ini. None = view tidak ada / tertinggal dari
+    disk (flush belum selesai) -> listing dibaca dari disk.
+    """
+    state = get_listing_state(folder)
+    if state is not None and state[0] == mtime_ns:
+        return state[1]
+    return None
+
+
+def _listing_source(folder, version):
+    """
+    {name: (size, mtime_ns, is_dir)}: view watcher (tanpa akses disk),
+    atau scandir + stat
+    """
+    entries = get_listing(folder) if version is not None else None
+    if entries is None:
+        entries = FileView.read_dir(folder) or {}
+    return entries
+
+
+def _read_entries(entries):
+    return [
+        {
+            "name": name,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "is_dir": is_dir,
+            "type": (
+                "" if is_dir or "." not in name
+                else name.rsplit(".", 1)[1].lower()
+            ),
+        }
+        for name, (size, mtime_ns, is_dir) in entries.items()
+        if not name.startswith(".")
+    ]
+
+
+def _sorted_listing(folder, sort, order):
+    """
+    (entries terurut, keys) dari cache per folder.
+    Cache invalid saat mtime folder berubah (file ditambah,
+    dihapus atau di-rename di dalamnya) atau versi view berubah.
+    _listing_lock hanya dipegang saat lookup / simpan cache;
+    scandir & sort jalan di luar lock (folder lain tidak menunggu).
+    """
+    mtime_ns = os.stat(folder).st_mtime_ns
+    key = (mtime_ns, _view_version(folder, mtime_ns))
+
+    with _listing_lock:
+        cached = _listing_cache.get(folder)
+        if cached is not None and cached[0] == key:
+            _listing_cache.move_to_end(folder)
+        else:
+            cached = None
+
+    if cached is None:
+        entries = _listing_source(folder, key[1])
+        cached = (key, _read_entries(entries), {})
+        # filesystem dengan resolusi mtime kasar (FAT, sdcard):
+        # perubahan di detik yang sama tidak terdeteksi, jadi
+        # folder yang baru berubah tidak di-cache
+        if time.time_ns() - mtime_ns > MTIME_SETTLE_NS:
+            with _listing_lock:
+                _listing_cache[folder] = cached
+                while len(_listing_cache) > LIST_CACHE_DIRS:
+                    _listing_cache.popitem(last=False)
+
+    variants = cached[2]
+    with _listing_lock:
+        result = variants.get((sort, order))
+    if result is not None:
         return result
 
-    for user in os.listdir(base):
-        user_path = os.path.join(base, user)
-        if os.path.isdir(user_path):
-            result[user] = os.listdir(user_path)
+    keyed = sorted(
+        (_entry_key(_entry_values(e, sort), order), e)
+        for e in cached[1]
+    )
+    result = ([e for _, e in keyed], [k for k, _ in keyed])
+
+    with _listing_lock:
+        return variants.setdefault((sort, order), result)
+
+
+def _encode_list_cursor(sort, order, values):
+    raw = json.dumps([sort, order, *values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_list_cursor(cursor, sort, order):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, c_order, *values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor tidak valid")
+
+    if (c_sort, c_order) != (sort, order) or len(values) != 4:
+        raise ValueError("Cursor tidak cocok dengan urutan")
 
-    return result
+    return values
+
+
+def list_user_files(username, subdir="", sort="name", order="asc",
+                    cursor=None, limit=LIST_PAGE_SIZE):
+    """
+    Listing satu folder user per halaman.
+    Return {"entries": [...], "next_cursor": str|None, "total": int}.
+    Cursor = posisi entry terakhir (keyset), tetap benar walau
+    isi folder berubah di antara dua halaman.
+    """
+    if sort not in LIST_SORT_KEYS:
+        raise ValueError("Sort tidak valid")
+    if order not in ("asc", "desc"):
+        raise ValueError("Order tidak valid")
+
+    limit = max(1, min(limit, MAX_LIST_PAGE_SIZE))
+    folder = get_user_subdir(username, subdir)
+    entries, keys = _sorted_listing(folder, sort, order)
+
+    start = 0
+    if cursor:
+        values = _decode_list_cursor(cursor, sort, order)
+        start = bisect.bisect_right(keys, _entry_key(values, order))
+
+    page = entries[start:start + limit]
+
+    next_cursor = None
+    if start + limit < len(entries):
+        next_cursor = _encode_list_cursor(
+            sort, order, _entry_values(page[-1], sort)
+        )
+
+    return {
+        "entries": [
+            {
+                "name": e["name"],
+                "size": e["size"],
+                "mtime": e["mtime_ns"] / 1e9,
+                "modified": datetime.fromtimestamp(
+                    e["mtime_ns"] / 1e9
+                ).strftime("%Y-%m-%d %H:%M"),
+                "is_dir": e["is_dir"],
+                "type": e["type"],
+            }
+            for e in page
+        ],
+        "next_cursor": next_cursor,
+        "total": len(entries),
+    }
+
+
+def storage_usage():
+    """
+    Jumlah file & byte per user dari snapshot watcher
+    """
+    return usage_by_user()
 
 def can_access_file(request_user, owner_user, is_root):
     if is_root:
         return True
     return request_user == owner_user
 
+# =====================================================
+# DELETE / RENAME / MOVE
+# =====================================================
+
+_user_locks = {}
+_user_locks_guard = threading.Lock()
+
+
+def _thread_lock(username):
+    with _user_locks_guard:
+        lock = _user_locks.get(username)
+        if lock is None:
+            lock = _user_locks[username] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def user_lock(username):
+    """
+    Lock per user: operasi tulis (single & batch) pada folder user
+    yang sama dijalankan berurutan, juga antar worker process
+    (flock pada LOCK_FOLDER/<user>.lock). Tanpa fcntl (Windows)
+    hanya berlaku di proses ini.
+    """
+    with _thread_lock(username):
+        if not fcntl:
+            yield
+            return
+
+        os.makedirs(LOCK_FOLDER, exist_ok=True)
+        with open(os.path.join(LOCK_FOLDER, f"{username}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def remove_file_path(username, path):
+    """
+    Hapus satu file user beserta turunannya (thumbnail, playlist HLS,
+    blob CAS, index pencarian & foto, kuota). Tanpa refresh watcher.
+    """
+    size = os.path.getsize(path)
+
+    remove_thumbnails(path)
+    delete_hls_playlist(path)
+    os.remove(path)
+    cas_service.release_file(path)
+    remove_upload(path)
+    remove_photos([path])
+    record_delete(username, size)
+
+
+def move_file_path(old_path, new_path):
+    """
+    Pindah / rename satu file user (boleh beda subfolder).
+    Tanpa refresh watcher.
+    """
+    remove_thumbnails(old_path)
+    delete_hls_playlist(old_path)
+    os.rename(old_path, new_path)
+    cas_service.move_file(old_path, new_path)
+    move_upload(old_path, new_path)
+    move_photo_path(old_path, new_path)
+
+
 def delete_user_file(username, filename):
     user_dir = get_user_upload_dir(username)
     path = os.path.join(user_dir, filename)
 
-    if not os.path.exists(path):
-        raise FileNotFoundError("File tidak ditemukan")
+    with user_lock(username):
+        if not os.path.exists(path):
+            raise FileNotFoundError("File tidak ditemukan")
 
-    os.remove(path)
+        remove_file_path(username, path)
+
+    record_changes(removed=[path])
 
 
 def rename_user_file(username, old, new):
@@ -95,43 +499,13 @@ def rename_user_file(username, old, new):
     old_path = os.path.join(user_dir, old)
     new_path = os.path.join(user_dir, secure_filename(new))
 
-    if not os.path.exists(old_path):
-        raise FileNotFoundError("File tidak ditemukan")
+    with user_lock(username):
+        if not os.path.exists(old_path):
+            raise FileNotFoundError("File tidak ditemukan")
 
-    if os.path.exists(new_path):
-        raise ValueError("Nama file sudah ada")
+        if os.path.exists(new_path):
+            raise ValueError("Nama file sudah ada")
 
-    os.rename(old_path, new_path)
-
-def get_user_subdir(username, subdir=""):
-    base = os.path.join(UPLOAD_FOLDER, "users", username)
-    path = os.path.join(base, subdir)
-    os.makedirs(path, exist_ok=True)
-    return path
-
-
-def list_user_files(username, subdir=""):
-    folder = get_user_subdir(username, subdir)
-    return sorted(os.listdir(folder))
-
-
-def save_user_file(file_storage, username, subdir=""):
-    if not allowed_file(file_storage.filename):
-        raise ValueError("Tipe file tidak diizinkan")
-
-    file_storage.stream.seek(0, os.SEEK_END)
-    size = file_storage.stream.tell()
-    file_storage.stream.seek(0)
-
-    if size > MAX_FILE_SIZE:
-        raise ValueError("Ukuran file terlalu besar")
-
-    filename = secure_filename(file_storage.filename)
-    folder = get_user_subdir(username, subdir)
-    path = os.path.join(folder, filename)
-
-    if os.path.exists(path):
-        raise ValueError("File sudah ada")
+        move_file_path(old_path, new_path)
 
-    file_storage.save(path)
-    return filename
\ No newline at end of file
+    record_changes(changed=[new_path], removed=[old_path])
@@ -0,0 +1,135 @@
+"""
+gallery_service.py
+Timeline foto (library & upload user) berurut tanggal ambil EXIF,
+dengan keyset pagination (cursor opaque)
+"""
+
+import os
+import base64
+
+from core.cms_bash_folder import UPLOAD_FOLDER
+
+from app.repositories.photo_repository import (
+    upsert_photos,
+    delete_photos,
+    move_photo,
+    unindexed_image_paths,
+    timeline_page,
+)
+from app.services.exif_service import read_exif, exif_meta
+from app.services.search_service import index_media_meta
+
+
+USERS_FOLDER = os.path.join(UPLOAD_FOLDER, "users")
+
+PHOTO_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp", "heic"}
+
+DEFAULT_PAGE_SIZE = 60
+MAX_PAGE_SIZE = 200
+GALLERY_SCOPES = ("all", "mine", "library")
+
+
+# =====================================================
+# INDEX
+# =====================================================
+
+def is_photo(path):
+    return (
+        "." in path
+        and path.rsplit(".", 1)[1].lower() in PHOTO_EXTENSIONS
+    )
+
+
+def owner_of(path):
+    """
+    Username pemilik file upload, None untuk media library
+    """
+    rel = os.path.relpath(path, USERS_FOLDER)
+    if rel.startswith(".."):
+        return None
+    return rel.split(os.sep, 1)[0]
+
+
+def index_photos(paths):
+    """
+    Baca header EXIF lalu simpan ke tabel photos
+    & kolom meta index pencarian
+    """
+    rows = []
+    for path in paths:
+        info = read_exif(path)
+        if info["taken_at"]:
+            rows.append((path, owner_of(path), info))
+
+    upsert_photos(rows)
+    index_media_meta([
+        (path, exif_meta(info)) for path, _, info in rows
+    ])
+    return len(rows)
+
+
+def index_missing_photos():
+    """
+    Backfill gambar library yang di-index sebelum tabel photos ada
+    """
+    return index_photos(unindexed_image_paths())
+
+
+def remove_photos(paths):
+    delete_photos(paths)
+
+
+def move_photo_path(old_path, new_path):
+    move_photo(old_path, new_path)
+
+
+# =====================================================
+# CURSOR
+# =====================================================
+
+def encode_cursor(taken_at, photo_id):
+    raw = f"{taken_at}|{photo_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        taken_at, photo_id = raw.decode().rsplit("|", 1)
+        return taken_at, int(photo_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor tidak valid")
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def gallery_page(username, scope="all", cursor=None,
+                 limit=DEFAULT_PAGE_SIZE):
+    """
+    Return (photos, next_cursor). next_cursor None = halaman terakhir.
+    """
+    if scope not in GALLERY_SCOPES:
+        raise ValueError("Scope tidak valid")
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    owners = {
+        "all": [None, username],
+        "mine": [username],
+        "library": [None],
+    }[scope]
+
+    # ambil satu baris ekstra untuk tahu ada halaman berikutnya
+    rows = timeline_page(owners, decode_cursor(cursor), limit + 1)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][3], rows[-1][0])
+
+    return rows, next_cursor
@@ -0,0 +1,193 @@
+"""
+inventory_service.py
+Inventaris semua file user untuk admin
+(scan paralel, snapshot cache, pagination, sort & filter)
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.watcher_service import USERS_FOLDER, get_listing
+
+
+SNAPSHOT_TTL = 30     # detik
+SCAN_WORKERS = 8
+PER_PAGE = 50
+
+SORT_KEYS = {
+    "name": lambda e: e["path"].lower(),
+    "user": lambda e: (e["user"], e["path"].lower()),
+    "size": lambda e: e["size"],
+    "date": lambda e: e["mtime"],
+}
+
+_snapshot = None
+_snapshot_at = 0.0
+_snapshot_lock = threading.Lock()
+_sorted = {}  # sort key -> snapshot terurut (ikut invalid bersama snapshot)
+
+
+# =====================================================
+# SCAN
+# =====================================================
+
+def _scan_user_disk(user, user_path):
+    entries = []
+    stack = [(user_path, "")]
+
+    while stack:
+        current, prefix = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    rel = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, rel + "/"))
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append(_entry(user, rel, st.st_size, st.st_mtime))
+        except OSError:
+            continue
+
+    return entries
+
+
+def _scan_user_view(user, user_path):
+    """
+    Sama seperti _scan_user_disk tapi dari view watcher (tanpa I/O)
+    """
+    entries = []
+    stack = [(user_path, "")]
+
+    while stack:
+        current, prefix = stack.pop()
+        for name, (size, mtime_ns, is_dir) in (get_listing(current) or {}).items():
+            rel = prefix + name
+            if is_dir:
+                stack.append((os.path.join(current, name), rel + "/"))
+            else:
+                entries.append(_entry(user, rel, size, mtime_ns / 1e9))
+
+    return entries
+
+
+def _entry(user, rel, size, mtime):
+    name = rel.rsplit("/", 1)[-1]
+    ext = name.rsplit(".", 1)[1].lower() if "." in name else ""
+    return {
+        "user": user,
+        "path": rel,
+        "ext": ext,
+        "size": size,
+        "mtime": mtime,
+    }
+
+
+def _build_snapshot():
+    users = get_listing(USERS_FOLDER)
+
+    if users is not None:
+        return [
+            e
+            for user, (_, _, is_dir) in sorted(users.items()) if is_dir
+            for e in _scan_user_view(user, os.path.join(USERS_FOLDER, user))
+        ]
+
+    try:
+        with os.scandir(USERS_FOLDER) as it:
+            user_dirs = sorted(
+                (e.name, e.path) for e in it
+                if e.is_dir(follow_symlinks=False)
+            )
+    except FileNotFoundError:
+        return []
+
+    # fan-out per user: I/O stat jalan paralel
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        results = pool.map(lambda u: _scan_user_disk(*u), user_dirs)
+        return [e for entries in results for e in entries]
+
+
+def get_snapshot(force=False):
+    """
+    Snapshot inventaris, dibangun ulang paling sering tiap SNAPSHOT_TTL
+    """
+    global _snapshot, _snapshot_at
+
+    with _snapshot_lock:
+        expired = time.monotonic() - _snapshot_at > SNAPSHOT_TTL
+        if force or _snapshot is None or expired:
+            _snapshot = _build_snapshot()
+            _snapshot_at = time.monotonic()
+            _sorted.clear()
+        return _snapshot
+
+
+def _get_sorted(sort):
+    """
+    Snapshot terurut per sort key, di-cache agar paging tidak
+    mengurutkan ulang seluruh inventaris di setiap request
+    """
+    snapshot = get_snapshot()
+
+    with _snapshot_lock:
+        entries = _sorted.get(sort)
+        if entries is None:
+            entries = sorted(snapshot, key=SORT_KEYS[sort])
+            _sorted[sort] = entries
+        return entries
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def query_inventory(
+    user=None,
+    ext=None,
+    sort="name",
+    order="asc",
+    page=1,
+    per_page=PER_PAGE,
+):
+    entries = _get_sorted(sort if sort in SORT_KEYS else "name")
+
+    if user:
+        entries = [e for e in entries if e["user"] == user]
+
+    if ext:
+        ext = ext.lower().lstrip(".")
+        entries = [e for e in entries if e["ext"] == ext]
+
+    if order == "desc":
+        entries = entries[::-1]
+
+    total = len(entries)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+
+    items = [
+        dict(e, modified=datetime.utcfromtimestamp(e["mtime"]).strftime(
+            "%Y-%m-%d %H:%M"
+        ))
+        for e in entries[start:start + per_page]
+    ]
+
+    return {
+        "items": items,
+        "total": total,
+        "total_size": sum(e["size"] for e in entries),
+        "page": page,
+        "pages": pages,
+    }
+
+
+def inventory_users():
+    return sorted({e["user"] for e in get_snapshot()})
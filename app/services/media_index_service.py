@@ -0,0 +1,336 @@
+"""
+media_index_service.py
+Scanner incremental MUSIC_FOLDER, VIDEO_FOLDER & PICTURES_FOLDER
+ke tabel media_files (SQLite)
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+
+from core.cms_logger import get_logger
+from core.cms_bash_folder import (
+    MUSIC_FOLDER,
+    VIDEO_FOLDER,
+    PICTURES_FOLDER,
+)
+
+from app.repositories.db import release_db
+from app.repositories.media_repository import (
+    load_index_state,
+    load_folder_state,
+    upsert_media_batch,
+    delete_media_paths,
+    get_media_by_id,
+)
+from app.repositories.music_repository import (
+    upsert_tracks,
+    delete_tracks,
+    untagged_audio_paths,
+)
+from app.repositories.migrate import run_migrations
+from app.services.media_probe_service import probe
+from app.services.audio_tag_service import iter_tag_batches
+from app.services.search_service import (
+    index_media,
+    index_media_meta,
+    index_missing_media,
+    remove_media,
+    tag_meta,
+)
+from app.services.gallery_service import (
+    index_photos,
+    index_missing_photos,
+    remove_photos,
+)
+
+
+log = get_logger("CMS_MEDIA_INDEX")
+
+MEDIA_ROOTS = {
+    "music": MUSIC_FOLDER,
+    "video": VIDEO_FOLDER,
+    "pictures": PICTURES_FOLDER,
+}
+
+MEDIA_EXTENSIONS = {
+    "audio": {"mp3", "flac", "m4a", "aac", "ogg", "opus", "wav"},
+    "video": {"mp4", "m4v", "mkv", "webm", "mov", "avi"},
+    "image": {"jpg", "jpeg", "png", "gif", "webp", "heic"},
+}
+
+EXTENSION_TYPES = {
+    ext: media_type
+    for media_type, exts in MEDIA_EXTENSIONS.items()
+    for ext in exts
+}
+
+BATCH_SIZE = 1000
+SCAN_INTERVAL = 15 * 60  # background scan tiap 15 menit
+
+_scan_lock = threading.Lock()
+
+
+# =====================================================
+# UTIL
+# =====================================================
+
+def media_type_of(filename):
+    if "." not in filename:
+        return None
+    return EXTENSION_TYPES.get(filename.rsplit(".", 1)[1].lower())
+
+
+def library_media_path(media_id, media_types=("video", "audio")):
+    """
+    Path file media library untuk id index, None jika tidak ada,
+    tipenya tidak cocok atau path di luar root library
+    """
+    row = get_media_by_id(media_id)
+    if row is None or row[5] not in media_types:
+        return None
+
+    path = row[2]
+    root = MEDIA_ROOTS.get(row[1])
+    if root is None or not path.startswith(root.rstrip("/") + "/"):
+        return None
+    if not os.path.isfile(path):
+        return None
+
+    return path
+
+
+def _walk(folder):
+    """
+    Walk rekursif dengan os.scandir (tanpa listdir + stat terpisah)
+    """
+    stack = [folder]
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except OSError as e:
+            log.warning(f"[MEDIA] Gagal membaca {current}: {e}")
+
+
+# =====================================================
+# SCAN
+# =====================================================
+
+def _scan_tree(root, folder, known, full=False):
+    """
+    Scan satu subtree. Entry yang (inode, size, mtime) tidak berubah
+    dilewati tanpa membuka file.
+    """
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    seen = set()
+    batch = []
+    audio = []
+    images = []
+    now = datetime.utcnow().isoformat()
+
+    if os.path.isdir(folder):
+        for entry in _walk(folder):
+            media_type = media_type_of(entry.name)
+            if media_type is None:
+                continue
+
+            path = entry.path
+            seen.add(path)
+
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+            signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+            previous = None if full else known.get(path)
+
+            if previous == signature:
+                stats["unchanged"] += 1
+                continue
+
+            stats["updated" if path in known else "added"] += 1
+
+            if media_type == "audio":
+                audio.append(path)
+            elif media_type == "image":
+                images.append(path)
+
+            info = probe(path, media_type)
+            batch.append((
+                root, path,
+                st.st_ino, st.st_size, st.st_mtime_ns,
+                media_type,
+                info["width"], info["height"], info["duration"],
+                now,
+            ))
+
+            if len(batch) >= BATCH_SIZE:
+                _flush_batch(batch)
+                batch = []
+
+    _flush_batch(batch)
+
+    removed = [path for path in known if path not in seen]
+    delete_media_paths(removed)
+    delete_tracks(removed)
+    remove_media(removed)
+    remove_photos(removed)
+    stats["removed"] = len(removed)
+
+    # tahap tag audio & EXIF foto: hanya file baru / berubah
+    stats["tagged"] = index_tags(audio)
+    stats["photos"] = index_photos(images)
+
+    return stats
+
+
+def _flush_batch(batch):
+    upsert_media_batch(batch)
+    index_media([row[1] for row in batch])
+
+
+def index_tags(paths):
+    """
+    Ekstrak tag audio (process pool per batch) ke tabel track
+    & kolom meta index pencarian
+    """
+    count = 0
+    for items in iter_tag_batches(paths):
+        upsert_tracks(items)
+        index_media_meta([(path, tag_meta(tags)) for path, tags in items])
+        count += len(items)
+    return count
+
+
+def scan_root(root, folder, full=False):
+    return _scan_tree(root, folder, load_index_state(root), full=full)
+
+
+def scan_folder(root, folder):
+    """
+    Scan ulang satu folder (dan subfolder) di dalam root.
+    Dipakai watcher agar perubahan kecil tidak men-scan seluruh library.
+    """
+    with _scan_lock:
+        return _scan_tree(root, folder, load_folder_state(folder))
+
+
+def scan_library(roots=None, full=False):
+    """
+    Scan semua root media (atau sebagian). Aman dipanggil paralel:
+    scan kedua menunggu scan pertama selesai.
+    """
+    roots = roots or list(MEDIA_ROOTS)
+    result = {}
+
+    with _scan_lock:
+        run_migrations()
+
+        for root in roots:
+            started = time.monotonic()
+            stats = scan_root(root, MEDIA_ROOTS[root], full=full)
+            stats["seconds"] = round(time.monotonic() - started, 3)
+            result[root] = stats
+
+            log.info(f"[MEDIA] {root}: {stats}")
+
+        backfill = index_tags(untagged_audio_paths())
+        if backfill:
+            log.info(f"[MEDIA] tag audio susulan: {backfill} file")
+
+        backfill = index_missing_photos()
+        if backfill:
+            log.info(f"[MEDIA] EXIF foto susulan: {backfill} file")
+
+        backfill = index_missing_media()
+        if backfill:
+            log.info(f"[MEDIA] index pencarian susulan: {backfill} file")
+
+    return result
+
+
+# =====================================================
+# BACKGROUND JOB
+# =====================================================
+
+_scanner_thread = None
+
+
+def _scan_loop(interval):
+    while True:
+        try:
+            scan_library()
+        except Exception:
+            log.exception("[MEDIA] Background scan gagal")
+        finally:
+            release_db()
+        time.sleep(interval)
+
+
+def start_background_scan(interval=SCAN_INTERVAL):
+    """
+    Jalankan scan berkala di thread daemon (idempotent)
+    """
+    global _scanner_thread
+
+    if _scanner_thread and _scanner_thread.is_alive():
+        return _scanner_thread
+
+    _scanner_thread = threading.Thread(
+        target=_scan_loop,
+        args=(interval,),
+        name="media-indexer",
+        daemon=True,
+    )
+    _scanner_thread.start()
+    return _scanner_thread
+
+
+# =====================================================
+# CLI
+# =====================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Scan media library ke database CMS"
+    )
+    parser.add_argument(
+        "--root",
+        action="append",
+        choices=sorted(MEDIA_ROOTS),
+        help="root yang di-scan (default: semua)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="abaikan index lama, probe ulang semua file",
+    )
+    args = parser.parse_args(argv)
+
+    result = scan_library(args.root, full=args.full)
+
+    for root, stats in result.items():
+        print(
+            f"{root:10} +{stats['added']} ~{stats['updated']} "
+            f"-{stats['removed']} ={stats['unchanged']} "
+            f"({stats['seconds']}s)"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+media_probe_service.py
+Membaca info media (dimensi / durasi) hanya dari header file
+"""
+
+import struct
+
+
+# =====================================================
+# GAMBAR (PNG / GIF / JPEG)
+# =====================================================
+
+def _png_size(f):
+    head = f.read(24)
+    if len(head) < 24 or head[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    return struct.unpack(">II", head[16:24])
+
+
+def _gif_size(f):
+    head = f.read(10)
+    if len(head) < 10 or head[:4] != b"GIF8":
+        return None
+    return struct.unpack("<HH", head[6:10])
+
+
+def _jpeg_size(f):
+    if f.read(2) != b"\xff\xd8":
+        return None
+
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+
+        code = marker[1]
+
+        # marker tanpa panjang
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        length = struct.unpack(">H", length)[0]
+
+        # SOF0..SOF15 (kecuali DHT, JPG, DAC)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+
+        f.seek(length - 2, 1)
+
+
+def image_size(path):
+    """
+    Return (width, height) atau None
+    """
+    ext = path.rsplit(".", 1)[-1].lower()
+    reader = {
+        "png": _png_size,
+        "gif": _gif_size,
+        "jpg": _jpeg_size,
+        "jpeg": _jpeg_size,
+    }.get(ext)
+
+    if reader is None:
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            return reader(f)
+    except (OSError, struct.error):
+        return None
+
+
+# =====================================================
+# MP4 / MOV (box ISO-BMFF)
+# =====================================================
+
+def iter_boxes(f, start, end):
+    """
+    Iterasi box ISO-BMFF di antara offset start..end.
+    Yield (type, offset_payload, ukuran_payload).
+    """
+    pos = start
+
+    while pos + 8 <= end:
+        f.seek(pos)
+        head = f.read(8)
+        if len(head) < 8:
+            return
+
+        size, box_type = struct.unpack(">I4s", head)
+        header = 8
+
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+
+        if size < header:
+            return
+
+        yield box_type.decode("latin-1"), pos + header, size - header
+        pos += size
+
+
+def find_box(f, start, end, path):
+    """
+    Cari box bersarang, contoh path: ["moov", "mvhd"]
+    """
+    for box_type, offset, size in iter_boxes(f, start, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return offset, size
+            return find_box(f, offset, offset + size, path[1:])
+    return None
+
+
+def mp4_duration(path):
+    """
+    Durasi (detik) dari box moov/mvhd
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            end = f.tell()
+
+            found = find_box(f, 0, end, ["moov", "mvhd"])
+            if not found:
+                return None
+
+            offset, _ = found
+            f.seek(offset)
+            version = f.read(4)[0]
+
+            if version == 1:
+                f.seek(16, 1)
+                timescale, duration = struct.unpack(">IQ", f.read(12))
+            else:
+                f.seek(8, 1)
+                timescale, duration = struct.unpack(">II", f.read(8))
+
+            if not timescale:
+                return None
+
+            return duration / timescale
+    except (OSError, struct.error, IndexError):
+        return None
+
+
+# =====================================================
+# WAV
+# =====================================================
+
+def wav_duration(path):
+    try:
+        with open(path, "rb") as f:
+            head = f.read(12)
+            if head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+                return None
+
+            byte_rate = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+
+                chunk_id, size = struct.unpack("<4sI", chunk)
+
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size)
+                    byte_rate = struct.unpack("<I", fmt[8:12])[0]
+                    continue
+
+                if chunk_id == b"data":
+                    return size / byte_rate if byte_rate else None
+
+                f.seek(size + (size & 1), 1)
+    except (OSError, struct.error):
+        return None
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def probe(path, media_type):
+    """
+    Return dict {width, height, duration} (nilai None jika tidak diketahui)
+    """
+    info = {"width": None, "height": None, "duration": None}
+    ext = path.rsplit(".", 1)[-1].lower()
+
+    if media_type == "image":
+        size = image_size(path)
+        if size:
+            info["width"], info["height"] = size
+
+    elif ext in ("mp4", "m4v", "mov", "m4a"):
+        info["duration"] = mp4_duration(path)
+
+    elif ext == "wav":
+        info["duration"] = wav_duration(path)
+
+    return info
@@ -0,0 +1,398 @@
+"""
+mp4_service.py
+Parser box MP4 (pure Python) & pembuat playlist HLS byte-range
+langsung dari file asli (tanpa transcoding / salin segmen).
+
+Hanya MP4 fragmented (fMP4 / CMAF: moov berisi mvex, data dalam
+pasangan moof + mdat) yang didukung: init segment = ftyp + moov,
+tiap segmen = satu atau beberapa fragment utuh. MP4 biasa
+(non-fragmented) tidak punya moof per segmen sehingga byte-range
+mdat mentah tidak bisa diputar player HLS; file seperti ini ditolak
+(MP4ParseError) dan diputar progresif lewat URL file (Range).
+"""
+
+import os
+import math
+import struct
+
+from app.services.media_probe_service import iter_boxes, find_box
+from app.repositories.media_repository import (
+    get_hls_playlist,
+    save_hls_playlist,
+)
+
+
+TARGET_SEGMENT = 6.0  # detik, segmen dipotong di fragment keyframe berikutnya
+HLS_EXTENSIONS = {"mp4", "m4v", "mov"}
+URI_PLACEHOLDER = "{uri}"
+
+# box yang boleh mendahului moof dalam satu fragment
+FRAGMENT_PREFIX = {"styp", "sidx", "prft", "emsg"}
+
+# flag tfhd / trun (ISO/IEC 14496-12)
+TFHD_BASE_DATA_OFFSET = 0x01
+TFHD_SAMPLE_DESCRIPTION = 0x02
+TFHD_DEFAULT_DURATION = 0x08
+TFHD_DEFAULT_SIZE = 0x10
+TFHD_DEFAULT_FLAGS = 0x20
+
+TRUN_DATA_OFFSET = 0x01
+TRUN_FIRST_FLAGS = 0x04
+TRUN_DURATION = 0x100
+TRUN_SIZE = 0x200
+TRUN_FLAGS = 0x400
+TRUN_CTO = 0x800
+
+SAMPLE_NON_SYNC = 0x00010000
+
+
+class MP4ParseError(ValueError):
+    """
+    File bukan MP4 yang bisa dipetakan ke HLS
+    """
+    pass
+
+
+# =====================================================
+# BOX READER
+# =====================================================
+
+def _read(f, offset, size):
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) < size:
+        raise MP4ParseError("Box terpotong")
+    return data
+
+
+def _full_box(f, box):
+    """
+    Return (flags, offset_setelah_version_flags) dari full box
+    """
+    offset, _ = box
+    flags = struct.unpack(">I", _read(f, offset, 4))[0] & 0xFFFFFF
+    return flags, offset + 4
+
+
+def _top_level(f, end):
+    """
+    Semua box top-level berurutan (mdat / moof bisa banyak):
+    list (type, box_start, payload_offset, payload_size)
+    """
+    boxes = []
+    pos = 0
+
+    for box_type, offset, size in iter_boxes(f, 0, end):
+        boxes.append((box_type, pos, offset, size))
+        pos = offset + size
+
+    return boxes
+
+
+def _video_track(f, moov):
+    """
+    Track dengan handler 'vide': return (track_id, timescale)
+    """
+    offset, size = moov
+
+    for box_type, t_offset, t_size in iter_boxes(f, offset, offset + size):
+        if box_type != "trak":
+            continue
+
+        t_end = t_offset + t_size
+        mdia = find_box(f, t_offset, t_end, ["mdia"])
+        if not mdia:
+            continue
+
+        m_start, m_end = mdia[0], mdia[0] + mdia[1]
+        hdlr = find_box(f, m_start, m_end, ["hdlr"])
+        if not hdlr or _read(f, hdlr[0] + 8, 4) != b"vide":
+            continue
+
+        tkhd = find_box(f, t_offset, t_end, ["tkhd"])
+        mdhd = find_box(f, m_start, m_end, ["mdhd"])
+        if not tkhd or not mdhd:
+            raise MP4ParseError("tkhd / mdhd tidak ditemukan")
+
+        version = _read(f, tkhd[0], 1)[0]
+        track_at = tkhd[0] + (20 if version == 1 else 12)
+        track_id = struct.unpack(">I", _read(f, track_at, 4))[0]
+
+        version = _read(f, mdhd[0], 1)[0]
+        timescale_at = mdhd[0] + (20 if version == 1 else 12)
+        timescale = struct.unpack(">I", _read(f, timescale_at, 4))[0]
+
+        return track_id, timescale
+
+    raise MP4ParseError("Track video tidak ditemukan")
+
+
+def _track_defaults(f, mvex, track_id):
+    """
+    trex: (default_sample_duration, default_sample_flags)
+    """
+    offset, size = mvex
+
+    for box_type, b_offset, _ in iter_boxes(f, offset, offset + size):
+        if box_type != "trex":
+            continue
+        values = struct.unpack(">IIIIII", _read(f, b_offset, 24))
+        if values[1] == track_id:
+            return values[3], values[5]
+
+    return 0, 0
+
+
+# =====================================================
+# FRAGMENT (moof)
+# =====================================================
+
+def _fragment_info(f, moof, track_id, defaults):
+    """
+    Durasi (satuan timescale) & status keyframe sample pertama
+    track video di satu moof. None jika moof tidak memuat track ini.
+    """
+    offset, size = moof
+
+    for box_type, t_offset, t_size in iter_boxes(f, offset, offset + size):
+        if box_type != "traf":
+            continue
+
+        t_end = t_offset + t_size
+        tfhd = find_box(f, t_offset, t_end, ["tfhd"])
+        if not tfhd:
+            continue
+
+        flags, pos = _full_box(f, tfhd)
+        if struct.unpack(">I", _read(f, pos, 4))[0] != track_id:
+            continue
+        pos += 4
+
+        duration, sample_flags = defaults
+        if flags & TFHD_BASE_DATA_OFFSET:
+            pos += 8
+        if flags & TFHD_SAMPLE_DESCRIPTION:
+            pos += 4
+        if flags & TFHD_DEFAULT_DURATION:
+            duration = struct.unpack(">I", _read(f, pos, 4))[0]
+            pos += 4
+        if flags & TFHD_DEFAULT_SIZE:
+            pos += 4
+        if flags & TFHD_DEFAULT_FLAGS:
+            sample_flags = struct.unpack(">I", _read(f, pos, 4))[0]
+
+        total = 0
+        first_flags = None
+
+        for run_type, r_offset, r_size in iter_boxes(f, t_offset, t_end):
+            if run_type != "trun":
+                continue
+
+            flags, pos = _full_box(f, (r_offset, r_size))
+            count = struct.unpack(">I", _read(f, pos, 4))[0]
+            pos += 4
+
+            if flags & TRUN_DATA_OFFSET:
+                pos += 4
+
+            run_first = None
+            if flags & TRUN_FIRST_FLAGS:
+                run_first = struct.unpack(">I", _read(f, pos, 4))[0]
+                pos += 4
+
+            fields = [
+                flag for flag in (TRUN_DURATION, TRUN_SIZE, TRUN_FLAGS, TRUN_CTO)
+                if flags & flag
+            ]
+
+            if fields and count:
+                entries = struct.unpack(
+                    f">{count * len(fields)}I",
+                    _read(f, pos, count * len(fields) * 4)
+                )
+                width = len(fields)
+                if TRUN_DURATION in fields:
+                    at = fields.index(TRUN_DURATION)
+                    total += sum(entries[at::width])
+                else:
+                    total += count * duration
+                if run_first is None and TRUN_FLAGS in fields:
+                    run_first = entries[fields.index(TRUN_FLAGS)]
+            else:
+                total += count * duration
+
+            if first_flags is None and count:
+                first_flags = sample_flags if run_first is None else run_first
+
+        keyframe = not ((first_flags or 0) & SAMPLE_NON_SYNC)
+        return total, keyframe
+
+    return None
+
+
+def read_fragments(f, end):
+    """
+    Return dict:
+      timescale, init (start, end) untuk EXT-X-MAP,
+      fragments[] = (start, end, durasi, keyframe) per fragment
+    """
+    boxes = _top_level(f, end)
+    types = [box[0] for box in boxes]
+
+    if "moov" not in types:
+        raise MP4ParseError("moov tidak ditemukan")
+
+    moov = boxes[types.index("moov")]
+    moov_range = (moov[2], moov[3])
+
+    mvex = find_box(f, moov[2], moov[2] + moov[3], ["mvex"])
+    if not mvex or "moof" not in types:
+        raise MP4ParseError(
+            "MP4 tidak fragmented (tanpa moof/mvex), HLS butuh fMP4"
+        )
+
+    if types.index("moof") < types.index("moov"):
+        raise MP4ParseError("moov harus sebelum fragment pertama")
+
+    track_id, timescale = _video_track(f, moov_range)
+    defaults = _track_defaults(f, mvex, track_id)
+
+    # fragment = [styp/sidx/...] moof mdat [mdat ...] sampai fragment berikutnya
+    fragments = []
+    pending = None   # awal box prefix sebelum moof
+    current = None
+
+    for box_type, start, offset, size in boxes:
+        box_end = offset + size
+
+        if box_type in FRAGMENT_PREFIX:
+            if pending is None:
+                pending = start
+            continue
+
+        if box_type == "moof":
+            if current:
+                fragments.append(current)
+            info = _fragment_info(f, (offset, size), track_id, defaults)
+            duration, keyframe = info if info else (0, False)
+            current = [
+                start if pending is None else pending,
+                box_end, duration, keyframe, info is not None,
+            ]
+            pending = None
+            continue
+
+        if box_type == "mdat" and current:
+            current[1] = box_end
+
+    if current:
+        fragments.append(current)
+
+    return {
+        "timescale": timescale or 1,
+        # ftyp + moov (+ box lain sebelum fragment pertama)
+        "init": (0, moov[2] + moov[3]),
+        "fragments": fragments,
+    }
+
+
+# =====================================================
+# HLS PLAYLIST
+# =====================================================
+
+def build_segments(info, target=TARGET_SEGMENT):
+    """
+    Gabungkan fragment menjadi segmen >= target detik. Segmen baru
+    hanya dimulai di fragment yang diawali keyframe video.
+    Return list (durasi_detik, byte_offset, byte_length).
+    """
+    timescale = info["timescale"]
+    segments = []
+    start = end = None
+    duration = 0
+
+    for f_start, f_end, f_duration, keyframe, has_video in info["fragments"]:
+        cut = (
+            start is None
+            or (has_video and keyframe and duration / timescale >= target)
+        )
+
+        if cut:
+            if start is not None:
+                segments.append((duration / timescale, start, end - start))
+            start, duration = f_start, 0
+
+        end = f_end
+        duration += f_duration
+
+    if start is not None:
+        segments.append((duration / timescale, start, end - start))
+
+    if not any(d for d, _, _ in segments):
+        raise MP4ParseError("Fragment video tidak ditemukan")
+
+    return segments
+
+
+def build_hls_playlist(path, uri=URI_PLACEHOLDER):
+    """
+    Playlist HLS VOD (fMP4) dengan EXT-X-BYTERANGE ke file asli.
+    uri default URI_PLACEHOLDER agar playlist bisa di-cache lalu
+    diisi URL saat dikirim ke client.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            end = f.tell()
+            info = read_fragments(f, end)
+        segments = build_segments(info)
+    except (struct.error, IndexError) as e:
+        raise MP4ParseError(f"MP4 tidak valid: {e}")
+
+    header_start, header_end = info["init"]
+    target = max(math.ceil(d) for d, _, _ in segments)
+
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        f"#EXT-X-TARGETDURATION:{max(target, 1)}",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        f'#EXT-X-MAP:URI="{uri}",'
+        f'BYTERANGE="{header_end - header_start}@{header_start}"',
+    ]
+
+    for duration, offset, length in segments:
+        lines.append(f"#EXTINF:{duration:.3f},")
+        lines.append(f"#EXT-X-BYTERANGE:{length}@{offset}")
+        lines.append(uri)
+
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def is_hls_capable(path):
+    return path.rsplit(".", 1)[-1].lower() in HLS_EXTENSIONS
+
+
+def get_playlist(path, uri):
+    """
+    Playlist dari cache media index (valid selama size & mtime sama),
+    dibuat ulang jika file berubah
+    """
+    if not is_hls_capable(path):
+        raise MP4ParseError("Format video tidak didukung")
+
+    st = os.stat(path)
+    playlist = get_hls_playlist(path, st.st_size, st.st_mtime_ns)
+
+    if playlist is None:
+        playlist = build_hls_playlist(path)
+        save_hls_playlist(path, st.st_size, st.st_mtime_ns, playlist)
+
+    return playlist.replace(URI_PLACEHOLDER, uri)
@@ -0,0 +1,343 @@
+"""
+playlist_service.py
+Business logic playlist: CRUD, urutan fraksional & export M3U8
+dengan URL stream bertanda tangan (berlaku terbatas)
+"""
+
+import os
+import sqlite3
+import string
+
+from flask import current_app, url_for
+from itsdangerous import (
+    URLSafeTimedSerializer,
+    BadSignature,
+    SignatureExpired,
+)
+
+from core import cms_config
+from app.repositories.user_repository import get_user_by_username
+from app.repositories.music_repository import UNKNOWN_ARTIST
+from app.repositories.playlist_repository import (
+    create_playlist,
+    get_playlist,
+    list_playlists,
+    rename_playlist,
+    delete_playlist,
+    existing_media_ids,
+    edge_position,
+    entry_position,
+    neighbor_position,
+    add_entries,
+    move_entry,
+    delete_entry,
+    list_entries,
+)
+
+
+MAX_NAME_LENGTH = 100
+MAX_ENTRIES_PER_REQUEST = 1000
+TOKEN_SALT = "playlist-stream"
+
+
+# =====================================================
+# KUNCI URUTAN FRAKSIONAL
+# =====================================================
+# Kunci = string base62 (urutan ASCII == urutan nilai).
+# 6 digit pertama = bagian bulat (append/prepend cukup +1 / -1),
+# sisanya = pecahan (sisip di antara dua entry tanpa mengubah
+# entry lain). Perbandingan string biner SQLite menjaga urutan.
+
+DIGITS = string.digits + string.ascii_uppercase + string.ascii_lowercase
+HEAD_LENGTH = 6
+FIRST_HEAD = len(DIGITS) ** HEAD_LENGTH // 2
+
+
+def _encode_head(value):
+    chars = []
+    for _ in range(HEAD_LENGTH):
+        value, digit = divmod(value, len(DIGITS))
+        chars.append(DIGITS[digit])
+    return "".join(reversed(chars))
+
+
+def _decode_head(key):
+    value = 0
+    for char in key[:HEAD_LENGTH]:
+        value = value * len(DIGITS) + DIGITS.index(char)
+    return value
+
+
+def _midpoint(a, b):
+    """
+    String di antara a dan b (a < b, b None = tak hingga),
+    dihitung sebagai pecahan base62
+    """
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+
+    # digit bersebelahan: turun satu digit di bawah a. Hasil selalu
+    # berakhir digit != "0", jadi tidak pernah jadi prefix kunci lain.
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def key_between(before, after):
+    """
+    Kunci baru di antara dua kunci (None = ujung playlist)
+    """
+    if before is None and after is None:
+        return _encode_head(FIRST_HEAD)
+    if after is None:
+        return _encode_head(_decode_head(before) + 1)
+    if before is None:
+        return _encode_head(_decode_head(after) - 1)
+    if not before < after:
+        raise ValueError("Urutan playlist tidak valid")
+    return _midpoint(before, after)
+
+
+# =====================================================
+# PLAYLIST
+# =====================================================
+
+def _clean_name(name):
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Nama playlist wajib diisi")
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValueError(f"Nama playlist maksimal {MAX_NAME_LENGTH} karakter")
+    return name
+
+
+def _owned_playlist(playlist_id, username):
+    row = get_playlist(playlist_id)
+    if row is None or row[1] != username:
+        raise FileNotFoundError("Playlist tidak ditemukan")
+    return row
+
+
+def user_playlists(username):
+    return [
+        {"id": pid, "name": name, "updated_at": updated_at, "entries": count}
+        for pid, name, updated_at, count in list_playlists(username)
+    ]
+
+
+def new_playlist(username, name):
+    return create_playlist(username, _clean_name(name))
+
+
+def rename_user_playlist(username, playlist_id, name):
+    _owned_playlist(playlist_id, username)
+    rename_playlist(playlist_id, _clean_name(name))
+
+
+def delete_user_playlist(username, playlist_id):
+    _owned_playlist(playlist_id, username)
+    delete_playlist(playlist_id)
+
+
+def playlist_detail(username, playlist_id):
+    pid, _, name, created_at, updated_at = _owned_playlist(
+        playlist_id, username
+    )
+
+    return {
+        "id": pid,
+        "name": name,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "entries": [
+            {
+                "id": entry_id,
+                "media_id": media_id,
+                "position": position,
+                "type": media_type,
+                "name": os.path.basename(path) if path else None,
+                "title": title,
+                "artist": artist,
+                "duration": duration,
+                "available": path is not None,
+            }
+            for (
+                entry_id, media_id, position, media_type,
+                path, duration, title, artist
+            ) in list_entries(pid)
+        ],
+    }
+
+
+# =====================================================
+# ENTRY
+# =====================================================
+
+def add_media(username, playlist_id, media_ids):
+    """
+    Tambah media (audio / video library) di akhir playlist
+    """
+    _owned_playlist(playlist_id, username)
+
+    try:
+        media_ids = [int(m) for m in media_ids]
+    except (TypeError, ValueError):
+        raise ValueError("media_ids harus list angka")
+
+    if not media_ids:
+        raise ValueError("media_ids kosong")
+    if len(media_ids) > MAX_ENTRIES_PER_REQUEST:
+        raise ValueError(
+            f"Maksimal {MAX_ENTRIES_PER_REQUEST} media per request"
+        )
+
+    missing = set(media_ids) - existing_media_ids(media_ids)
+    if missing:
+        raise ValueError(f"Media tidak ditemukan: {sorted(missing)}")
+
+    rows = []
+    position = edge_position(playlist_id, last=True)
+    for media_id in media_ids:
+        position = key_between(position, None)
+        rows.append((media_id, position))
+
+    try:
+        add_entries(playlist_id, rows)
+    except sqlite3.IntegrityError:
+        raise ValueError("Playlist sedang diubah, coba lagi")
+
+    return len(rows)
+
+
+def move_media(username, playlist_id, entry_id, after_id=None,
+               before_id=None):
+    """
+    Pindahkan entry ke sesudah after_id / sebelum before_id
+    (keduanya None = ke awal). Hanya satu baris yang di-update.
+    """
+    _owned_playlist(playlist_id, username)
+
+    if entry_position(playlist_id, entry_id) is None:
+        raise FileNotFoundError("Entry tidak ditemukan")
+
+    if after_id is not None and before_id is not None:
+        raise ValueError("Pilih salah satu: after atau before")
+
+    anchor_id = after_id if after_id is not None else before_id
+
+    if anchor_id is None:
+        lower = None
+        upper = neighbor_position(playlist_id, "", True, entry_id)
+    else:
+        if anchor_id == entry_id:
+            raise ValueError("Entry tidak bisa dipindah relatif ke dirinya")
+
+        anchor = entry_position(playlist_id, anchor_id)
+        if anchor is None:
+            raise FileNotFoundError("Entry acuan tidak ditemukan")
+
+        if after_id is not None:
+            lower = anchor
+            upper = neighbor_position(playlist_id, anchor, True, entry_id)
+        else:
+            upper = anchor
+            lower = neighbor_position(playlist_id, anchor, False, entry_id)
+
+    position = key_between(lower, upper)
+
+    try:
+        move_entry(playlist_id, entry_id, position)
+    except sqlite3.IntegrityError:
+        raise ValueError("Playlist sedang diubah, coba lagi")
+
+    return position
+
+
+def remove_media(username, playlist_id, entry_id):
+    _owned_playlist(playlist_id, username)
+    if not delete_entry(playlist_id, entry_id):
+        raise FileNotFoundError("Entry tidak ditemukan")
+
+
+# =====================================================
+# SIGNED STREAM URL
+# =====================================================
+
+def url_ttl():
+    return int(cms_config.get("CMS_PLAYLIST_URL_TTL", "21600"))
+
+
+def _serializer():
+    return URLSafeTimedSerializer(
+        current_app.config["SECRET_KEY"],
+        salt=TOKEN_SALT
+    )
+
+
+def sign_media(media_id, username):
+    return _serializer().dumps({"m": media_id, "u": username})
+
+
+def verify_media_token(token):
+    """
+    Return (media_id, username). ValueError jika token rusak,
+    sudah kedaluwarsa, atau user pembuatnya sudah nonaktif.
+    """
+    try:
+        data = _serializer().loads(token, max_age=url_ttl())
+    except SignatureExpired:
+        raise ValueError("Link stream sudah kedaluwarsa")
+    except BadSignature:
+        raise ValueError("Link stream tidak valid")
+
+    user = get_user_by_username(data["u"])
+    if user is None or not user.is_active:
+        raise ValueError("Link stream tidak valid")
+
+    return data["m"], data["u"]
+
+
+# =====================================================
+# EXPORT M3U8
+# =====================================================
+
+def _extinf_title(path, title, artist):
+    if title and artist and artist != UNKNOWN_ARTIST:
+        return f"{artist} - {title}"
+    return title or os.path.splitext(os.path.basename(path))[0]
+
+
+def export_m3u8(username, playlist_id):
+    """
+    Return (nama playlist, isi M3U8). Tiap entry = URL absolut
+    bertanda tangan, player tidak perlu cookie session.
+    """
+    _, _, name, _, _ = _owned_playlist(playlist_id, username)
+
+    lines = ["#EXTM3U", f"#PLAYLIST:{name}"]
+
+    for (
+        _, media_id, _, _, path, duration, title, artist
+    ) in list_entries(playlist_id):
+        if path is None:
+            continue
+
+        seconds = int(round(duration)) if duration else -1
+        title = _extinf_title(path, title, artist).replace("\n", " ")
+
+        lines.append(f"#EXTINF:{seconds},{title}")
+        lines.append(url_for(
+            "playlists.signed_stream",
+            token=sign_media(media_id, username),
+            _external=True,
+        ))
+
+    return name, "\n".join(lines) + "\n"
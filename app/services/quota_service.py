@@ -0,0 +1,185 @@
+"""
+quota_service.py
+Kuota storage per user (counter incremental + rekonsiliasi berkala)
+"""
+
+import os
+import time
+import threading
+
+from core import cms_config
+from core.cms_logger import get_logger
+from core.cms_bash_folder import UPLOAD_FOLDER
+
+from app.repositories.db import release_db
+from app.repositories.quota_repository import (
+    get_quota_row,
+    add_usage,
+    claim_reconcile,
+    reserve_usage,
+)
+
+
+log = get_logger("CMS_QUOTA")
+
+USERS_FOLDER = os.path.join(UPLOAD_FOLDER, "users")
+RECONCILE_INTERVAL = 6 * 3600  # rekonsiliasi tiap 6 jam (semua worker)
+CLAIM_CHECK = 600              # detik, jeda cek giliran rekonsiliasi
+
+
+# =====================================================
+# QUOTA CHECK (O(1): satu baca baris, tanpa walk folder)
+# =====================================================
+
+def default_quota():
+    mb = int(cms_config.get("CMS_DEFAULT_QUOTA_MB", "0") or 0)
+    return mb * 1024 * 1024 if mb > 0 else None
+
+
+def get_usage(username):
+    """
+    Return dict {used, quota, percent}; quota None = tanpa batas
+    """
+    row = get_quota_row(username)
+    used, quota = row if row else (0, None)
+
+    if quota is None:
+        quota = default_quota()
+
+    percent = None
+    if quota:
+        percent = min(round(used * 100 / quota, 1), 100)
+
+    return {"used": used, "quota": quota, "percent": percent}
+
+
+def remaining_bytes(username):
+    """
+    Sisa kuota (byte), None jika tanpa batas
+    """
+    usage = get_usage(username)
+    if usage["quota"] is None:
+        return None
+    return max(usage["quota"] - usage["used"], 0)
+
+
+def check_quota(username, incoming_size):
+    """
+    Cek awal saja (mis. sebelum upload dimulai), tidak memesan kuota.
+    Sebelum file masuk folder user pakai reserve_upload().
+    """
+    remaining = remaining_bytes(username)
+    if remaining is not None and incoming_size > remaining:
+        raise ValueError("Kuota penyimpanan tidak cukup")
+
+
+def reserve_upload(username, size):
+    """
+    Pesan kuota untuk file yang akan di-commit (cek + tambah counter
+    atomic). Jika commit gagal, kembalikan dengan refund_upload().
+    """
+    if not reserve_usage(username, size, default_quota()):
+        raise ValueError("Kuota penyimpanan tidak cukup")
+
+
+def refund_upload(username, size):
+    add_usage(username, -size)
+
+
+# =====================================================
+# COUNTER HOOK
+# =====================================================
+
+def record_upload(username, size):
+    add_usage(username, size)
+
+
+def record_delete(username, size):
+    add_usage(username, -size)
+
+
+# =====================================================
+# REKONSILIASI (BACKGROUND WALKER)
+# =====================================================
+
+def _folder_size(folder):
+    total = 0
+    stack = [folder]
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+
+    return total
+
+
+def _used_bytes(username):
+    row = get_quota_row(username)
+    return row[0] if row else 0
+
+
+def reconcile_usage():
+    """
+    Hitung ulang pemakaian dari disk untuk koreksi drift counter
+    (file yang ditambah / dihapus di luar aplikasi).
+
+    Counter tidak ditimpa: snapshot counter diambil sebelum walk folder
+    user, lalu hanya selisih (disk - snapshot) yang ditambahkan. Kuota
+    yang dipesan upload selama walk (reserve_upload) tidak hilang.
+    """
+    if not os.path.isdir(USERS_FOLDER):
+        return {}
+
+    result = {}
+    with os.scandir(USERS_FOLDER) as it:
+        users = [e for e in it if e.is_dir(follow_symlinks=False)]
+
+    for entry in users:
+        snapshot = _used_bytes(entry.name)
+        used = _folder_size(entry.path)
+        if used != snapshot:
+            add_usage(entry.name, used - snapshot)
+        result[entry.name] = used
+
+    log.info(f"[QUOTA] Rekonsiliasi {len(result)} user selesai")
+    return result
+
+
+_reconciler_thread = None
+
+
+def _reconcile_loop(interval):
+    # semua worker mencoba, hanya pemenang claim_reconcile yang walk
+    while True:
+        try:
+            if claim_reconcile(interval):
+                reconcile_usage()
+        except Exception:
+            log.exception("[QUOTA] Rekonsiliasi gagal")
+        finally:
+            release_db()
+        time.sleep(min(interval, CLAIM_CHECK))
+
+
+def start_quota_reconciler(interval=RECONCILE_INTERVAL):
+    global _reconciler_thread
+
+    if _reconciler_thread and _reconciler_thread.is_alive():
+        return _reconciler_thread
+
+    _reconciler_thread = threading.Thread(
+        target=_reconcile_loop,
+        args=(interval,),
+        name="quota-reconciler",
+        daemon=True,
+    )
+    _reconciler_thread.start()
+    return _reconciler_thread
@@ -0,0 +1,243 @@
+"""
+search_service.py
+Pencarian full-text (FTS5) nama file, folder & metadata media
+"""
+
+import os
+import re
+import threading
+
+from core.cms_logger import get_logger
+from core.cms_bash_folder import BASE, UPLOAD_FOLDER
+
+from app.repositories.db import release_db
+from app.repositories.search_repository import (
+    upsert_docs,
+    update_doc_meta,
+    delete_docs,
+    move_doc,
+    list_doc_paths,
+    missing_media_docs,
+    search_docs,
+)
+
+
+log = get_logger("CMS_SEARCH")
+
+USERS_FOLDER = os.path.join(UPLOAD_FOLDER, "users")
+
+MAX_TERMS = 8
+MAX_RESULTS = 100
+BATCH_SIZE = 1000
+
+TAG_META_FIELDS = ("title", "artist", "album", "album_artist", "genre", "year")
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+# =====================================================
+# DOKUMEN
+# =====================================================
+
+def _upload_doc(path, meta=""):
+    """
+    (path, owner, kind, name, dir, meta) untuk file di folder user
+    """
+    rel = os.path.relpath(path, USERS_FOLDER).replace(os.sep, "/")
+    owner, _, rest = rel.partition("/")
+    folder, _, name = rest.rpartition("/")
+    return (path, owner, "upload", name, folder, meta)
+
+
+def _is_upload(path):
+    return path.startswith(USERS_FOLDER + os.sep)
+
+
+def _media_doc(path, meta=""):
+    rel = os.path.relpath(path, BASE).replace(os.sep, "/")
+    folder, _, name = rel.rpartition("/")
+    return (path, None, "media", name, folder, meta)
+
+
+def tag_meta(tags):
+    """
+    Gabungkan tag audio menjadi teks kolom meta
+    """
+    return " ".join(
+        str(tags[key]) for key in TAG_META_FIELDS if tags.get(key)
+    )
+
+
+# =====================================================
+# UPDATE INDEX (dipanggil file_service / media_index_service)
+# =====================================================
+
+def index_upload(path):
+    upsert_docs([_upload_doc(path)])
+
+
+def remove_upload(path):
+    delete_docs([path])
+
+
+def index_uploads(paths):
+    """
+    Versi batch index_upload (file yang dilihat watcher)
+    """
+    for i in range(0, len(paths), BATCH_SIZE):
+        upsert_docs([_upload_doc(path) for path in paths[i:i + BATCH_SIZE]])
+
+
+def remove_uploads(paths):
+    delete_docs(paths)
+
+
+def move_upload(old_path, new_path):
+    doc = _upload_doc(new_path)
+    _, _, _, name, folder, _ = doc
+
+    # job index_upload file ini belum jalan: index langsung di path baru
+    if not move_doc(old_path, new_path, name, folder):
+        upsert_docs([doc])
+
+
+def index_media(paths):
+    upsert_docs([_media_doc(path) for path in paths])
+
+
+def index_missing_media():
+    """
+    Backfill dokumen media library yang belum ter-index
+    """
+    rows = missing_media_docs()
+    for i in range(0, len(rows), BATCH_SIZE):
+        upsert_docs([
+            _media_doc(path, meta)
+            for path, meta in rows[i:i + BATCH_SIZE]
+        ])
+    return len(rows)
+
+
+def index_media_meta(items):
+    """
+    items: list of (path, meta_text).
+    File upload user di-upsert: job metadata bisa jalan sebelum job
+    index_upload (dokumen belum ada). Media library hanya update.
+    """
+    upsert_docs([
+        _upload_doc(path, meta) for path, meta in items if _is_upload(path)
+    ])
+    update_doc_meta([
+        (meta, path) for path, meta in items if not _is_upload(path)
+    ])
+
+
+def remove_media(paths):
+    delete_docs(paths)
+
+
+# =====================================================
+# REBUILD (file upload yang sudah ada sebelum index)
+# =====================================================
+
+def rebuild_upload_index():
+    """
+    Sinkron penuh index upload dengan isi USERS_FOLDER
+    """
+    known = list_doc_paths("upload")
+    seen = set()
+    batch = []
+    stack = [USERS_FOLDER]
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+
+                    seen.add(entry.path)
+                    if entry.path not in known:
+                        batch.append(_upload_doc(entry.path))
+
+                    if len(batch) >= BATCH_SIZE:
+                        upsert_docs(batch)
+                        batch = []
+        except OSError:
+            continue
+
+    upsert_docs(batch)
+    delete_docs([path for path in known if path not in seen])
+
+    log.info(f"[SEARCH] Index upload: {len(seen)} file")
+    return len(seen)
+
+
+_rebuild_thread = None
+
+
+def start_search_indexer():
+    """
+    Rebuild index upload sekali di background saat startup
+    """
+    global _rebuild_thread
+
+    if _rebuild_thread and _rebuild_thread.is_alive():
+        return _rebuild_thread
+
+    def run():
+        try:
+            rebuild_upload_index()
+        except Exception:
+            log.exception("[SEARCH] Rebuild index gagal")
+        finally:
+            release_db()
+
+    _rebuild_thread = threading.Thread(
+        target=run,
+        name="search-indexer",
+        daemon=True,
+    )
+    _rebuild_thread.start()
+    return _rebuild_thread
+
+
+# =====================================================
+# QUERY
+# =====================================================
+
+def build_match(query):
+    """
+    Input bebas user -> ekspresi FTS5 aman: tiap kata jadi
+    prefix query ("kata"*), semua kata wajib ada (AND)
+    """
+    terms = _TOKEN.findall(query or "")[:MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search(query, username, kind=None, limit=50):
+    match = build_match(query)
+    if match is None:
+        return []
+
+    limit = min(max(int(limit), 1), MAX_RESULTS)
+    rows = search_docs(match, owner=username, kind=kind, limit=limit)
+
+    return [
+        {
+            "name": name,
+            "dir": folder,
+            "kind": doc_kind,
+            "owner": owner,
+            "meta": meta,
+            "media_id": media_id,
+            "score": round(-rank, 4),
+        }
+        for _, owner, doc_kind, name, folder, meta, media_id, rank in rows
+    ]
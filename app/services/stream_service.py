@@ -0,0 +1,465 @@
+"""
+stream_service.py
+Streaming file dengan dukungan HTTP Range (RFC 7233),
+offload transfer ke web server (X-Accel-Redirect / X-Sendfile)
+& varian gzip / brotli untuk file teks
+"""
+
+import os
+import mimetypes
+import secrets
+from urllib.parse import quote
+
+from flask import Response, request, abort
+from werkzeug.http import (
+    http_date,
+    parse_date,
+    parse_etags,
+    quote_etag,
+    unquote_etag,
+)
+from werkzeug.utils import safe_join
+
+from core import cms_config
+from core.cms_bash_folder import BASE
+from app.services.cas_service import stored_digest
+from app.services.compression_service import (
+    is_compressible,
+    compressed_file,
+    file_encoding,
+    add_vary,
+)
+
+
+CHUNK_SIZE = 64 * 1024  # 64 KB per pread
+MAX_RANGES = 16         # batas jumlah range per request (anti abuse)
+
+
+# =====================================================
+# RANGE PARSER
+# =====================================================
+
+def parse_range_header(header, size):
+    """
+    Parse header Range menjadi list (start, end) inklusif.
+
+    - None  : header tidak ada / tidak valid -> kirim file utuh (200)
+    - []    : semua range di luar ukuran file -> 416
+    """
+    if not header:
+        return None
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part or "-" not in part:
+            return None
+
+        first, _, last = part.partition("-")
+        first = first.strip()
+        last = last.strip()
+
+        try:
+            if first == "":
+                # suffix range: "-500" = 500 byte terakhir
+                length = int(last)
+                if length < 0:
+                    return None
+                if length == 0 or size == 0:
+                    continue
+                start = max(size - length, 0)
+                end = size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else None
+                if start < 0 or (end is not None and end < start):
+                    return None
+                if start >= size:
+                    continue
+                end = size - 1 if end is None else min(end, size - 1)
+        except ValueError:
+            return None
+
+        ranges.append((start, end))
+
+    return _coalesce(ranges)
+
+
+def _coalesce(ranges):
+    """
+    Gabungkan range yang overlap / bersebelahan
+    """
+    if not ranges:
+        return ranges
+
+    ranges = sorted(ranges)
+    merged = [ranges[0]]
+
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+# =====================================================
+# VALIDATOR (ETag / Last-Modified)
+# =====================================================
+
+def make_etag(st, path=None):
+    """
+    ETag kuat tanpa membaca isi file:
+    - hash isi yang sudah tersimpan (mode CAS), atau
+    - (inode, size, mtime_ns)
+    """
+    if path is not None:
+        digest = stored_digest(path)
+        if digest:
+            return digest
+
+    return f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+def cache_control_for(policy):
+    """
+    Cache-Control per route, diatur lewat config CMS_CACHE_<POLICY>
+    """
+    if not policy:
+        return None
+    return cms_config.get(f"CMS_CACHE_{policy.upper()}")
+
+
+def is_not_modified(etag, mtime):
+    """
+    If-None-Match lebih prioritas dari If-Modified-Since (RFC 7232)
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        # weak comparison untuk GET/HEAD
+        return parse_etags(if_none_match).contains_weak(etag)
+
+    if_modified_since = parse_date(request.headers.get("If-Modified-Since"))
+    if if_modified_since:
+        return int(mtime) <= int(if_modified_since.timestamp())
+
+    return False
+
+
+def _if_range_matches(if_range, etag, mtime):
+    """
+    If-Range: range hanya dipakai jika validator masih sama
+    """
+    if not if_range:
+        return True
+
+    if_range = if_range.strip()
+
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        tag, weak = unquote_etag(if_range)
+        # If-Range wajib strong comparison
+        return not weak and tag == etag
+
+    date = parse_date(if_range)
+    if date is None:
+        return False
+
+    return int(mtime) <= int(date.timestamp())
+
+
+# =====================================================
+# FILE DESCRIPTOR STREAM
+# =====================================================
+
+class FileRangeStream:
+    """
+    Iterable WSGI berbasis file descriptor (os.pread).
+    Hanya CHUNK_SIZE byte yang ada di memori pada satu waktu.
+    """
+
+    def __init__(self, fd, parts, chunk_size=CHUNK_SIZE):
+        # parts: list of (prefix_bytes, start, end)
+        self.fd = fd
+        self.parts = parts
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        try:
+            for prefix, start, end in self.parts:
+                if prefix:
+                    yield prefix
+
+                if start is None:
+                    continue
+
+                pos = start
+                while pos <= end:
+                    length = min(self.chunk_size, end - pos + 1)
+                    data = os.pread(self.fd, length, pos)
+                    if not data:
+                        return
+                    pos += len(data)
+                    yield data
+        finally:
+            self.close()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+# =====================================================
+# OFFLOAD (nginx / X-Sendfile / sendfile WSGI server)
+# =====================================================
+
+def offload_mode():
+    return cms_config.get("CMS_DOWNLOAD_OFFLOAD", "none")
+
+
+def accel_uri(path):
+    """
+    Path file -> URI location internal nginx, contoh:
+
+        location /_protected/ {
+            internal;
+            alias <CMS_BASE>/;
+        }
+
+    None jika file di luar BASE (dikirim Python seperti biasa)
+    """
+    rel = os.path.relpath(path, BASE)
+    if rel.startswith(os.pardir) or os.path.isabs(rel):
+        return None
+
+    prefix = cms_config.get("CMS_ACCEL_PREFIX", "/_protected").rstrip("/")
+    return f"{prefix}/{quote(rel.replace(os.sep, '/'))}"
+
+
+def _offload_headers(path):
+    """
+    Header offload sesuai mode, None jika tidak dipakai.
+    Auth & resolusi path sudah dilakukan route sebelum fungsi ini.
+    """
+    mode = offload_mode()
+
+    if mode == "nginx":
+        uri = accel_uri(path)
+        return {"X-Accel-Redirect": uri} if uri else None
+
+    if mode == "sendfile":
+        return {"X-Sendfile": path}
+
+    return None
+
+
+def _file_wrapper(fd, start, end, size):
+    """
+    wsgi.file_wrapper milik server (gunicorn, uWSGI) memakai
+    os.sendfile (zero-copy) dari posisi file saat ini sampai akhir.
+    Hanya dipakai jika range berakhir di EOF agar server tidak
+    mengirim lebih dari Content-Length.
+    """
+    wrapper = request.environ.get("wsgi.file_wrapper")
+    if wrapper is None or end != size - 1:
+        return None
+
+    f = os.fdopen(fd, "rb")
+    f.seek(start)
+    return wrapper(f, CHUNK_SIZE)
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def resolve_file(directory, filename):
+    """
+    Gabungkan directory + filename secara aman, 404 jika tidak ada
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return path
+
+
+def send_file_ranged(path, as_attachment=False, download_name=None,
+                     cache_policy=None, offload=False):
+    """
+    Kirim file dengan dukungan:
+    - Range tunggal          -> 206
+    - Range banyak           -> 206 multipart/byteranges
+    - Range di luar file     -> 416
+    - If-Range               -> 200 utuh jika validator berubah
+    - If-None-Match / If-Modified-Since -> 304 (file tidak dibuka)
+    - offload=True           -> transfer diserahkan ke nginx / X-Sendfile
+                                (CMS_DOWNLOAD_OFFLOAD), atau sendfile
+                                lewat wsgi.file_wrapper saat standalone
+    - file teks tanpa Range  -> varian gzip / br dari cache disk
+                                (Content-Encoding, ETag per varian)
+    """
+    st = os.stat(path)
+    size = st.st_size
+    etag = make_etag(st, path)
+
+    # nama unduhan dari file asli, bukan file varian terkompresi
+    name = download_name or os.path.basename(path)
+
+    mimetype = (
+        mimetypes.guess_type(path)[0]
+        or "application/octet-stream"
+    )
+
+    # -------------------------------------------------
+    # VARIAN TERKOMPRESI (teks, request tanpa Range,
+    # tidak di-offload: nginx mengurus gzip sendiri).
+    # Encoding & ETag varian ditentukan dari stat saja,
+    # file baru dikompres setelah lolos cek 304.
+    # -------------------------------------------------
+    compressible = is_compressible(mimetype)
+    encoding = None
+
+    if (
+        compressible
+        and "Range" not in request.headers
+        and not (offload and _offload_headers(path))
+    ):
+        encoding = file_encoding(mimetype, size)
+
+    file_etag = etag
+    if encoding:
+        etag = f"{file_etag}-{encoding}"
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": quote_etag(etag),
+        "Last-Modified": http_date(st.st_mtime),
+    }
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if compressible:
+        add_vary(headers)
+
+    cache_control = cache_control_for(cache_policy)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    # -------------------------------------------------
+    # 304 NOT MODIFIED (cukup stat, tanpa open)
+    # -------------------------------------------------
+    if is_not_modified(etag, st.st_mtime):
+        return Response(status=304, headers=headers)
+
+    if encoding:
+        variant = compressed_file(path, file_etag, encoding)
+        if variant:
+            path = variant
+            size = os.path.getsize(path)
+        else:
+            # gagal kompres: kirim file asli dengan ETag asli
+            encoding = None
+            etag = file_etag
+            headers["ETag"] = quote_etag(etag)
+            headers.pop("Content-Encoding")
+
+    if as_attachment:
+        headers["Content-Disposition"] = (
+            f"attachment; filename*=UTF-8''{quote(name)}"
+        )
+
+    # -------------------------------------------------
+    # OFFLOAD: web server yang membaca file & melayani Range
+    # -------------------------------------------------
+    offload_headers = _offload_headers(path) if offload else None
+    if offload_headers:
+        headers.update(offload_headers)
+        headers.pop("Accept-Ranges")
+        return Response(status=200, mimetype=mimetype, headers=headers)
+
+    ranges = None
+    if request.method in ("GET", "HEAD") and _if_range_matches(
+        request.headers.get("If-Range"), etag, st.st_mtime
+    ):
+        ranges = parse_range_header(request.headers.get("Range"), size)
+
+    if ranges is not None and len(ranges) > MAX_RANGES:
+        ranges = None
+
+    # -------------------------------------------------
+    # 416 RANGE NOT SATISFIABLE
+    # -------------------------------------------------
+    if ranges == []:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status=416, headers=headers)
+
+    fd = os.open(path, os.O_RDONLY)
+
+    # -------------------------------------------------
+    # 200 FULL CONTENT
+    # -------------------------------------------------
+    if ranges is None:
+        parts = [(b"", 0, size - 1)] if size else []
+        headers["Content-Length"] = str(size)
+        body = offload and size and _file_wrapper(fd, 0, size - 1, size)
+        return Response(
+            body or FileRangeStream(fd, parts),
+            status=200,
+            mimetype=mimetype,
+            headers=headers,
+            direct_passthrough=True,
+        )
+
+    # -------------------------------------------------
+    # 206 SINGLE RANGE
+    # -------------------------------------------------
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        body = offload and _file_wrapper(fd, start, end, size)
+        return Response(
+            body or FileRangeStream(fd, [(b"", start, end)]),
+            status=206,
+            mimetype=mimetype,
+            headers=headers,
+            direct_passthrough=True,
+        )
+
+    # -------------------------------------------------
+    # 206 MULTIPART BYTERANGES
+    # -------------------------------------------------
+    boundary = secrets.token_hex(16)
+    parts = []
+    length = 0
+
+    for start, end in ranges:
+        prefix = (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {mimetype}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        parts.append((prefix, start, end))
+        length += len(prefix) + (end - start + 1)
+
+    closing = f"\r\n--{boundary}--\r\n".encode()
+    parts.append((closing, None, None))
+    length += len(closing)
+
+    headers["Content-Length"] = str(length)
+    return Response(
+        FileRangeStream(fd, parts),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+        direct_passthrough=True,
+    )
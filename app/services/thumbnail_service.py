@@ -0,0 +1,132 @@
+"""
+thumbnail_service.py
+Pembuatan & cache thumbnail gambar (on-disk)
+"""
+
+import os
+import hashlib
+import threading
+
+from core.cms_bash_folder import UPLOAD_FOLDER
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow opsional, fallback ke file asli
+    Image = None
+    ImageOps = None
+
+# gambar rusak / terlalu besar: fallback ke file asli, bukan 500
+BUILD_ERRORS = (OSError, SyntaxError, ValueError)
+if Image is not None:
+    BUILD_ERRORS += (Image.DecompressionBombError,)
+
+
+THUMB_FOLDER = os.path.join(UPLOAD_FOLDER, ".thumbs")
+
+THUMB_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+
+# nama varian -> sisi terpanjang (pixel)
+THUMB_SIZES = {
+    "small": 160,
+    "medium": 320,
+}
+
+DEFAULT_SIZE = "small"
+THUMB_QUALITY = 80
+
+
+# =====================================================
+# UTIL
+# =====================================================
+
+def is_available():
+    return Image is not None
+
+
+def is_thumbnailable(filename):
+    return (
+        "." in filename
+        and filename.rsplit(".", 1)[1].lower() in THUMB_EXTENSIONS
+    )
+
+
+def _thumb_path(path, st, size):
+    """
+    Key cache = path + size file + mtime_ns + varian.
+    File yang berubah otomatis dapat key baru.
+    """
+    raw = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{size}"
+    key = hashlib.sha1(raw.encode()).hexdigest()
+    return os.path.join(THUMB_FOLDER, key[:2], key + ".jpg")
+
+
+def _build(path, target, size):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # unik per proses & thread: request paralel tidak berbagi file tmp
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with Image.open(path) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((THUMB_SIZES[size], THUMB_SIZES[size]))
+
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+
+            img.save(tmp, "JPEG", quality=THUMB_QUALITY, optimize=True)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    # rename atomic: request paralel tidak membaca file setengah jadi
+    os.replace(tmp, target)
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def get_thumbnail(path, size=DEFAULT_SIZE):
+    """
+    Return path thumbnail (dibuat jika belum ada di cache).
+    Return None jika Pillow tidak tersedia / file bukan gambar.
+    """
+    if not is_available() or size not in THUMB_SIZES:
+        return None
+
+    if not is_thumbnailable(path):
+        return None
+
+    st = os.stat(path)
+    target = _thumb_path(path, st, size)
+
+    if not os.path.exists(target):
+        try:
+            _build(path, target, size)
+        except BUILD_ERRORS:
+            return None
+
+    return target
+
+
+def generate_thumbnails(path):
+    """
+    Dipanggil setelah upload: buat semua varian sekaligus
+    """
+    for size in THUMB_SIZES:
+        get_thumbnail(path, size)
+
+
+def remove_thumbnails(path):
+    """
+    Hapus semua varian milik file (dipanggil sebelum file dihapus)
+    """
+    if not os.path.exists(path):
+        return
+
+    st = os.stat(path)
+    for size in THUMB_SIZES:
+        target = _thumb_path(path, st, size)
+        if os.path.exists(target):
+            os.remove(target)
@@ -0,0 +1,76 @@
+"""
+upload_jobs.py
+Job background setelah upload: index, thumbnail, hash (CAS) & metadata.
+Modul ini di-import worker (thread / process) agar handler terdaftar.
+"""
+
+import os
+
+from core.cms_jobs import after_job, job
+from app.repositories.db import release_db
+from app.services import cas_service
+from app.services.thumbnail_service import generate_thumbnails
+from app.services.audio_tag_service import read_tags
+from app.services.search_service import (
+    index_media_meta,
+    index_upload,
+    tag_meta,
+)
+from app.services.watcher_service import record_changes
+from app.services.gallery_service import is_photo, index_photos
+
+
+AUDIO_EXTENSIONS = {"mp3", "flac", "m4a"}
+
+# sisa transaksi repository dari handler yang gagal sebelum commit
+after_job(release_db)
+
+
+def _extension(path):
+    return path.rsplit(".", 1)[-1].lower() if "." in path else ""
+
+
+@job("index_upload", max_attempts=3)
+def index_saved_file(payload):
+    """
+    View watcher & index pencarian untuk file baru (di luar request).
+    Worker process tidak punya view watcher: record_changes no-op,
+    watcher di proses web menangkap file lewat event filesystem.
+    """
+    path = payload["path"]
+    if os.path.exists(path):
+        record_changes(changed=[path])
+        index_upload(path)
+
+
+@job("thumbnail", max_attempts=3)
+def make_thumbnails(payload):
+    path = payload["path"]
+    if os.path.exists(path):
+        generate_thumbnails(path)
+
+
+@job("cas_hash", max_attempts=5, backoff=30)
+def hash_into_store(payload):
+    """
+    Mode CAS: file yang di-commit tanpa hash (mis. upload chunked yang
+    state hash-nya hilang) di-hash & di-dedup di sini, bukan di request
+    """
+    if cas_service.is_enabled():
+        cas_service.adopt_file(payload["path"])
+
+
+@job("metadata", max_attempts=3)
+def extract_metadata(payload):
+    path = payload["path"]
+    if not os.path.exists(path):
+        return
+
+    if _extension(path) in AUDIO_EXTENSIONS:
+        index_media_meta([(path, tag_meta(read_tags(path)))])
+    elif is_photo(path):
+        index_photos([path])
+
+
+def needs_metadata(path):
+    return _extension(path) in AUDIO_EXTENSIONS or is_photo(path)
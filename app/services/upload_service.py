@@ -0,0 +1,269 @@
+"""
+upload_service.py
+Upload bertahap (chunked & resumable) untuk file besar
+"""
+
+import os
+import json
+import time
+import secrets
+from werkzeug.utils import secure_filename
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from app.services.file_service import (
+    STAGING_FOLDER,
+    allowed_file,
+    get_user_subdir,
+    after_file_saved,
+    commit_staged_file,
+)
+from app.services import cas_service
+from app.services.quota_service import (
+    check_quota,
+    reserve_upload,
+    refund_upload,
+)
+
+
+MAX_CHUNKED_FILE_SIZE = 50 * 1024 * 1024 * 1024  # 50 GB
+CHUNK_SIZE = 8 * 1024 * 1024                      # saran ukuran chunk client
+WRITE_BLOCK_SIZE = 1024 * 1024                    # 1 MB per write
+UPLOAD_EXPIRE = 24 * 3600                          # sesi kadaluarsa 24 jam
+
+# mode CAS: hash incremental per sesi {upload_id: (offset, hasher)}.
+# Jika hilang (restart / worker lain), file di-hash ulang saat finalize.
+_hashers = {}
+
+
+class UploadOffsetError(ValueError):
+    """
+    Offset chunk tidak sama dengan posisi file staging
+    """
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+# =====================================================
+# STAGING HELPER
+# =====================================================
+
+def _valid_upload_id(upload_id):
+    return (
+        isinstance(upload_id, str)
+        and len(upload_id) == 32
+        and all(c in "0123456789abcdef" for c in upload_id)
+    )
+
+
+def _paths(upload_id):
+    if not _valid_upload_id(upload_id):
+        raise FileNotFoundError("Sesi upload tidak ditemukan")
+
+    base = os.path.join(STAGING_FOLDER, upload_id)
+    return base + ".part", base + ".json"
+
+
+def _load_meta(username, upload_id):
+    part_path, meta_path = _paths(upload_id)
+
+    if not os.path.exists(meta_path) or not os.path.exists(part_path):
+        raise FileNotFoundError("Sesi upload tidak ditemukan")
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    if meta["user"] != username:
+        raise FileNotFoundError("Sesi upload tidak ditemukan")
+
+    return meta, part_path, meta_path
+
+
+def _discard(upload_id):
+    for path in _paths(upload_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _chunk_hasher(upload_id, offset):
+    if not cas_service.is_enabled():
+        return None
+
+    if offset == 0:
+        return cas_service.new_hasher()
+
+    position, hasher = _hashers.get(upload_id, (None, None))
+    return hasher if position == offset else None
+
+
+def cleanup_expired_uploads():
+    """
+    Hapus sesi upload yang ditinggalkan client
+    """
+    if not os.path.isdir(STAGING_FOLDER):
+        return
+
+    limit = time.time() - UPLOAD_EXPIRE
+
+    for entry in os.scandir(STAGING_FOLDER):
+        if entry.name.endswith(".json") and entry.stat().st_mtime < limit:
+            _discard(entry.name[:-5])
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def init_upload(username, filename, size, subdir=""):
+    if not filename or not allowed_file(filename):
+        raise ValueError("Tipe file tidak diizinkan")
+
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ValueError("Ukuran file tidak valid")
+
+    if size < 0 or size > MAX_CHUNKED_FILE_SIZE:
+        raise ValueError("Ukuran file terlalu besar")
+
+    filename = secure_filename(filename)
+    folder = get_user_subdir(username, subdir)
+
+    if os.path.exists(os.path.join(folder, filename)):
+        raise ValueError("File sudah ada")
+
+    check_quota(username, size)
+    cleanup_expired_uploads()
+    os.makedirs(STAGING_FOLDER, exist_ok=True)
+
+    upload_id = secrets.token_hex(16)
+    part_path, meta_path = _paths(upload_id)
+
+    open(part_path, "wb").close()
+    with open(meta_path, "w") as f:
+        json.dump({
+            "user": username,
+            "filename": filename,
+            "subdir": subdir,
+            "size": size,
+            "created_at": time.time(),
+        }, f)
+
+    return {
+        "upload_id": upload_id,
+        "offset": 0,
+        "size": size,
+        "chunk_size": CHUNK_SIZE,
+    }
+
+
+def write_chunk(username, upload_id, offset, stream):
+    """
+    Tulis chunk langsung ke file staging pada offset tertentu.
+    Offset harus sama dengan jumlah byte yang sudah diterima,
+    sehingga client bisa resume setelah koneksi putus.
+    """
+    meta, part_path, meta_path = _load_meta(username, upload_id)
+
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        raise ValueError("Offset tidak valid")
+
+    with open(part_path, "r+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            raise UploadOffsetError("Offset tidak sesuai", current)
+
+        f.seek(offset)
+        remaining = meta["size"] - offset
+        hasher = _chunk_hasher(upload_id, offset)
+
+        while True:
+            block = stream.read(WRITE_BLOCK_SIZE)
+            if not block:
+                break
+
+            if len(block) > remaining:
+                f.truncate(offset)
+                _hashers.pop(upload_id, None)
+                raise ValueError("Data melebihi ukuran file")
+
+            if hasher:
+                hasher.update(block)
+            f.write(block)
+            remaining -= len(block)
+
+        f.flush()
+        current = f.tell()
+
+        if hasher:
+            _hashers[upload_id] = (current, hasher)
+
+    # sentuh meta agar sesi aktif tidak dianggap kadaluarsa
+    os.utime(meta_path)
+
+    return current
+
+
+def get_upload_status(username, upload_id):
+    meta, part_path, _ = _load_meta(username, upload_id)
+
+    return {
+        "upload_id": upload_id,
+        "filename": meta["filename"],
+        "folder": meta["subdir"],
+        "offset": os.path.getsize(part_path),
+        "size": meta["size"],
+    }
+
+
+def finalize_upload(username, upload_id):
+    """
+    Pindahkan file staging ke folder user (rename atomic)
+    """
+    meta, part_path, _ = _load_meta(username, upload_id)
+
+    received = os.path.getsize(part_path)
+    if received != meta["size"]:
+        raise UploadOffsetError("Upload belum lengkap", received)
+
+    folder = get_user_subdir(username, meta["subdir"])
+    path = os.path.join(folder, meta["filename"])
+
+    if os.path.exists(path):
+        raise ValueError("File sudah ada")
+
+    # kuota bisa terpakai upload lain selama sesi berjalan:
+    # cek + pesan dalam satu UPDATE bersyarat, dikembalikan jika gagal
+    reserve_upload(username, received)
+
+    try:
+        digest = None
+        position, hasher = _hashers.pop(upload_id, (None, None))
+        if hasher and position == received:
+            digest = hasher.hexdigest()
+
+        commit_staged_file(part_path, path, digest)
+    except Exception:
+        refund_upload(username, received)
+        raise
+
+    _discard(upload_id)
+
+    after_file_saved(path)
+    return meta["filename"]
+
+
+def abort_upload(username, upload_id):
+    _load_meta(username, upload_id)
+    _hashers.pop(upload_id, None)
+    _discard(upload_id)
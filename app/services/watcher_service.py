@@ -0,0 +1,655 @@
+"""
+watcher_service.py
+Watcher filesystem (inotify, fallback polling) untuk folder upload
+user & media library. Listing dibaca dari view, bukan os.listdir.
+
+Perubahan dari aplikasi sendiri (upload, hapus, rename) dicatat per
+entry lewat record_changes(), tanpa scan ulang folder.
+"""
+
+import os
+import stat
+import time
+import errno
+import struct
+import ctypes
+import ctypes.util
+import threading
+
+from core.cms_logger import get_logger
+from core.cms_bash_folder import UPLOAD_FOLDER
+
+from app.repositories.db import release_db
+from app.repositories.file_index_repository import apply_entry_changes
+from app.repositories.migrate import run_migrations
+from app.services.media_index_service import MEDIA_ROOTS, scan_folder
+from app.services.search_service import index_uploads, remove_uploads
+
+
+log = get_logger("CMS_WATCHER")
+
+USERS_FOLDER = os.path.join(UPLOAD_FOLDER, "users")
+
+DEBOUNCE = 0.5       # tunggu event reda sebelum flush (detik)
+MAX_DELAY = 5.0      # batas tunda flush saat event terus mengalir
+POLL_INTERVAL = 10   # interval backend polling (detik)
+
+
+# =====================================================
+# IN-MEMORY VIEW (FOLDER UPLOAD USER)
+# =====================================================
+
+class FileView:
+    """
+    {dir: {name: (size, mtime_ns, is_dir)}} untuk seluruh tree user.
+    Per folder juga disimpan mtime folder saat di-scan & nomor versi
+    (naik setiap isi berubah) untuk validasi cache listing.
+    """
+
+    def __init__(self):
+        self._dirs = {}
+        self._meta = {}   # dir -> (mtime_ns_saat_scan, versi)
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def stat_entry(path):
+        """
+        (size, mtime_ns, is_dir) satu path, None jika tidak ada
+        """
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns, stat.S_ISDIR(st.st_mode)
+
+    @staticmethod
+    def read_dir(path):
+        entries = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries[entry.name] = (
+                        st.st_size,
+                        st.st_mtime_ns,
+                        entry.is_dir(follow_symlinks=False),
+                    )
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return entries
+
+    @staticmethod
+    def scan(path):
+        """
+        (mtime_ns folder, entries). mtime dibaca sebelum scandir:
+        perubahan selama scan membuat mtime tercatat lebih lama
+        sehingga view dianggap basi, bukan sebaliknya.
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, None
+        return mtime_ns, FileView.read_dir(path)
+
+    def _bump(self, path, mtime_ns):
+        self._version += 1
+        self._meta[path] = (mtime_ns, self._version)
+
+    def get(self, path):
+        with self._lock:
+            entries = self._dirs.get(path)
+            return dict(entries) if entries is not None else None
+
+    def state(self, path):
+        """
+        (mtime_ns_saat_scan, versi) atau None, tanpa menyalin entries
+        """
+        with self._lock:
+            return self._meta.get(path)
+
+    def set(self, path, entries, mtime_ns=None):
+        with self._lock:
+            self._dirs[path] = entries
+            self._bump(path, mtime_ns)
+
+    def update(self, path, upserts, removes):
+        """
+        Ubah entry satu folder tanpa scan. mtime scan tidak diubah:
+        listing membaca disk sampai watcher men-scan folder ini lagi.
+        Return False jika folder belum ada di view.
+        """
+        with self._lock:
+            entries = self._dirs.get(path)
+            if entries is None:
+                return False
+            for name in removes:
+                entries.pop(name, None)
+            entries.update(upserts)
+            self._bump(path, self._meta[path][0])
+            return True
+
+    def pop_tree(self, path):
+        """
+        Hapus folder + semua subfolder, return {folder: entries}
+        yang dihapus
+        """
+        prefix = path + os.sep
+        with self._lock:
+            removed = {
+                d: entries for d, entries in self._dirs.items()
+                if d == path or d.startswith(prefix)
+            }
+            for d in removed:
+                del self._dirs[d]
+                del self._meta[d]
+        return removed
+
+    def dirs(self):
+        with self._lock:
+            return list(self._dirs)
+
+
+_view = FileView()
+_dirty = set()
+_dirty_cond = threading.Condition()
+_last_event = 0.0
+_backend = None
+_started = False
+
+
+def _username_of(path):
+    rel = os.path.relpath(path, USERS_FOLDER)
+    return rel.split(os.sep, 1)[0]
+
+
+def _media_root_of(path):
+    for root, folder in MEDIA_ROOTS.items():
+        if path == folder or path.startswith(folder + os.sep):
+            return root
+    return None
+
+
+def _is_user_path(path):
+    return path == USERS_FOLDER or path.startswith(USERS_FOLDER + os.sep)
+
+
+# =====================================================
+# REFRESH
+# =====================================================
+
+def _entry_row(folder, name, entry):
+    size, mtime_ns, is_dir = entry
+    return (
+        _username_of(os.path.join(folder, name)),
+        folder, name, size, mtime_ns, int(is_dir),
+    )
+
+
+def _files(folder, entries, names=None):
+    """
+    Path file (bukan folder, bukan nama tersembunyi) dari entries
+    """
+    return [
+        os.path.join(folder, name)
+        for name, (_, _, is_dir) in entries.items()
+        if not is_dir and not name.startswith(".")
+        and (names is None or name in names)
+    ]
+
+
+def _searchable(folder):
+    rel = os.path.relpath(folder, USERS_FOLDER)
+    return not any(part.startswith(".") for part in rel.split(os.sep))
+
+
+def _refresh_user_dirs(dirs, index=True):
+    """
+    Baca ulang folder user yang berubah, update view + SQLite.
+    Folder yang sudah dikenal view hanya menulis selisihnya
+    (entry baru / berubah / hilang), bukan seluruh isi folder.
+
+    index=True: file baru / hilang yang terlihat di sini (termasuk
+    yang dibuat di luar CMS: scp, samba, ...) ikut masuk / keluar
+    index pencarian. Scan awal tidak, itu tugas rebuild_upload_index.
+    """
+    replaced = []
+    upserts = []
+    deletes = []
+    added = []
+    gone_files = []
+    pending = list(dirs)
+    seen = set()
+
+    def pop_tree(path):
+        for gone, entries in _view.pop_tree(path).items():
+            replaced.append((_username_of(gone), gone, None))
+            gone_files.extend(_files(gone, entries))
+
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+
+        mtime_ns, entries = FileView.scan(path)
+
+        if entries is None:
+            pop_tree(path)
+            continue
+
+        previous = _view.get(path)
+        _view.set(path, entries, mtime_ns)
+
+        if path != USERS_FOLDER:
+            if previous is None:
+                # belum dikenal (scan awal): isi SQLite bisa basi
+                replaced.append((_username_of(path), path, entries))
+                added.extend(_files(path, entries))
+            else:
+                upserts.extend(
+                    _entry_row(path, name, entry)
+                    for name, entry in entries.items()
+                    if previous.get(name) != entry
+                )
+                deletes.extend(
+                    (path, name) for name in previous
+                    if name not in entries
+                )
+                # nama baru saja: file yang hanya berubah isi tetap
+                # ter-index (meta audio tidak ditimpa)
+                added.extend(_files(path, entries, {
+                    name for name in entries
+                    if name not in previous or previous[name][2]
+                }))
+                gone_files.extend(_files(path, previous, {
+                    name for name in previous
+                    if name not in entries or entries[name][2]
+                }))
+
+        previous = previous or {}
+
+        for name, (_, _, is_dir) in entries.items():
+            child = os.path.join(path, name)
+            if is_dir and (name not in previous or _view.get(child) is None):
+                # folder baru: ikut di-scan & dipantau
+                pending.append(child)
+                if _backend:
+                    _backend.add_tree(child)
+
+        for name, (_, _, was_dir) in previous.items():
+            if was_dir and not entries.get(name, (0, 0, False))[2]:
+                pop_tree(os.path.join(path, name))
+
+    apply_entry_changes(replaced, upserts, deletes)
+
+    if index:
+        remove_uploads([
+            p for p in gone_files if _searchable(os.path.dirname(p))
+        ])
+        index_uploads([
+            p for p in added if _searchable(os.path.dirname(p))
+        ])
+
+
+def _refresh_media_dirs(dirs):
+    # folder yang sudah tercakup folder induknya tidak di-scan dua kali
+    ordered = sorted(dirs)
+    top = []
+    for path in ordered:
+        if top and (path == top[-1] or path.startswith(top[-1] + os.sep)):
+            continue
+        top.append(path)
+
+    for path in top:
+        root = _media_root_of(path)
+        if root:
+            scan_folder(root, path)
+
+
+def _flush(dirs):
+    user_dirs = {d for d in dirs if _is_user_path(d)}
+    media_dirs = {d for d in dirs if _media_root_of(d)}
+
+    _refresh_user_dirs(user_dirs)
+    _refresh_media_dirs(media_dirs)
+
+    log.info(
+        f"[WATCH] flush {len(user_dirs)} folder user, "
+        f"{len(media_dirs)} folder media"
+    )
+
+
+# =====================================================
+# COALESCING
+# =====================================================
+
+def mark_dirty(path):
+    """
+    Catat folder berubah. Ribuan event untuk folder yang sama
+    digabung menjadi satu refresh.
+    """
+    global _last_event
+
+    with _dirty_cond:
+        _dirty.add(path)
+        _last_event = time.monotonic()
+        _dirty_cond.notify()
+
+
+def mark_all_dirty(roots=()):
+    """
+    Rescan penuh: semua folder di view + roots (antrian event overflow)
+    """
+    global _last_event
+
+    dirs = set(_view.dirs())
+    dirs.update(roots)
+
+    with _dirty_cond:
+        _dirty.update(dirs)
+        _last_event = time.monotonic()
+        _dirty_cond.notify()
+
+    log.warning(f"[WATCH] Event overflow, rescan {len(dirs)} folder")
+
+
+def _flush_loop():
+    while True:
+        with _dirty_cond:
+            while not _dirty:
+                _dirty_cond.wait()
+
+            # tunggu sampai tidak ada event selama DEBOUNCE detik
+            first = time.monotonic()
+            while True:
+                now = time.monotonic()
+                remaining = _last_event + DEBOUNCE - now
+                if remaining <= 0 or now - first >= MAX_DELAY:
+                    break
+                _dirty_cond.wait(remaining)
+
+            dirs = set(_dirty)
+            _dirty.clear()
+
+        try:
+            _flush(dirs)
+        except Exception:
+            log.exception("[WATCH] Flush gagal")
+        finally:
+            release_db()
+
+
+# =====================================================
+# BACKEND: INOTIFY (LINUX)
+# =====================================================
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    def __init__(self, roots):
+        self.roots = roots
+        self.wds = {}
+
+        self.libc = ctypes.CDLL(
+            ctypes.util.find_library("c") or "libc.so.6",
+            use_errno=True,
+        )
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        for root in roots:
+            self.add_tree(root)
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(path), WATCH_MASK
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(err, f"inotify_add_watch {path}: {os.strerror(err)}")
+        self.wds[wd] = path
+
+    def add_tree(self, folder):
+        stack = [folder]
+        while stack:
+            path = stack.pop()
+            self.add_watch(path)
+            try:
+                with os.scandir(path) as it:
+                    stack.extend(
+                        e.path for e in it
+                        if e.is_dir(follow_symlinks=False)
+                    )
+            except OSError:
+                pass
+
+    def run(self):
+        while True:
+            data = os.read(self.fd, 64 * 1024)
+            pos = 0
+
+            while pos + _EVENT.size <= len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = data[pos:pos + length].rstrip(b"\0")
+                pos += length
+
+                if mask & IN_Q_OVERFLOW:
+                    # event hilang (mis. copy massal): folder yang sudah
+                    # dikenal tidak di-scan ulang dari root, jadi
+                    # semuanya ditandai berubah
+                    mark_all_dirty(self.roots)
+                    continue
+
+                path = self.wds.get(wd)
+                if path is None:
+                    continue
+
+                if mask & IN_IGNORED:
+                    self.wds.pop(wd, None)
+                    continue
+
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    mark_dirty(os.path.dirname(path))
+                    continue
+
+                mark_dirty(path)
+
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    child = os.path.join(path, os.fsdecode(name))
+                    self.add_tree(child)
+                    mark_dirty(child)
+
+
+# =====================================================
+# BACKEND: POLLING (FALLBACK)
+# =====================================================
+
+class PollingBackend:
+    """
+    Bandingkan mtime folder tiap POLL_INTERVAL.
+    mtime folder berubah saat isi folder ditambah / dihapus / rename.
+    """
+
+    def __init__(self, roots, interval=POLL_INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self.mtimes = self._snapshot()
+
+    def _snapshot(self):
+        mtimes = {}
+        stack = list(self.roots)
+        while stack:
+            path = stack.pop()
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+                with os.scandir(path) as it:
+                    stack.extend(
+                        e.path for e in it
+                        if e.is_dir(follow_symlinks=False)
+                    )
+            except OSError:
+                continue
+        return mtimes
+
+    def add_tree(self, folder):
+        pass
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            current = self._snapshot()
+
+            for path, mtime in current.items():
+                if self.mtimes.get(path) != mtime:
+                    mark_dirty(path)
+
+            for path in self.mtimes.keys() - current.keys():
+                mark_dirty(os.path.dirname(path))
+
+            self.mtimes = current
+
+
+# =====================================================
+# PUBLIC API
+# =====================================================
+
+def watched_roots():
+    return [USERS_FOLDER] + list(MEDIA_ROOTS.values())
+
+
+def start_watcher():
+    """
+    Scan awal folder user, lalu jalankan watcher + flusher (idempotent)
+    """
+    global _backend, _started
+
+    if _started:
+        return
+    _started = True
+
+    os.makedirs(USERS_FOLDER, exist_ok=True)
+    run_migrations()
+    _refresh_user_dirs([USERS_FOLDER], index=False)
+
+    roots = [r for r in watched_roots() if os.path.isdir(r)]
+
+    try:
+        _backend = InotifyBackend(roots)
+        log.info("[WATCH] Backend inotify aktif")
+    except (OSError, AttributeError) as e:
+        log.warning(f"[WATCH] inotify tidak tersedia ({e}), pakai polling")
+        _backend = PollingBackend(roots)
+
+    for target, name in (
+        (_backend.run, "fs-watcher"),
+        (_flush_loop, "fs-watcher-flush"),
+    ):
+        threading.Thread(target=target, name=name, daemon=True).start()
+
+
+def is_running():
+    return _started
+
+
+def refresh_now(path):
+    """
+    Scan ulang sinkron satu folder user (O(isi folder)).
+    Untuk perubahan dari aplikasi sendiri pakai record_changes().
+    """
+    if _started and _is_user_path(path):
+        _refresh_user_dirs([path])
+
+
+def record_changes(changed=(), removed=()):
+    """
+    Catat file / folder yang baru saja diubah aplikasi sendiri
+    (upload, hapus, rename) langsung ke view + SQLite per entry,
+    O(jumlah path) bukan O(isi folder). Folder yang belum dikenal
+    view diserahkan ke flush watcher.
+    """
+    if not _started:
+        return
+
+    per_dir = {}
+    replaced = []
+    upserts = []
+    deletes = []
+
+    for path in removed:
+        if not _is_user_path(path) or path == USERS_FOLDER:
+            continue
+        folder, name = os.path.split(path)
+        per_dir.setdefault(folder, ({}, set()))[1].add(name)
+        deletes.append((folder, name))
+        for gone in _view.pop_tree(path):
+            replaced.append((_username_of(gone), gone, None))
+
+    for path in changed:
+        if not _is_user_path(path) or path == USERS_FOLDER:
+            continue
+        entry = FileView.stat_entry(path)
+        if entry is None:
+            continue
+        folder, name = os.path.split(path)
+        upserts_dir, removes_dir = per_dir.setdefault(folder, ({}, set()))
+        upserts_dir[name] = entry
+        removes_dir.discard(name)
+        upserts.append(_entry_row(folder, name, entry))
+        if entry[2] and _view.get(path) is None:
+            mark_dirty(path)
+
+    for folder, (upserts_dir, removes_dir) in per_dir.items():
+        if not _view.update(folder, upserts_dir, removes_dir):
+            mark_dirty(folder)
+
+    apply_entry_changes(replaced, upserts, deletes)
+
+
+def get_listing(path):
+    """
+    Return {name: (size, mtime_ns, is_dir)} dari view,
+    atau None jika watcher tidak aktif / folder belum dikenal
+    """
+    if not _started:
+        return None
+    return _view.get(path)
+
+
+def get_listing_state(path):
+    """
+    (mtime_ns folder saat di-scan, versi) dari view,
+    atau None jika watcher tidak aktif / folder belum dikenal
+    """
+    if not _started:
+        return None
+    return _view.state(path)
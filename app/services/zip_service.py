@@ -0,0 +1,117 @@
+"""
+zip_service.py
+Download folder sebagai ZIP yang dibuat on-the-fly (streaming)
+"""
+
+import io
+import os
+import zipfile
+
+
+READ_CHUNK_SIZE = 256 * 1024  # 256 KB
+
+# media yang sudah terkompresi: disimpan apa adanya (ZIP_STORED)
+STORED_EXTENSIONS = {
+    "jpg", "jpeg", "png", "gif", "webp", "heic",
+    "mp4", "m4v", "mkv", "webm", "mov", "avi",
+    "mp3", "m4a", "aac", "ogg", "opus", "flac",
+    "zip", "gz", "7z", "rar", "pdf",
+}
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    File-like write-only & tidak bisa seek.
+    zipfile otomatis memakai data descriptor untuk stream seperti ini,
+    sehingga archive bisa ditulis tanpa file sementara.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _compress_type(name):
+    ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    if ext in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def iter_folder_files(folder):
+    """
+    Yield (path, arcname) semua file di folder (rekursif, tanpa symlink)
+    """
+    stack = [(folder, "")]
+
+    while stack:
+        current, prefix = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+
+            arcname = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, arcname + "/"))
+            elif entry.is_file(follow_symlinks=False):
+                yield entry.path, arcname
+
+
+def stream_zip(files):
+    """
+    Generator byte ZIP. files: iterable (path, arcname).
+    Memori terbatas ~READ_CHUNK_SIZE, ZIP64 otomatis untuk file /
+    archive > 4 GB.
+    """
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, "w", allowZip64=True) as archive:
+        for path, arcname in files:
+            try:
+                info = zipfile.ZipInfo.from_file(
+                    path, arcname, strict_timestamps=False
+                )
+                source = open(path, "rb")
+            except OSError:
+                # file hilang saat proses berjalan: lewati
+                continue
+
+            info.compress_type = _compress_type(arcname)
+
+            with source, archive.open(info, "w") as dest:
+                while True:
+                    chunk = source.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            yield buffer.drain()
+
+    # central directory
+    yield buffer.drain()
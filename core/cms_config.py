@@ -26,6 +26,33 @@ DEFAULT_CONFIG = {
     "CMS_NAME": "CMS_SYSTEM",
     "CMS_VERSION": "1.0.0",
     "CMS_TIMEZONE": "Asia/Jakarta",
+    "CMS_STORAGE_MODE": "plain",  # plain | cas (dedup upload)
+    "CMS_DEFAULT_QUOTA_MB": "0",  # kuota default per user, 0 = tanpa batas
+
+    # Offload download ke web server: none | nginx | sendfile
+    "CMS_DOWNLOAD_OFFLOAD": "none",
+    "CMS_ACCEL_PREFIX": "/_protected",  # location internal nginx -> BASE
+
+    # Worker job background (thumbnail, hash, metadata)
+    "CMS_JOB_WORKERS": "2",
+    "CMS_JOB_MODE": "thread",     # thread | process
+
+    # Kompresi respons gzip / brotli
+    "CMS_COMPRESS": "1",               # 0 = nonaktif
+    "CMS_COMPRESS_MIN_SIZE": "1024",   # byte, respons lebih kecil tidak dikompres
+    "CMS_COMPRESS_CACHE_MB": "256",    # batas cache varian file user di disk
+
+    # Masa berlaku URL stream bertanda tangan di export playlist (detik)
+    "CMS_PLAYLIST_URL_TTL": "21600",
+
+    # Cache baris user per proses (detik), 0 = hanya cache per request.
+    # Perubahan user dari worker lain terlihat paling lama 2 detik.
+    "CMS_USER_CACHE_TTL": "5",
+
+    # Cache-Control per route file
+    "CMS_CACHE_PREVIEW": "private, max-age=3600",
+    "CMS_CACHE_THUMB": "private, max-age=2592000",
+    "CMS_CACHE_DOWNLOAD": "private, no-cache",
 }
 
 # =====================================================
@@ -98,6 +125,46 @@ def load_config(env_file: str = ".env") -> dict:
             "CMS_ENV harus DEV atau PROD"
         )
 
+    if config["CMS_STORAGE_MODE"] not in ("plain", "cas"):
+        raise CMSConfigError(
+            "CMS_STORAGE_MODE harus plain atau cas"
+        )
+
+    if config["CMS_DOWNLOAD_OFFLOAD"] not in ("none", "nginx", "sendfile"):
+        raise CMSConfigError(
+            "CMS_DOWNLOAD_OFFLOAD harus none, nginx atau sendfile"
+        )
+
+    if config["CMS_JOB_MODE"] not in ("thread", "process"):
+        raise CMSConfigError(
+            "CMS_JOB_MODE harus thread atau process"
+        )
+
+    if config["CMS_COMPRESS"] not in ("0", "1"):
+        raise CMSConfigError(
+            "CMS_COMPRESS harus 0 atau 1"
+        )
+
+    if not config["CMS_COMPRESS_MIN_SIZE"].isdigit():
+        raise CMSConfigError(
+            "CMS_COMPRESS_MIN_SIZE harus angka (byte)"
+        )
+
+    if not config["CMS_COMPRESS_CACHE_MB"].isdigit():
+        raise CMSConfigError(
+            "CMS_COMPRESS_CACHE_MB harus angka (MB)"
+        )
+
+    if not config["CMS_PLAYLIST_URL_TTL"].isdigit():
+        raise CMSConfigError(
+            "CMS_PLAYLIST_URL_TTL harus angka (detik)"
+        )
+
+    if not config["CMS_USER_CACHE_TTL"].isdigit():
+        raise CMSConfigError(
+            "CMS_USER_CACHE_TTL harus angka (detik)"
+        )
+
     _config = config
     _loaded = True
 
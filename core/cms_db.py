@@ -0,0 +1,64 @@
+"""
+cms_db.py
+Setup koneksi SQLite bersama (WAL, busy_timeout, mmap, ...)
+untuk repository app dan antrian job core
+"""
+
+import os
+import sqlite3
+
+from core.cms_bash_folder import DB_PATH
+
+
+BUSY_TIMEOUT = 5.0               # detik menunggu lock writer lain
+MMAP_SIZE = 64 * 1024 * 1024     # 64 MB read lewat mmap
+CACHE_SIZE_KB = 8 * 1024         # page cache per koneksi
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",   # reader tidak memblok writer
+    "PRAGMA synchronous = NORMAL", # aman di WAL, fsync hanya saat checkpoint
+    f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT * 1000)}",
+    f"PRAGMA mmap_size = {MMAP_SIZE}",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+# =====================================================
+# CONNECTION
+# =====================================================
+
+class PooledConnection(sqlite3.Connection):
+    """
+    close() = no-op: koneksi dipakai bersama, jadi repository yang
+    dipanggil di tengah transaksi pemanggil tidak boleh membuang
+    tulisan yang belum di-commit. Sisa transaksi di-rollback oleh
+    pemilik koneksi saat dilepas (release_db), tutup dengan dispose().
+    """
+
+    def close(self):
+        pass
+
+    def dispose(self):
+        super().close()
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT,
+        factory=PooledConnection,
+        # koneksi pool bisa pindah thread antar request (tidak bersamaan)
+        check_same_thread=False,
+    )
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    conn.pid = os.getpid()
+    return conn
+
+
+def is_usable(conn):
+    """
+    Koneksi warisan fork (gunicorn --preload) tidak boleh dipakai
+    """
+    return conn is not None and conn.pid == os.getpid()
@@ -0,0 +1,490 @@
+"""
+cms_jobs.py
+Antrian job background yang persisten (SQLite) + worker pool
+(thread / process), dengan retry & exponential backoff
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import sqlite3
+import importlib
+import threading
+import multiprocessing
+
+from core import cms_config
+from core.cms_logger import get_logger
+from core.cms_bash_folder import DB_PATH
+from core.cms_db import connect, is_usable
+
+
+# =====================================================
+# KONFIGURASI
+# =====================================================
+
+log = get_logger("CMS_JOBS")
+
+POLL_INTERVAL = 1.0        # detik, jeda cek antrian saat kosong
+LEASE_SECONDS = 120        # job running tanpa heartbeat -> diantrikan ulang
+HEARTBEAT_INTERVAL = 30
+DONE_RETENTION = 7 * 86400  # job selesai disimpan 7 hari (statistik)
+DB_TIMEOUT = 30
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 10       # detik, dikali 2 tiap percobaan
+MAX_BACKOFF = 3600
+
+STATUSES = ("queued", "running", "done", "failed")
+
+
+class JobType:
+    def __init__(self, name, handler, max_attempts, backoff):
+        self.name = name
+        self.handler = handler
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    def retry_delay(self, attempts):
+        delay = min(self.backoff * 2 ** (attempts - 1), MAX_BACKOFF)
+        return delay * random.uniform(0.8, 1.2)  # jitter
+
+
+_types = {}
+_wakeup = threading.Event()
+_active = set()            # id job yang sedang jalan di proses ini
+_active_lock = threading.Lock()
+_workers = []
+_after_job = []            # callback pembersih setelah tiap job
+_local = threading.local()
+
+
+# =====================================================
+# DATABASE
+# =====================================================
+
+def _connect():
+    """
+    Koneksi antrian, satu per thread & dipakai ulang: setup sama dengan
+    repository (WAL, busy_timeout, ...), timeout lebih panjang &
+    transaksi diatur manual (autocommit di luar BEGIN)
+    """
+    conn = getattr(_local, "conn", None)
+    if not is_usable(conn):
+        conn = connect(DB_PATH)
+        conn.execute(f"PRAGMA busy_timeout = {DB_TIMEOUT * 1000}")
+        conn.isolation_level = None  # transaksi diatur manual
+        _local.conn = conn
+    return conn
+
+
+# =====================================================
+# REGISTRASI JOB TYPE
+# =====================================================
+
+def register(name, handler, max_attempts=DEFAULT_MAX_ATTEMPTS,
+             backoff=DEFAULT_BACKOFF):
+    """
+    handler(payload: dict). Exception = gagal -> retry dengan backoff.
+    Modul yang memanggil register() ikut di-import worker process.
+    """
+    _types[name] = JobType(name, handler, max_attempts, backoff)
+
+
+def after_job(callback):
+    """
+    callback() dipanggil setelah tiap job (berhasil / gagal) di thread
+    worker, mis. rollback transaksi repository yang tertinggal.
+    Didaftarkan dari modul handler agar ikut aktif di worker process.
+    """
+    if callback not in _after_job:
+        _after_job.append(callback)
+    return callback
+
+
+def job(name, **options):
+    """
+    Decorator: @job("thumbnail")
+    """
+    def decorator(handler):
+        register(name, handler, **options)
+        return handler
+    return decorator
+
+
+# =====================================================
+# ENQUEUE
+# =====================================================
+
+def enqueue(name, payload=None, delay=0):
+    """
+    Simpan job ke antrian, return id. Tidak menunggu job dijalankan.
+    """
+    job_type = _types.get(name)
+    max_attempts = job_type.max_attempts if job_type else DEFAULT_MAX_ATTEMPTS
+    now = time.time()
+
+    conn = _connect()
+    cur = conn.execute(
+        """
+        INSERT INTO jobs (type, payload, max_attempts, run_at, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (name, json.dumps(payload or {}), max_attempts, now + delay, now)
+    )
+    job_id = cur.lastrowid
+
+    _wakeup.set()
+    return job_id
+
+
+# =====================================================
+# CLAIM / SELESAI
+# =====================================================
+
+def _claim(worker):
+    """
+    Ambil satu job siap jalan secara atomic (BEGIN IMMEDIATE),
+    aman untuk banyak thread / process / instance aplikasi
+    """
+    names = list(_types)
+    if not names:
+        return None
+
+    now = time.time()
+    conn = _connect()
+
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            f"""
+            SELECT id, type, payload, attempts FROM jobs
+            WHERE status = 'queued' AND run_at <= ?
+              AND type IN ({",".join("?" * len(names))})
+            ORDER BY run_at, id
+            LIMIT 1
+            """,
+            [now] + names
+        ).fetchone()
+
+        if row:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1,
+                    started_at = ?, heartbeat_at = ?, worker = ?
+                WHERE id = ?
+                """,
+                (now, now, worker, row[0])
+            )
+
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+    if row is None:
+        return None
+
+    job_id, name, payload, attempts = row
+    return job_id, name, json.loads(payload), attempts + 1
+
+
+def _finish(job_id, error=None, retry_delay=None):
+    now = time.time()
+    conn = _connect()
+
+    if error is None:
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'done', finished_at = ?, last_error = NULL
+            WHERE id = ?
+            """,
+            (now, job_id)
+        )
+    elif retry_delay is not None:
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'queued', run_at = ?, last_error = ?
+            WHERE id = ?
+            """,
+            (now + retry_delay, error, job_id)
+        )
+    else:
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'failed', finished_at = ?, last_error = ?
+            WHERE id = ?
+            """,
+            (now, error, job_id)
+        )
+
+
+def run_one(worker="inline"):
+    """
+    Jalankan satu job. Return False jika antrian kosong.
+    """
+    claimed = _claim(worker)
+    if claimed is None:
+        return False
+
+    job_id, name, payload, attempts = claimed
+    job_type = _types[name]
+
+    with _active_lock:
+        _active.add(job_id)
+
+    try:
+        job_type.handler(payload)
+        _finish(job_id)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+        if attempts < job_type.max_attempts:
+            delay = job_type.retry_delay(attempts)
+            log.warning(
+                f"[JOBS] {name}#{job_id} gagal (percobaan {attempts}), "
+                f"retry {delay:.0f}s: {error}"
+            )
+            _finish(job_id, error, retry_delay=delay)
+        else:
+            log.error(f"[JOBS] {name}#{job_id} gagal permanen: {error}")
+            _finish(job_id, error)
+    finally:
+        # mis. sisa transaksi handler yang gagal sebelum commit
+        for callback in _after_job:
+            try:
+                callback()
+            except Exception:
+                log.exception(f"[JOBS] Cleanup setelah {name}#{job_id} gagal")
+        with _active_lock:
+            _active.discard(job_id)
+
+    return True
+
+
+# =====================================================
+# HEARTBEAT & RECOVERY
+# =====================================================
+
+def _heartbeat():
+    """
+    Perpanjang lease job yang sedang jalan di proses ini, lalu
+    antrikan ulang job running yang lease-nya habis (worker mati)
+    """
+    now = time.time()
+
+    with _active_lock:
+        active = list(_active)
+
+    conn = _connect()
+
+    if active:
+        conn.execute(
+            f"""
+            UPDATE jobs SET heartbeat_at = ?
+            WHERE id IN ({",".join("?" * len(active))})
+            """,
+            [now] + active
+        )
+
+    cur = conn.execute(
+        """
+        UPDATE jobs SET status = 'queued', run_at = ?,
+            last_error = 'lease habis (worker berhenti)'
+        WHERE status = 'running' AND heartbeat_at < ?
+        """,
+        (now, now - LEASE_SECONDS)
+    )
+    if cur.rowcount:
+        log.warning(f"[JOBS] {cur.rowcount} job diantrikan ulang")
+
+    conn.execute(
+        "DELETE FROM jobs WHERE status = 'done' AND finished_at < ?",
+        (now - DONE_RETENTION,)
+    )
+
+
+def _heartbeat_loop():
+    while True:
+        try:
+            _heartbeat()
+        except Exception:
+            log.exception("[JOBS] Heartbeat gagal")
+        time.sleep(HEARTBEAT_INTERVAL)
+
+
+# =====================================================
+# WORKER POOL
+# =====================================================
+
+def _worker_loop(worker):
+    while True:
+        try:
+            if run_one(worker):
+                continue
+        except Exception:
+            log.exception(f"[JOBS] Worker {worker} error")
+
+        _wakeup.wait(POLL_INTERVAL)
+        _wakeup.clear()
+
+
+def _process_main(modules, worker):
+    """
+    Entry point worker process: import ulang modul handler
+    (register() jalan saat import), lalu loop seperti thread worker
+    """
+    for module in modules:
+        importlib.import_module(module)
+
+    threading.Thread(target=_heartbeat_loop, daemon=True).start()
+    _worker_loop(worker)
+
+
+def start_workers(count=None, mode=None):
+    """
+    Jalankan worker pool (idempotent).
+    CMS_JOB_WORKERS = jumlah worker, CMS_JOB_MODE = thread | process.
+    """
+    if _workers:
+        return _workers
+
+    count = int(count or cms_config.get("CMS_JOB_WORKERS", "2"))
+    mode = mode or cms_config.get("CMS_JOB_MODE", "thread")
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    if mode == "process":
+        modules = sorted({t.handler.__module__ for t in _types.values()})
+        context = multiprocessing.get_context("spawn")
+
+        for i in range(count):
+            proc = context.Process(
+                target=_process_main,
+                args=(modules, f"{prefix}:p{i}"),
+                name=f"job-worker-{i}",
+                daemon=True,
+            )
+            proc.start()
+            _workers.append(proc)
+    else:
+        for i in range(count):
+            thread = threading.Thread(
+                target=_worker_loop,
+                args=(f"{prefix}:t{i}",),
+                name=f"job-worker-{i}",
+                daemon=True,
+            )
+            thread.start()
+            _workers.append(thread)
+
+    # heartbeat proses ini (job thread + recovery lease)
+    threading.Thread(
+        target=_heartbeat_loop,
+        name="job-heartbeat",
+        daemon=True,
+    ).start()
+
+    log.info(f"[JOBS] {count} worker ({mode}) aktif")
+    return _workers
+
+
+# =====================================================
+# STATISTIK
+# =====================================================
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(int(len(values) * pct), len(values) - 1)
+    return values[index]
+
+
+def job_stats(window=3600, sample=1000):
+    """
+    Kedalaman antrian per type & latency job selesai dalam window detik
+    """
+    now = time.time()
+    conn = _connect()
+
+    counts = {}
+    for name, status, count in conn.execute(
+        "SELECT type, status, COUNT(*) FROM jobs GROUP BY type, status"
+    ):
+        counts.setdefault(name, dict.fromkeys(STATUSES, 0))[status] = count
+
+    depth, oldest = conn.execute(
+        """
+        SELECT COUNT(*), MIN(run_at) FROM jobs
+        WHERE status = 'queued' AND run_at <= ?
+        """,
+        (now,)
+    ).fetchone()
+
+    rows = conn.execute(
+        """
+        SELECT started_at - created_at, finished_at - started_at FROM jobs
+        WHERE status = 'done' AND finished_at >= ?
+        ORDER BY finished_at DESC
+        LIMIT ?
+        """,
+        (now - window, sample)
+    ).fetchall()
+
+    failures = conn.execute(
+        """
+        SELECT id, type, attempts, last_error, finished_at FROM jobs
+        WHERE status = 'failed'
+        ORDER BY finished_at DESC
+        LIMIT 20
+        """
+    ).fetchall()
+
+    waits = [r[0] for r in rows]
+    runs = [r[1] for r in rows]
+
+    return {
+        "types": counts,
+        "depth": depth,
+        "oldest_wait": now - oldest if oldest else 0,
+        "completed": len(rows),
+        "wait_avg": sum(waits) / len(waits) if waits else None,
+        "wait_p95": _percentile(waits, 0.95),
+        "run_avg": sum(runs) / len(runs) if runs else None,
+        "run_p95": _percentile(runs, 0.95),
+        "failures": failures,
+        "workers": len(_workers),
+    }
+
+
+def retry_failed(job_id=None):
+    """
+    Antrikan ulang job failed (semua, atau satu id)
+    """
+    conn = _connect()
+
+    if job_id is None:
+        cur = conn.execute(
+            """
+            UPDATE jobs SET status = 'queued', attempts = 0, run_at = ?
+            WHERE status = 'failed'
+            """,
+            (time.time(),)
+        )
+    else:
+        cur = conn.execute(
+            """
+            UPDATE jobs SET status = 'queued', attempts = 0, run_at = ?
+            WHERE status = 'failed' AND id = ?
+            """,
+            (time.time(), job_id)
+        )
+
+    count = cur.rowcount
+
+    _wakeup.set()
+    return count
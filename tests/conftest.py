@@ -0,0 +1,34 @@
+"""
+conftest.py
+Fixture bersama: CMS_BASE diarahkan ke folder sementara sebelum modul
+app / core di-import, sehingga test tidak menyentuh data asli.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ["CMS_BASE"] = tempfile.mkdtemp(prefix="cms-test-")
+
+from flask import Flask  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    """
+    Aplikasi Flask minimal: skema dimigrasi & koneksi DB per request
+    """
+    from app.repositories.migrate import run_migrations
+    from app.repositories.db import init_db
+
+    run_migrations()
+
+    application = Flask("app", root_path=os.path.join(ROOT, "app"))
+    application.config.update(SECRET_KEY="test", TESTING=True)
+    init_db(application)
+    return application
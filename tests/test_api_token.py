@@ -0,0 +1,39 @@
+"""
+test_api_token.py
+Cache verifikasi token: lookup database yang dimulai sebelum revoke
+tidak boleh menyimpan token yang sudah di-revoke ke cache
+"""
+
+from app.services import api_token_service
+from app.services.api_token_service import (
+    generate_token,
+    list_tokens,
+    revoke_user_token,
+    verify_token,
+)
+
+
+def test_lookup_racing_revoke_is_not_cached(app, monkeypatch):
+    with app.app_context():
+        token = generate_token("token-user")
+        token_id = list_tokens("token-user")[0]["id"]
+
+        find_token_hash = api_token_service.find_token_hash
+
+        def lookup_then_revoke(token_hash):
+            user = find_token_hash(token_hash)
+            # revoke selesai & request lain sudah sinkron generation
+            # sebelum lookup ini sempat mengisi cache
+            revoke_user_token("token-user", token_id)
+            api_token_service._cache.get("request-lain")
+            return user
+
+        monkeypatch.setattr(
+            api_token_service, "find_token_hash", lookup_then_revoke
+        )
+        assert verify_token(token) == "token-user"
+
+        monkeypatch.setattr(
+            api_token_service, "find_token_hash", find_token_hash
+        )
+        assert verify_token(token) is None
@@ -0,0 +1,77 @@
+"""
+test_db.py
+Koneksi bersama db.get_db: tulisan yang belum di-commit tidak hilang
+saat repository lain dipanggil, sisa transaksi di-rollback saat release
+"""
+
+import threading
+
+from app.repositories.db import get_db, release_db, query_count
+from app.repositories.cas_repository import get_digest
+
+
+def _count(conn, name):
+    return conn.execute(
+        "SELECT COUNT(*) FROM user_counters WHERE name = ?", (name,)
+    ).fetchone()[0]
+
+
+def test_nested_checkout_keeps_uncommitted_write(app):
+    with app.app_context():
+        conn = get_db()
+        conn.execute(
+            "INSERT INTO user_counters (name, value) VALUES ('test:nested', 1)"
+        )
+
+        # repository lain di tengah transaksi
+        assert get_db() is conn
+        assert conn.in_transaction
+
+        conn.commit()
+        assert _count(conn, "test:nested") == 1
+        assert query_count() == 2
+
+
+def test_nested_repository_close_keeps_uncommitted_write(app):
+    with app.app_context():
+        conn = get_db()
+        conn.execute(
+            "INSERT INTO user_counters (name, value) VALUES ('test:close', 1)"
+        )
+
+        # repository lain: get_db(); SELECT; conn.close()
+        assert get_digest("/tidak/ada") is None
+        assert conn.in_transaction
+
+        conn.commit()
+        assert _count(conn, "test:close") == 1
+
+
+def test_release_rolls_back_leftover_request_transaction(app):
+    with app.app_context():
+        conn = get_db()
+        conn.execute(
+            "INSERT INTO user_counters (name, value) VALUES ('test:req', 1)"
+        )
+
+    with app.app_context():
+        assert _count(get_db(), "test:req") == 0
+
+
+def test_release_rolls_back_leftover_thread_transaction():
+    seen = {}
+
+    def work():
+        conn = get_db()
+        conn.execute(
+            "INSERT INTO user_counters (name, value) VALUES ('test:thread', 1)"
+        )
+        release_db()
+        seen["in_transaction"] = conn.in_transaction
+        seen["count"] = _count(get_db(), "test:thread")
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+
+    assert seen == {"in_transaction": False, "count": 0}
@@ -0,0 +1,93 @@
+"""
+test_quota.py
+Pemesanan kuota atomic (reserve_usage): upload paralel tidak bisa
+sama-sama lolos melewati kuota
+"""
+
+import os
+import threading
+
+from app.repositories.quota_repository import (
+    claim_reconcile,
+    get_quota_row,
+    reserve_usage,
+    set_quota,
+)
+from app.services.quota_service import refund_upload
+
+
+def test_reserve_within_and_over_quota(app):
+    with app.app_context():
+        set_quota("quota-a", 100)
+
+        assert reserve_usage("quota-a", 60)
+        assert not reserve_usage("quota-a", 41)
+        assert reserve_usage("quota-a", 40)
+        assert get_quota_row("quota-a") == (100, 100)
+
+        refund_upload("quota-a", 40)
+        assert get_quota_row("quota-a") == (60, 100)
+
+
+def test_default_quota_and_unlimited(app):
+    with app.app_context():
+        assert not reserve_usage("quota-b", 11, default_quota=10)
+        assert reserve_usage("quota-b", 10, default_quota=10)
+        assert reserve_usage("quota-c", 10 ** 12)
+
+
+def test_parallel_reservations_never_exceed_quota(app):
+    with app.app_context():
+        set_quota("quota-d", 1000)
+
+    results = []
+    barrier = threading.Barrier(8)
+
+    def upload():
+        barrier.wait()
+        for _ in range(10):
+            results.append(reserve_usage("quota-d", 30))
+
+    threads = [threading.Thread(target=upload) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        used, quota = get_quota_row("quota-d")
+
+    assert results.count(True) == 1000 // 30
+    assert used == 30 * results.count(True) <= quota
+
+
+def test_reconcile_keeps_reservations_made_during_walk(app, monkeypatch):
+    from core.cms_bash_folder import UPLOAD_FOLDER
+    from app.services import quota_service
+
+    folder = os.path.join(UPLOAD_FOLDER, "users", "quota-e")
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "a.bin"), "wb") as f:
+        f.write(b"x" * 100)
+
+    walk = quota_service._folder_size
+
+    def walk_with_upload(path):
+        size = walk(path)
+        if path == folder:
+            # upload lain memesan kuota saat walk berjalan
+            assert reserve_usage("quota-e", 50)
+        return size
+
+    monkeypatch.setattr(quota_service, "_folder_size", walk_with_upload)
+
+    with app.app_context():
+        quota_service.reconcile_usage()
+        assert get_quota_row("quota-e")[0] == 150
+
+
+def test_reconcile_claimed_once_per_interval(app):
+    with app.app_context():
+        assert claim_reconcile(3600)
+        assert not claim_reconcile(3600)
+        assert claim_reconcile(0)
@@ -0,0 +1,53 @@
+"""
+test_search_meta.py
+Job metadata & index_upload bisa jalan dalam urutan apa pun
+tanpa kehilangan meta (tag audio / EXIF) di index pencarian
+"""
+
+import os
+
+from core.cms_bash_folder import UPLOAD_FOLDER
+from app.repositories.db import get_db
+from app.services.search_service import index_media_meta, index_upload
+
+
+def _meta(path):
+    row = get_db().execute(
+        "SELECT meta FROM search_docs WHERE path = ?", (path,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _path(name):
+    return os.path.join(UPLOAD_FOLDER, "users", "meta-user", name)
+
+
+def test_metadata_before_index(app):
+    path = _path("first.mp3")
+
+    with app.app_context():
+        index_media_meta([(path, "Queen Bohemian Rhapsody")])
+        assert _meta(path) == "Queen Bohemian Rhapsody"
+
+        index_upload(path)
+        assert _meta(path) == "Queen Bohemian Rhapsody"
+
+
+def test_index_before_metadata(app):
+    path = _path("second.mp3")
+
+    with app.app_context():
+        index_upload(path)
+        assert _meta(path) == ""
+
+        index_media_meta([(path, "Queen Innuendo")])
+        index_upload(path)
+        assert _meta(path) == "Queen Innuendo"
+
+
+def test_library_meta_only_updates_existing_docs(app):
+    path = "/srv/library/music/absent.mp3"
+
+    with app.app_context():
+        index_media_meta([(path, "tidak ada dokumen")])
+        assert _meta(path) is None
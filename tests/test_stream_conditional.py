@@ -0,0 +1,70 @@
+"""
+test_stream_conditional.py
+GET bersyarat untuk varian terkompresi: ETag varian dihitung dari stat,
+304 dikirim tanpa membuka / mengompres file
+"""
+
+import pytest
+
+from app.services import stream_service
+from app.services.stream_service import send_file_ranged
+
+
+@pytest.fixture()
+def text_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("baris teks yang berulang\n" * 500)
+    return str(path)
+
+
+def _send(app, path, headers):
+    with app.test_request_context(headers=headers):
+        resp = send_file_ranged(path)
+        body = b"".join(resp.response) if resp.status_code == 200 else b""
+        resp.close()
+    return resp, body
+
+
+def test_variant_etag_then_304_without_compressing(app, text_file, monkeypatch):
+    resp, body = _send(app, text_file, {"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    etag = resp.headers["ETag"]
+    assert etag.endswith('-gzip"')
+    assert len(body) < 500 * 25
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file dikompres untuk request 304")
+
+    monkeypatch.setattr(stream_service, "compressed_file", fail)
+
+    resp, _ = _send(
+        app, text_file,
+        {"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.headers["Content-Encoding"] == "gzip"
+
+
+def test_identity_etag_does_not_match_variant(app, text_file):
+    resp, _ = _send(app, text_file, {"Accept-Encoding": "gzip"})
+    variant_etag = resp.headers["ETag"]
+
+    resp, body = _send(
+        app, text_file,
+        {"Accept-Encoding": "identity", "If-None-Match": variant_etag},
+    )
+    assert resp.status_code == 200
+    assert "Content-Encoding" not in resp.headers
+    assert len(body) == 500 * 25
+
+
+def test_compression_failure_falls_back_to_original(app, text_file, monkeypatch):
+    monkeypatch.setattr(stream_service, "compressed_file", lambda *a: None)
+
+    resp, body = _send(app, text_file, {"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert "Content-Encoding" not in resp.headers
+    assert not resp.headers["ETag"].endswith('-gzip"')
+    assert len(body) == 500 * 25
@@ -0,0 +1,214 @@
+"""
+test_stream_ranges.py
+HTTP Range pada send_file_ranged dengan file sparse beberapa GB
+(offset di atas 4 GiB, tanpa benar-benar menulis isi file)
+"""
+
+import os
+
+import pytest
+
+from app.services.stream_service import send_file_ranged
+
+
+SIZE = 5 * 1024 ** 3 + 123          # > 4 GiB: offset tidak muat 32 bit
+MARKS = {
+    0: b"HEAD",
+    4 * 1024 ** 3 + 7: b"FOUR",     # melewati batas 4 GiB
+    SIZE - 4: b"TAIL",
+}
+
+
+@pytest.fixture(scope="module")
+def big_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("stream") / "big.bin"
+
+    with open(path, "wb") as f:
+        f.truncate(SIZE)
+        for offset, data in MARKS.items():
+            f.seek(offset)
+            f.write(data)
+
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def client(app, big_file):
+    if "big" not in app.view_functions:
+        app.add_url_rule("/big", "big", lambda: send_file_ranged(big_file))
+    return app.test_client()
+
+
+def _etag(client):
+    resp = client.head("/big")
+    resp.close()
+    return resp.headers["ETag"]
+
+
+# =====================================================
+# RANGE TUNGGAL
+# =====================================================
+
+def test_full_content_without_range(client):
+    resp = client.get("/big")
+    assert resp.status_code == 200
+    assert resp.headers["Accept-Ranges"] == "bytes"
+    assert int(resp.headers["Content-Length"]) == SIZE
+    resp.close()
+
+
+def test_single_range_above_4gib(client):
+    start = 4 * 1024 ** 3 + 5
+    resp = client.get("/big", headers={"Range": f"bytes={start}-{start + 7}"})
+
+    assert resp.status_code == 206
+    assert resp.headers["Content-Range"] == f"bytes {start}-{start + 7}/{SIZE}"
+    assert resp.headers["Content-Length"] == "8"
+    assert resp.data == b"\0\0FOUR\0\0"
+
+
+def test_open_ended_range_is_clamped(client):
+    resp = client.get("/big", headers={"Range": f"bytes={SIZE - 4}-"})
+
+    assert resp.status_code == 206
+    assert resp.headers["Content-Range"] == f"bytes {SIZE - 4}-{SIZE - 1}/{SIZE}"
+    assert resp.data == b"TAIL"
+
+
+def test_suffix_range(client):
+    resp = client.get("/big", headers={"Range": "bytes=-4"})
+
+    assert resp.status_code == 206
+    assert resp.headers["Content-Range"] == f"bytes {SIZE - 4}-{SIZE - 1}/{SIZE}"
+    assert resp.data == b"TAIL"
+
+
+def test_suffix_range_longer_than_file(client, tmp_path, app):
+    small = tmp_path / "small.bin"
+    small.write_bytes(b"abc")
+
+    with app.test_request_context(headers={"Range": "bytes=-10"}):
+        resp = send_file_ranged(str(small))
+        body = b"".join(resp.response)
+        resp.close()
+
+    assert resp.status_code == 206
+    assert resp.headers["Content-Range"] == "bytes 0-2/3"
+    assert body == b"abc"
+
+
+# =====================================================
+# MULTI RANGE
+# =====================================================
+
+def test_multi_range(client):
+    far = 4 * 1024 ** 3 + 7
+    resp = client.get(
+        "/big", headers={"Range": f"bytes=0-3,{far}-{far + 3},-4"}
+    )
+
+    assert resp.status_code == 206
+    content_type = resp.headers["Content-Type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=", 1)[1]
+
+    body = resp.data
+    assert int(resp.headers["Content-Length"]) == len(body)
+    assert body.endswith(f"\r\n--{boundary}--\r\n".encode())
+
+    parts = body.split(f"\r\n--{boundary}".encode())[1:-1]
+    assert len(parts) == 3
+
+    expected = [
+        (f"bytes 0-3/{SIZE}", b"HEAD"),
+        (f"bytes {far}-{far + 3}/{SIZE}", b"FOUR"),
+        (f"bytes {SIZE - 4}-{SIZE - 1}/{SIZE}", b"TAIL"),
+    ]
+    for part, (content_range, data) in zip(parts, expected):
+        head, _, payload = part.partition(b"\r\n\r\n")
+        assert f"Content-Range: {content_range}".encode() in head
+        assert payload == data
+
+
+def test_too_many_ranges_sends_full_file(client):
+    spec = ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(64))
+    resp = client.get("/big", headers={"Range": f"bytes={spec}"})
+
+    assert resp.status_code == 200
+    assert int(resp.headers["Content-Length"]) == SIZE
+    resp.close()
+
+
+# =====================================================
+# IF-RANGE
+# =====================================================
+
+def test_if_range_matching_etag(client):
+    resp = client.get(
+        "/big", headers={"Range": "bytes=0-3", "If-Range": _etag(client)}
+    )
+
+    assert resp.status_code == 206
+    assert resp.data == b"HEAD"
+
+
+def test_if_range_stale_etag_sends_full_file(client):
+    resp = client.get(
+        "/big", headers={"Range": "bytes=0-3", "If-Range": '"stale"'}
+    )
+
+    assert resp.status_code == 200
+    assert int(resp.headers["Content-Length"]) == SIZE
+    resp.close()
+
+
+def test_if_range_weak_etag_is_never_used(client):
+    resp = client.get(
+        "/big",
+        headers={"Range": "bytes=0-3", "If-Range": "W/" + _etag(client)},
+    )
+
+    assert resp.status_code == 200
+    resp.close()
+
+
+def test_if_range_date(client, big_file):
+    from werkzeug.http import http_date
+
+    mtime = os.stat(big_file).st_mtime
+
+    resp = client.get(
+        "/big",
+        headers={"Range": "bytes=0-3", "If-Range": http_date(mtime + 60)},
+    )
+    assert resp.status_code == 206
+    assert resp.data == b"HEAD"
+
+    resp = client.get(
+        "/big",
+        headers={"Range": "bytes=0-3", "If-Range": http_date(mtime - 60)},
+    )
+    assert resp.status_code == 200
+    resp.close()
+
+
+# =====================================================
+# 416 / RANGE TIDAK VALID
+# =====================================================
+
+@pytest.mark.parametrize("spec", [f"bytes={SIZE}-", f"bytes={SIZE + 10}-{SIZE + 20}"])
+def test_unsatisfiable_range(client, spec):
+    resp = client.get("/big", headers={"Range": spec})
+
+    assert resp.status_code == 416
+    assert resp.headers["Content-Range"] == f"bytes */{SIZE}"
+    assert resp.data == b""
+
+
+@pytest.mark.parametrize("spec", ["bytes=5-1", "items=0-1", "bytes=abc", "bytes="])
+def test_invalid_range_is_ignored(client, spec):
+    resp = client.get("/big", headers={"Range": spec})
+
+    assert resp.status_code == 200
+    assert int(resp.headers["Content-Length"]) == SIZE
+    resp.close()
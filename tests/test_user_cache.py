@@ -0,0 +1,90 @@
+"""
+test_user_cache.py
+Cache user per request & per proses, dihitung lewat query counter
+(db.query_count). Perubahan dari "worker lain" (koneksi terpisah)
+membuang cache proses lewat generation.
+"""
+
+import sqlite3
+
+import pytest
+
+from core.cms_bash_folder import DB_PATH
+from app.repositories import user_repository
+from app.repositories.db import query_count
+from app.repositories.user_repository import (
+    create_user,
+    get_user_by_username,
+    set_user_active,
+)
+
+
+@pytest.fixture()
+def user(app, monkeypatch):
+    monkeypatch.setattr(user_repository, "_cache_ttl", lambda: 60)
+
+    with app.app_context():
+        create_user("cache-user", "x", "user", "2026-01-01 00:00:00")
+
+    yield "cache-user"
+
+    with app.app_context():
+        user_repository.delete_user("cache-user")
+
+
+def test_repeated_lookup_in_request_hits_db_once(app, user):
+    with app.app_context():
+        before = query_count()
+        for _ in range(5):
+            assert get_user_by_username(user).role == "user"
+        # paling banyak: cek generation + satu SELECT user
+        assert query_count() - before <= 2
+
+
+def test_process_cache_across_requests(app, user):
+    with app.app_context():
+        get_user_by_username(user)
+
+    with app.app_context():
+        assert get_user_by_username(user).is_active == 1
+        assert query_count() == 0
+
+
+def test_local_write_invalidates_immediately(app, user):
+    with app.app_context():
+        get_user_by_username(user)
+
+    with app.app_context():
+        set_user_active(user, False)
+
+    with app.app_context():
+        assert get_user_by_username(user).is_active == 0
+
+
+def test_write_from_other_worker_clears_cache(app, user, monkeypatch):
+    with app.app_context():
+        get_user_by_username(user)
+
+    # worker lain: koneksi sendiri, tanpa invalidate_user di proses ini
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(
+        "UPDATE users SET is_active = 0, role = 'guest' WHERE username = ?",
+        (user,)
+    )
+    conn.commit()
+    conn.close()
+
+    # jeda cek generation terlewati
+    monkeypatch.setattr(user_repository, "_generation_checked_at", 0.0)
+
+    with app.app_context():
+        cached = get_user_by_username(user)
+        assert (cached.is_active, cached.role) == (0, "guest")
+
+
+def test_login_time_does_not_clear_cache(app, user):
+    with app.app_context():
+        get_user_by_username(user)
+        generation = user_repository.get_user_generation()
+        user_repository.update_last_login(user, "2026-01-02 00:00:00")
+        assert user_repository.get_user_generation() == generation